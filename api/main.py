@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import FastAPI,Depends, status, Response, Request
 from app import models
 from app import pydantic_models as schemas
@@ -7,7 +9,11 @@ from datetime import timedelta
 from app.login_manager import manager, TOKEN_EXPIRATION_TIME
 from app.forms import *
 from app.config import Settings, get_settings
-import bcrypt
+from app.passwords import hasher
+from app.cache import tables_changed
+from app.downloads import (
+    viewer_id, can_access_event, can_download, document_response, event_documents_zip,
+)
 
 # oauth_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -41,9 +47,7 @@ async def token_generator(
     if not user:
         raise InvalidCredentialsException
 
-    hashed = bcrypt.hashpw(form_data.password.encode("utf-8"),
-                           user.salt_key.encode("utf-8"))
-    if not bcrypt.checkpw(form_data.password.encode("utf-8"), hashed):
+    if not await hasher.verify_user(user, form_data.password):
         raise InvalidCredentialsException
     else:
         user_dict = {
@@ -64,8 +68,7 @@ async def token_generator(
 @api.post("/register", status_code=status.HTTP_201_CREATED)
 async def register(request: schemas.UserRegister,
                    settings: Settings = Depends(get_settings)):
-    salt_key = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(request.password.encode('utf-8'), salt_key)
+    hash_password, salt_key = await hasher.hash(request.password)
     new_user = await models.User.create(
         first_name=str(request.full_name).split(" ")[0],
         middle_name=str(request.full_name).split(" ")[1],
@@ -73,6 +76,37 @@ async def register(request: schemas.UserRegister,
         email=request.email,
         username=request.email,
         phone=request.phone,
-        salt_key=salt_key.decode("utf-8"),
-        hash_password=hashed.decode("utf-8"))
-    return new_user
\ No newline at end of file
+        salt_key=salt_key,
+        hash_password=hash_password)
+    tables_changed(models.User)
+    return new_user
+
+
+@api.api_route("/documents/{document_id}", methods=["GET", "HEAD"])
+async def download_document(document_id: int, request: Request):
+    user_id = viewer_id(request)
+    if user_id is None:
+        return Response(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    document = await models.EventDocument.filter(id=document_id).first()
+    # check if the document exists and the user may see it, both are a 404
+    # so document ids can not be probed
+    if not document or not await can_download(user_id, document):
+        return Response(status_code=status.HTTP_404_NOT_FOUND)
+
+    return await document_response(request, document)
+
+
+@api.get("/events/{event_id}/documents.zip")
+async def download_event_documents(event_id: int, request: Request,
+                                   department_id: Optional[int] = None):
+    user_id = viewer_id(request)
+    if user_id is None:
+        return Response(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    event = await models.Event.filter(id=event_id).first()
+    # check if the event exists and the user may see its documents
+    if not event or not await can_access_event(user_id, event.id):
+        return Response(status_code=status.HTTP_404_NOT_FOUND)
+
+    return await event_documents_zip(event, department_id)
@@ -0,0 +1,64 @@
+from tortoise.transactions import in_transaction
+
+from app import models
+
+# roles of an attendee copied over from EventAttendee
+ATTENDEE_FLAGS = ("can_upload", "manage_minutes", "manage_agendas")
+
+
+async def refresh_event_access(event_id, user_ids=None):
+    """
+    rebuild the ``UserEventAccess`` rows of one event from its author and
+    ``EventAttendee`` rows, only the rows of ``user_ids`` when given, so a
+    mutation touching a few attendees rewrites just theirs
+    """
+    if user_ids is not None:
+        user_ids = list(set(user_ids))
+        if not user_ids:
+            return
+
+    async with in_transaction():
+        author_id = await models.Event.filter(id=event_id).values_list("author_id", flat=True)
+        attendees = models.EventAttendee.filter(event_id=event_id)
+        stale = models.UserEventAccess.filter(event_id=event_id)
+        if user_ids is not None:
+            attendees = attendees.filter(attendee_id__in=user_ids)
+            stale = stale.filter(user_id__in=user_ids)
+
+        rows = {}
+        for attendee in await attendees.values("attendee_id", *ATTENDEE_FLAGS):
+            rows[attendee["attendee_id"]] = models.UserEventAccess(
+                user_id=attendee["attendee_id"],
+                event_id=event_id,
+                is_attendee=True,
+                **{flag: attendee[flag] for flag in ATTENDEE_FLAGS},
+            )
+
+        # check if the author is one of the users being refreshed
+        author_id = author_id[0] if author_id else None
+        if author_id is not None and (user_ids is None or author_id in user_ids):
+            row = rows.get(author_id)
+            if row is None:
+                row = rows[author_id] = models.UserEventAccess(user_id=author_id, event_id=event_id)
+            row.is_author = True
+
+        await stale.delete()
+        if rows:
+            await models.UserEventAccess.bulk_create(list(rows.values()))
+
+
+async def attendee_user_ids(attendee_ids):
+    """``(event_id, user_id)`` pairs of ``EventAttendee`` rows, read before
+    the rows are changed or removed"""
+    return await models.EventAttendee.filter(
+        id__in=attendee_ids
+    ).values_list("event_id", "attendee_id")
+
+
+async def refresh_attendee_access(pairs):
+    """refresh the rows of the ``(event_id, user_id)`` pairs"""
+    users_by_event = {}
+    for event_id, user_id in pairs:
+        users_by_event.setdefault(event_id, []).append(user_id)
+    for event_id, user_ids in users_by_event.items():
+        await refresh_event_access(event_id, user_ids)
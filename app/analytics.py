@@ -0,0 +1,65 @@
+import os
+
+from app.cache import TTLCache, cached
+from app.models import Committee, Department, Event, EventType, User, Venue
+
+# the dashboard numbers are recomputed at most once per ttl, mutations
+# changing the counted tables make the cached copy stale right away
+ANALYTICS_TTL = int(os.getenv("ANALYTICS_TTL", 300))
+
+analytics_cache = TTLCache(ttl=ANALYTICS_TTL, max_size=16)
+
+TOTALS = (
+    ("total_users", User),
+    ("total_departments", Department),
+    ("total_committees", Committee),
+    ("total_venues", Venue),
+)
+
+
+def analytics_sql():
+    """
+    one statement for all numbers, events are grouped by type and
+    financial year and every other table contributes its row count
+    """
+    event_table = Event._meta.db_table
+    parts = [
+        f'SELECT \'events\' AS "metric", "event_type", "financial_year", COUNT(*) AS "total" '
+        f'FROM "{event_table}" GROUP BY "event_type", "financial_year"'
+    ]
+    for metric, model in TOTALS:
+        parts.append(
+            f'SELECT \'{metric}\', NULL, NULL, COUNT(*) FROM "{model._meta.db_table}"'
+        )
+    return " UNION ALL ".join(parts)
+
+
+async def compute_analytics():
+    rows = await Event._meta.db.execute_query_dict(analytics_sql())
+
+    data = {metric: 0 for metric, _ in TOTALS}
+    data["total_events"] = 0
+    by_type = {event_type.value: 0 for event_type in EventType}
+    by_financial_year = {}
+    for row in rows:
+        if row["metric"] != "events":
+            data[row["metric"]] = row["total"]
+            continue
+        data["total_events"] += row["total"]
+        by_type[row["event_type"]] = by_type.get(row["event_type"], 0) + row["total"]
+        # check if the event has a financial year at all
+        if row["financial_year"]:
+            by_financial_year[row["financial_year"]] = (
+                by_financial_year.get(row["financial_year"], 0) + row["total"]
+            )
+
+    data["events_by_type"] = by_type
+    data["events_by_financial_year"] = dict(sorted(by_financial_year.items()))
+    return data
+
+
+async def get_analytics():
+    return await cached(
+        analytics_cache, "analytics", [Event] + [model for _, model in TOTALS],
+        compute_analytics,
+    )
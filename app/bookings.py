@@ -0,0 +1,192 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+from pypika.enums import Comparator
+from pypika.functions import Function
+from pypika.terms import BasicCriterion, Field, ValueWrapper
+
+from app.models import Event
+
+# free slots are suggested from the requested start up to this many days on
+BOOKING_SEARCH_DAYS = int(os.getenv("BOOKING_SEARCH_DAYS", 7))
+BOOKING_SUGGESTIONS = int(os.getenv("BOOKING_SUGGESTIONS", 3))
+
+
+class RangeComparator(Comparator):
+    overlaps = "&&"
+
+
+# whether the database has the "booking" column, looked up once
+_booking_column = {}
+
+
+async def uses_booking_index():
+    """
+    the "booking" range column of migration 15 only exists on PostgreSQL
+    databases it ran on, a schema generated from the models lacks it
+    """
+    db = Event._meta.db
+    if db.capabilities.dialect != "postgres":
+        return False
+    if "exists" not in _booking_column:
+        rows = await db.execute_query_dict(
+            "SELECT 1 FROM information_schema.columns"
+            " WHERE table_schema = current_schema() AND table_name = 'event' AND column_name = 'booking'"
+        )
+        _booking_column["exists"] = bool(rows)
+    return _booking_column["exists"]
+
+
+def as_utc(d):
+    """plain aware UTC datetime of ``d``, pendulum's do not mix with
+    ``datetime.timezone``; naive ones from the database are UTC already"""
+    if d.tzinfo is not None:
+        d = d.utctimetuple()[:6] + (d.microsecond,)
+        return datetime(*d, tzinfo=timezone.utc)
+    return d.replace(tzinfo=timezone.utc)
+
+
+class IntervalTree:
+    """
+    Static interval tree over half open ``(start, end, value)`` intervals.
+    The intervals are sorted by start and read as an implicit balanced
+    tree, each node keeps the largest end below it so an overlap query
+    skips every subtree ending before the window.
+    """
+
+    def __init__(self, intervals):
+        self.items = sorted(intervals, key=lambda item: item[0])
+        self.max_end = [None] * len(self.items)
+        self._build(0, len(self.items))
+
+    def __len__(self):
+        return len(self.items)
+
+    def _build(self, lo, hi):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        end = self.items[mid][1]
+        for child_end in (self._build(lo, mid), self._build(mid + 1, hi)):
+            if child_end is not None and child_end > end:
+                end = child_end
+        self.max_end[mid] = end
+        return end
+
+    def _search(self, lo, hi, start, end, found):
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        if self.max_end[mid] <= start:
+            return
+        self._search(lo, mid, start, end, found)
+        item = self.items[mid]
+        # check if this interval starts after the window, the ones right of it too
+        if item[0] >= end:
+            return
+        if item[1] > start:
+            found.append(item)
+        self._search(mid + 1, hi, start, end, found)
+
+    def overlapping_items(self, start, end):
+        found = []
+        self._search(0, len(self.items), start, end, found)
+        return found
+
+    def overlapping(self, start, end):
+        """values of the intervals overlapping ``[start, end)``, by start"""
+        return [value for _, _, value in self.overlapping_items(start, end)]
+
+    def free_slots(self, start, end, duration, limit):
+        """
+        up to ``limit`` back to back slots of ``duration`` within
+        ``[start, end)`` that overlap no interval, earliest first
+        """
+        slots = []
+        cursor = start
+        for item_start, item_end, _ in self.overlapping_items(start, end) + [(end, end, None)]:
+            while len(slots) < limit and min(item_start, end) - cursor >= duration:
+                slots.append((cursor, cursor + duration))
+                cursor += duration
+            if len(slots) >= limit:
+                break
+            if item_end > cursor:
+                cursor = item_end
+        return slots
+
+
+class VenueAvailability:
+    """conflicting events of a venue for a requested time and free slots
+    of the same length when there are conflicts"""
+
+    def __init__(self, venue_id, start, end, conflicts, suggested_slots):
+        self.venue_id = venue_id
+        self.start_time = start
+        self.end_time = end
+        self.conflicts = conflicts
+        self.suggested_slots = suggested_slots
+
+    @property
+    def available(self):
+        return not self.conflicts
+
+
+async def bookings(venue_ids, start, end, exclude_event_id=None):
+    """
+    active events of the venues overlapping ``[start, end)``. With the
+    booking column this is ``booking && tstzrange(start, end)``, which the
+    GiST index of the venue exclusion constraint answers.
+    """
+    qs = Event.filter(venue_id__in=venue_ids, is_active=True)
+    if exclude_event_id is not None:
+        qs = qs.exclude(id=exclude_event_id)
+    if not await uses_booking_index():
+        return qs.filter(start_time__lt=end, end_time__gt=start)
+
+    booking = Field("booking", table=Event._meta.basetable)
+    return qs.annotate(
+        booking_overlaps=BasicCriterion(
+            RangeComparator.overlaps,
+            booking,
+            Function("tstzrange", ValueWrapper(start), ValueWrapper(end)),
+        ),
+    ).filter(booking_overlaps=True)
+
+
+async def venue_schedules(venue_ids, start, end, exclude_event_id=None):
+    """an ``IntervalTree`` of the bookings of every venue, from one query"""
+    intervals = {venue_id: [] for venue_id in venue_ids}
+    qs = await bookings(venue_ids, start, end, exclude_event_id)
+    for event in await qs.order_by("start_time"):
+        intervals[event.venue_id].append(
+            (as_utc(event.start_time), as_utc(event.end_time), event)
+        )
+    return {venue_id: IntervalTree(items) for venue_id, items in intervals.items()}
+
+
+async def venue_availability(venue_ids, start, end, exclude_event_id=None,
+                             limit=BOOKING_SUGGESTIONS):
+    """
+    ``VenueAvailability`` of each venue for ``[start, end)``. The bookings
+    of all venues up to ``BOOKING_SEARCH_DAYS`` after ``start`` are read
+    at once, conflicts and free slots come from the trees.
+    """
+    venue_ids = list(dict.fromkeys(venue_ids))
+    start, end = as_utc(start), as_utc(end)
+    horizon = max(start + timedelta(days=BOOKING_SEARCH_DAYS), end)
+    schedules = await venue_schedules(venue_ids, start, horizon, exclude_event_id)
+
+    availability = []
+    for venue_id in venue_ids:
+        schedule = schedules[venue_id]
+        conflicts = schedule.overlapping(start, end)
+        slots = schedule.free_slots(start, horizon, end - start, limit) if conflicts else []
+        availability.append(VenueAvailability(venue_id, start, end, conflicts, [
+            {"start_time": slot_start, "end_time": slot_end} for slot_start, slot_end in slots
+        ]))
+    return availability
+
+
+async def check_venue(venue_id, start, end, exclude_event_id=None):
+    """``VenueAvailability`` of one venue, i.e. before booking it"""
+    return (await venue_availability([venue_id], start, end, exclude_event_id))[0]
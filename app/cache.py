@@ -0,0 +1,79 @@
+import time
+
+
+class TTLCache:
+    """Small in-process cache whose entries expire ``ttl`` seconds after
+    they were stored."""
+
+    def __init__(self, ttl=60, max_size=1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data = {}
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        value, expires = entry
+        if expires < time.monotonic():
+            self._data.pop(key, None)
+            return default
+        return value
+
+    def set(self, key, value, ttl=None):
+        if len(self._data) >= self.max_size and key not in self._data:
+            # check if expired entries can make room before evicting the oldest
+            now = time.monotonic()
+            for k in [k for k, (_, expires) in self._data.items() if expires < now]:
+                del self._data[k]
+            if len(self._data) >= self.max_size:
+                del self._data[next(iter(self._data))]
+        self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+
+    def delete(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __contains__(self, key):
+        return self.get(key, self) is not self
+
+
+class TableVersions:
+    """Change counters of tables, bumped by the mutations writing them.
+
+    Cached values are stored under the versions of the tables they were
+    computed from, so a write makes every value depending on the table
+    unreachable without tracking which keys to delete.
+    """
+
+    def __init__(self):
+        self._versions = {}
+
+    def get(self, *models):
+        return tuple(self._versions.get(model._meta.db_table, 0) for model in models)
+
+    def bump(self, *models):
+        for model in models:
+            table = model._meta.db_table
+            self._versions[table] = self._versions.get(table, 0) + 1
+
+
+table_versions = TableVersions()
+
+
+def tables_changed(*models):
+    """called by mutations after writing rows of ``models``"""
+    table_versions.bump(*models)
+
+
+async def cached(cache, key, models, compute):
+    """value of ``compute()`` cached until one of ``models`` changes, the
+    cache ttl bounds how long other processes serve a stale copy"""
+    versioned_key = (key, table_versions.get(*models))
+    value = cache.get(versioned_key, cache)
+    if value is cache:
+        value = await compute()
+        cache.set(versioned_key, value)
+    return value
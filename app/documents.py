@@ -0,0 +1,87 @@
+import logging
+
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import F
+from tortoise.transactions import in_transaction
+
+from app.models import StoredFile
+from services.storage import storage
+
+log = logging.getLogger("meeting.documents")
+
+
+async def store_file(file):
+    """
+    store a starlette ``UploadFile`` once under its digest and take a
+    reference on it, uploads of a stored content only add a reference
+    """
+    staged = await storage.stage(file)
+    try:
+        blob = await reference(staged)
+        # the reference keeps the blob from being released while it is
+        # written, no lock or connection is held during the transfer
+        try:
+            stored = await storage.commit(staged)
+        except Exception:
+            await release_file(blob.id)
+            raise
+    finally:
+        await storage.discard(staged)
+
+    log.info(
+        "blob referenced",
+        extra={"digest": blob.digest, "ref_count": blob.ref_count, "stored": stored},
+    )
+    return blob
+
+
+async def reference(staged):
+    for attempt in range(2):
+        try:
+            return await take_reference(staged)
+        except IntegrityError:
+            # check if another upload of the same content created the
+            # row first, the next attempt references it
+            if attempt:
+                raise
+
+
+async def take_reference(staged):
+    # the row lock orders this against a release of the same blob
+    async with in_transaction():
+        blob = await StoredFile.filter(digest=staged.digest).select_for_update().first()
+        if blob is None:
+            return await StoredFile.create(
+                digest=staged.digest,
+                path=storage.path(staged.digest),
+                size=staged.size,
+                content_type=staged.content_type,
+                ref_count=1,
+            )
+        await StoredFile.filter(id=blob.id).update(ref_count=F("ref_count") + 1)
+        blob.ref_count += 1
+    return blob
+
+
+async def release_file(blob_id):
+    """drop a reference, the blob is deleted with its last reference"""
+    if blob_id is None:
+        return False
+    async with in_transaction():
+        blob = await StoredFile.filter(id=blob_id).select_for_update().first()
+        if blob is None:
+            return False
+        if blob.ref_count > 1:
+            await StoredFile.filter(id=blob.id).update(ref_count=F("ref_count") - 1)
+            return False
+        await blob.delete()
+        await storage.delete(blob.digest)
+    return True
+
+
+async def release_files(blob_ids):
+    """drop one reference per item of ``blob_ids``, i.e. of documents being deleted"""
+    released = 0
+    for blob_id in blob_ids:
+        released += await release_file(blob_id)
+    return released
@@ -0,0 +1,399 @@
+import hashlib
+import os
+import stat
+import zipfile
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import quote
+
+import aiofiles
+import aiofiles.os
+import jwt
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import RedirectResponse, Response, StreamingResponse
+from tortoise.expressions import Subquery
+
+from app import models
+from app.login_manager import JWT_SECRET, manager
+from services.storage import LocalStorage, storage
+
+# documents are only served from below this directory, never by the
+# public /static mount
+DOCUMENT_ROOT = os.path.realpath(os.getenv("DOCUMENT_ROOT", "static/uploads"))
+# documents were linked as /static/uploads/<file> before they were checked
+LEGACY_UPLOAD_PREFIX = "static/uploads/"
+# when set, i.e. to "/protected/", nginx is told to send the file itself
+# from an internal location aliased to DOCUMENT_ROOT, with sendfile
+DOCUMENT_ACCEL_REDIRECT = os.getenv("DOCUMENT_ACCEL_REDIRECT")
+DOCUMENT_CHUNK_SIZE = int(os.getenv("DOCUMENT_CHUNK_SIZE", 256 * 1024))
+# documents are private and a document may be replaced, clients keep their
+# copy but revalidate it, which is a 304 while the ETag still matches
+DOCUMENT_CACHE_CONTROL = "private, no-cache"
+PRESIGNED_EXPIRY = int(os.getenv("PRESIGNED_EXPIRY", 300))
+
+
+def viewer_id(request):
+    """id of the user of a bearer token, or of the login cookie for links
+    opened by the browser"""
+    user = request.scope.get("user")
+    if user is not None and user.is_authenticated:
+        return user.id
+    token = request.cookies.get(manager.cookie_name)
+    if not token:
+        return None
+    try:
+        return jwt.decode(token, JWT_SECRET, algorithms=["HS256"]).get("id")
+    except jwt.PyJWTError:
+        return None
+
+
+async def can_access_event(user_id, event_id):
+    # check if the user attends or authored the event, admins always can
+    if await models.UserEventAccess.filter(user_id=user_id, event_id=event_id).exists():
+        return True
+    return await models.User.filter(id=user_id, is_admin=True).exists()
+
+
+async def can_download(user_id, document):
+    return await can_access_event(user_id, document.event_id)
+
+
+async def legacy_document_id(request, path):
+    """
+    id of the document a /static/uploads/<path> link points to. Blobs are
+    shared between documents, the first one the viewer may see is taken.
+    """
+    documents = await models.EventDocument.filter(
+        file=f"{LEGACY_UPLOAD_PREFIX}{path}"
+    ).order_by("id")
+    if not documents:
+        return None
+    user_id = viewer_id(request)
+    if user_id is not None:
+        for document in documents:
+            if await can_download(user_id, document):
+                return document.id
+    return documents[0].id
+
+
+def etag_matches(header, etag):
+    """If-None-Match uses the weak comparison, ``W/`` prefixes are ignored"""
+    if header.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in header.split(",")]
+    return etag in [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+
+def not_modified(request, etag, modified):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def parse_range(header, size):
+    """
+    ``(start, end)`` of a single ``bytes=`` range, end included, None to
+    send the whole file and ValueError when no byte of the range exists
+    """
+    unit, _, ranges = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        # check if several ranges are asked for, the whole file is sent
+        return None
+    first, _, last = ranges.strip().partition("-")
+    try:
+        if not first:
+            length = int(last)
+            if length <= 0:
+                raise ValueError("Empty suffix range")
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
+
+
+def requested_range(request, etag, modified, size):
+    header = request.headers.get("range")
+    if not header:
+        return None
+    # check if the client's copy is stale, it gets the whole file then
+    if_range = request.headers.get("if-range")
+    if if_range:
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            if if_range != etag:
+                return None
+        else:
+            try:
+                if int(modified) > parsedate_to_datetime(if_range).timestamp():
+                    return None
+            except (TypeError, ValueError):
+                return None
+    return parse_range(header, size)
+
+
+def content_disposition(filename):
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+class DocumentFileResponse(Response):
+    """
+    Sends ``count`` bytes of ``path`` from ``offset``. Servers offering the
+    ASGI zero copy extension get the file descriptor and use sendfile,
+    otherwise the file is read in chunks off the event loop.
+    """
+
+    def __init__(self, path, offset, count, status_code=200, headers=None,
+                 media_type=None, method="GET"):
+        self.path = path
+        self.offset = offset
+        self.count = count
+        self.send_header_only = method.upper() == "HEAD"
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.headers["content-length"] = str(count)
+
+    async def __call__(self, scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if self.send_header_only or not self.count:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        async with aiofiles.open(self.path, "rb") as file:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file.fileno(),
+                    "offset": self.offset,
+                    "count": self.count,
+                    "more_body": False,
+                })
+                return
+
+            await file.seek(self.offset)
+            remaining = self.count
+            while remaining:
+                chunk = await file.read(min(DOCUMENT_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": remaining > 0,
+                })
+            if remaining:
+                # check if the file shrank while it was sent
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def local_path(path):
+    """absolute path of a stored document, None when it is outside DOCUMENT_ROOT"""
+    path = os.path.realpath(path)
+    if os.path.commonpath([path, DOCUMENT_ROOT]) != DOCUMENT_ROOT:
+        return None
+    return path
+
+
+async def document_response(request, document):
+    blob = await document.blob if document.blob_id else None
+    if blob is not None and not isinstance(storage.backend, LocalStorage):
+        # the object store answers range and conditional requests itself
+        url = await run_in_threadpool(
+            storage.backend.presigned_url, blob.digest, PRESIGNED_EXPIRY, document.filename
+        )
+        return RedirectResponse(url, status_code=307)
+
+    path = local_path(blob.path if blob is not None else document.file)
+    if path is None:
+        return Response(status_code=404)
+    try:
+        stat_result = await aiofiles.os.stat(path)
+    except FileNotFoundError:
+        return Response(status_code=404)
+    if not stat.S_ISREG(stat_result.st_mode):
+        return Response(status_code=404)
+
+    size = stat_result.st_size
+    modified = stat_result.st_mtime
+    if blob is not None:
+        etag = f'"{blob.digest}"'
+    else:
+        # check if the document predates content addressing
+        etag = '"{}"'.format(hashlib.sha256(
+            f"{path}-{stat_result.st_mtime_ns}-{size}".encode()).hexdigest())
+
+    filename = document.filename or os.path.basename(path)
+    media_type = (blob.content_type if blob is not None else None) or "application/octet-stream"
+    headers = {
+        "etag": etag,
+        "last-modified": formatdate(modified, usegmt=True),
+        "cache-control": DOCUMENT_CACHE_CONTROL,
+        "accept-ranges": "bytes",
+        "content-disposition": content_disposition(filename),
+    }
+
+    if not_modified(request, etag, modified):
+        return Response(status_code=304, headers={
+            k: v for k, v in headers.items() if k in ("etag", "last-modified", "cache-control")
+        })
+
+    try:
+        byte_range = requested_range(request, etag, modified, size)
+    except ValueError:
+        return Response(status_code=416, headers={"content-range": f"bytes */{size}"})
+
+    if DOCUMENT_ACCEL_REDIRECT:
+        # nginx sends the file, ranges included, with sendfile
+        relative = os.path.relpath(path, DOCUMENT_ROOT)
+        headers["x-accel-redirect"] = f"{DOCUMENT_ACCEL_REDIRECT.rstrip('/')}/{quote(relative)}"
+        return Response(headers=headers, media_type=media_type)
+
+    if byte_range is None:
+        return DocumentFileResponse(path, 0, size, headers=headers,
+                                    media_type=media_type, method=request.method)
+
+    start, end = byte_range
+    headers["content-range"] = f"bytes {start}-{end}/{size}"
+    return DocumentFileResponse(path, start, end - start + 1, status_code=206, headers=headers,
+                                media_type=media_type, method=request.method)
+
+
+class ZipStream:
+    """
+    Write only file object for ``zipfile``, the archive is written as a
+    stream (sizes and CRCs follow each entry) and ``drain`` hands out what
+    was written since the last call
+    """
+
+    def __init__(self):
+        self._buffer = []
+
+    def write(self, data):
+        self._buffer.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._buffer)
+        self._buffer = []
+        return data
+
+
+def archive_name(document, used):
+    """entry name of a document, unique within the archive"""
+    name = document.filename or os.path.basename(document.file) or f"document-{document.id}"
+    name = name.replace("/", "_").replace("\\", "_")
+    stem, ext = os.path.splitext(name)
+    n = 1
+    while name.lower() in used:
+        n += 1
+        name = f"{stem} ({n}){ext}"
+    used.add(name.lower())
+    return name
+
+
+async def local_chunks(path):
+    async with aiofiles.open(path, "rb") as file:
+        while True:
+            chunk = await file.read(DOCUMENT_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+async def object_chunks(blob):
+    response = await run_in_threadpool(storage.backend.open, blob.digest)
+    try:
+        chunks = response.stream(DOCUMENT_CHUNK_SIZE)
+        while True:
+            chunk = await run_in_threadpool(next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        response.close()
+        response.release_conn()
+
+
+async def archive_entry(document):
+    """``(size, chunks)`` of a document, None when its file is gone"""
+    blob = await document.blob if document.blob_id else None
+    if blob is not None and not isinstance(storage.backend, LocalStorage):
+        return blob.size, object_chunks(blob)
+
+    path = local_path(blob.path if blob is not None else document.file)
+    if path is None:
+        return None
+    try:
+        stat_result = await aiofiles.os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat_result.st_size, local_chunks(path)
+
+
+async def zip_documents(documents):
+    """
+    the ZIP archive of ``documents``, yielded as it is built. Entries are
+    stored uncompressed, PDFs and office files are compressed already, so
+    every chunk read from storage goes out right away.
+    """
+    stream = ZipStream()
+    used = set()
+    with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for document in documents:
+            entry = await archive_entry(document)
+            if entry is None:
+                # check if the file is missing, the rest is still sent
+                continue
+            size, chunks = entry
+            modified = document.updated or document.created
+            info = zipfile.ZipInfo(
+                archive_name(document, used),
+                date_time=modified.timetuple()[:6] if modified else (1980, 1, 1, 0, 0, 0),
+            )
+            info.file_size = size
+            # zip64 records are used from the size for entries over 4 GiB
+            with archive.open(info, "w") as out:
+                async for chunk in chunks:
+                    out.write(chunk)
+                    yield stream.drain()
+            yield stream.drain()
+    yield stream.drain()
+
+
+async def event_documents_zip(event, department_id=None):
+    documents = models.EventDocument.filter(event_id=event.id)
+    if department_id is not None:
+        documents = documents.filter(
+            id__in=Subquery(models.EventDocumentDepartment.filter(
+                department_id=department_id
+            ).values("event_document_id"))
+        )
+    documents = await documents.order_by("id")
+
+    filename = f"{event.title or 'event'}-documents.zip".replace("/", "_")
+    return StreamingResponse(
+        (chunk async for chunk in zip_documents(documents) if chunk),
+        media_type="application/zip",
+        headers={
+            "content-disposition": content_disposition(filename),
+            "cache-control": "private, no-store",
+        },
+    )
@@ -0,0 +1,69 @@
+import os
+from datetime import date, datetime
+
+import numpy as np
+
+# the government financial year runs from July to June, "2023/2024"
+# starts on 1 July 2023
+FISCAL_YEAR_START_MONTH = int(os.getenv("FISCAL_YEAR_START_MONTH", 7))
+
+
+def fiscal_year(d):
+    """calendar year the financial year of ``d`` starts in"""
+    return d.year if d.month >= FISCAL_YEAR_START_MONTH else d.year - 1
+
+
+def fiscal_year_label(d):
+    year = fiscal_year(d)
+    return f"{year}/{year + 1}"
+
+
+def fiscal_quarter(d):
+    """1 to 4, the first quarter starts with the financial year"""
+    return (d.month - FISCAL_YEAR_START_MONTH) % 12 // 3 + 1
+
+
+def fiscal_week(d):
+    """1 to 53, weeks counted in 7 day steps from the start of the financial year"""
+    day = d.date() if isinstance(d, datetime) else d
+    return (day - date(fiscal_year(d), FISCAL_YEAR_START_MONTH, 1)).days // 7 + 1
+
+
+def quarter_label(d):
+    if d is None:
+        return None
+    return f"Q{fiscal_quarter(d)}"
+
+
+def parse_fiscal_year(label):
+    """start year of a "2023/2024" label, ValueError when it is not one"""
+    return int(str(label).split("/")[0].strip())
+
+
+def fiscal_year_bounds(year):
+    """``[start, end)`` datetimes of the financial year starting in ``year``"""
+    start = datetime(year, FISCAL_YEAR_START_MONTH, 1)
+    return start, start.replace(year=year + 1)
+
+
+def creation_fiscal_years(today):
+    """labels offered when creating events, the next and the current year"""
+    year = fiscal_year(today)
+    return [f"{year + 1}/{year + 2}", f"{year}/{year + 1}"]
+
+
+def fiscal_calendar(dates):
+    """
+    fiscal year, quarter and week of many dates at once, i.e. for reports
+    over all events, as numpy arrays
+    """
+    days = np.asarray(dates, dtype="datetime64[D]")
+    months = days.astype("datetime64[M]").astype(np.int64)
+    month = months % 12 + 1
+    year = months // 12 + 1970
+
+    years = np.where(month >= FISCAL_YEAR_START_MONTH, year, year - 1)
+    quarters = (month - FISCAL_YEAR_START_MONTH) % 12 // 3 + 1
+    starts = ((years - 1970) * 12 + FISCAL_YEAR_START_MONTH - 1).astype("datetime64[M]")
+    weeks = (days - starts.astype("datetime64[D]")).astype(np.int64) // 7 + 1
+    return {"year": years, "quarter": quarters, "week": weeks}
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import os
+from datetime import timedelta
+
+from tortoise import timezone
+from tortoise.exceptions import IntegrityError
+
+from app.models import BackgroundJob, JobStatus
+
+log = logging.getLogger("meeting.jobs")
+
+# seconds a job may go without saving progress before it is taken for dead,
+# i.e. its process restarted halfway through
+JOB_LEASE = int(os.getenv("JOB_LEASE", 300))
+
+# references to the running tasks, asyncio only keeps weak ones
+_tasks = set()
+
+
+def lease_until():
+    return timezone.now() + timedelta(seconds=JOB_LEASE)
+
+
+async def expire_jobs(kind):
+    """mark the unfinished jobs of ``kind`` whose lease ran out as failed"""
+    now = timezone.now()
+    expired = await BackgroundJob.filter(
+        claim=kind, lease_until__lt=now
+    ).update(claim=None, status=JobStatus.FAILED, error="lease expired", finished_at=now)
+    if expired:
+        log.warning("background job lease expired", extra={"kind": kind})
+
+
+async def start_job(kind, run, author_id=None):
+    """
+    create a ``BackgroundJob`` and run ``await run(job)`` in the
+    background, its return value is stored as the job result. An
+    unfinished job of the same kind is returned instead of starting another,
+    unless its lease expired.
+    """
+    await expire_jobs(kind)
+    try:
+        job = await BackgroundJob.create(
+            kind=kind, claim=kind, lease_until=lease_until(), author_id=author_id
+        )
+    except IntegrityError:
+        # check if the job claiming the kind finished in the meantime
+        job = await BackgroundJob.filter(claim=kind).first()
+        if job is None:
+            return await start_job(kind, run, author_id)
+        return job
+
+    task = asyncio.ensure_future(execute(job, run))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job
+
+
+async def execute(job, run):
+    job.status = JobStatus.RUNNING
+    job.started_at = timezone.now()
+    job.lease_until = lease_until()
+    await job.save(update_fields=["status", "started_at", "lease_until"])
+    try:
+        job.result = await run(job)
+        job.status = JobStatus.COMPLETED
+    except Exception as e:
+        log.exception("background job failed", extra={"job_id": job.id, "kind": job.kind})
+        job.status = JobStatus.FAILED
+        job.error = repr(e)
+    job.claim = None
+    job.finished_at = timezone.now()
+    await job.save(update_fields=[
+        "status", "result", "error", "claim", "finished_at", "total", "processed", "succeeded", "failed",
+    ])
+    return job
+
+
+class LeaseLost(Exception):
+    """the job's lease expired and another job of its kind may be running"""
+
+
+async def save_progress(job):
+    """store the counts and renew the lease, stops a job that lost it"""
+    job.lease_until = lease_until()
+    updated = await BackgroundJob.filter(id=job.id, claim=job.kind).update(
+        total=job.total, processed=job.processed, succeeded=job.succeeded,
+        failed=job.failed, lease_until=job.lease_until,
+    )
+    if not updated:
+        raise LeaseLost(job.id)
@@ -0,0 +1,184 @@
+import asyncio
+from collections import defaultdict
+from app.models import (
+    User, Venue, Event, Department, Committee, EventDocument,
+    UserDepartment, UserCommittee, EventAttendee, EventDocumentDepartment,
+    EventUserDocumentNote, UserEventAccess,
+)
+
+
+class DataLoader:
+    """Collects every key requested during one tick of the event loop and
+    resolves them with a single call to ``batch_load``.
+
+    graphql-core resolves sibling fields of a list concurrently, so all rows
+    of one execution level end up in the same batch.
+    """
+
+    def __init__(self, batch_load):
+        self.batch_load = batch_load
+        self._cache = {}
+        self._queue = []
+
+    def load(self, key):
+        if key in self._cache:
+            return self._cache[key]
+
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        self._cache[key] = future
+
+        if not self._queue:
+            loop.call_soon(self._schedule_dispatch)
+        self._queue.append((key, future))
+        return future
+
+    def load_many(self, keys):
+        return asyncio.gather(*[self.load(key) for key in keys])
+
+    def prime(self, key, value):
+        if key not in self._cache:
+            future = asyncio.get_event_loop().create_future()
+            future.set_result(value)
+            self._cache[key] = future
+
+    def _schedule_dispatch(self):
+        asyncio.ensure_future(self._dispatch())
+
+    async def _dispatch(self):
+        queue, self._queue = self._queue, []
+        keys = [key for key, _ in queue]
+        try:
+            values = await self.batch_load(keys)
+        except Exception as e:
+            for key, future in queue:
+                # drop failed keys so a later load can retry them
+                self._cache.pop(key, None)
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, future in queue:
+            if not future.done():
+                future.set_result(values.get(key))
+
+
+class ModelLoader(DataLoader):
+    """Loads model instances by primary key with one ``id__in`` query."""
+
+    def __init__(self, model):
+        self.model = model
+        super().__init__(self.batch_load_objects)
+
+    async def batch_load_objects(self, keys):
+        ids = [key for key in set(keys) if key is not None]
+        if not ids:
+            return {}
+        return {obj.id: obj for obj in await self.model.filter(id__in=ids).all()}
+
+
+class RelatedLoader(DataLoader):
+    """Loads the objects linked to a key through a join table, e.g. the
+    departments of a user through ``UserDepartment``.
+
+    The join rows are read with one ``values_list`` query and the targets are
+    handed over to the target ``ModelLoader`` so they are shared with the rest
+    of the request.
+    """
+
+    def __init__(self, through, source_field, target_field, target_loader):
+        self.through = through
+        self.source_field = source_field
+        self.target_field = target_field
+        self.target_loader = target_loader
+        super().__init__(self.batch_load_related)
+
+    async def batch_load_related(self, keys):
+        rows = await self.through.filter(
+            **{f"{self.source_field}__in": list(set(keys))}
+        ).order_by("id").values_list(self.source_field, self.target_field)
+
+        related = defaultdict(dict)
+        for source_id, target_id in rows:
+            related[source_id][target_id] = None
+
+        targets = await self.target_loader.load_many(
+            {target_id for ids in related.values() for target_id in ids})
+        targets = {obj.id: obj for obj in targets if obj is not None}
+
+        return {
+            key: [targets[target_id] for target_id in related.get(key, []) if target_id in targets]
+            for key in keys
+        }
+
+
+class DocumentNoteLoader(DataLoader):
+    """Loads the viewer's note of each event document."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        super().__init__(self.batch_load_notes)
+
+    async def batch_load_notes(self, keys):
+        if self.user_id is None:
+            return {}
+        notes = await EventUserDocumentNote.filter(
+            event_document_id__in=list(set(keys)), user_id=self.user_id
+        ).all()
+        return {note.event_document_id: note for note in notes}
+
+
+class EventAccessLoader(DataLoader):
+    """Loads the viewer's ``UserEventAccess`` row of each event, the roles
+    come from the covering (user, event) index."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        super().__init__(self.batch_load_access)
+
+    async def batch_load_access(self, keys):
+        if self.user_id is None:
+            return {}
+        rows = await UserEventAccess.filter(
+            user_id=self.user_id, event_id__in=list(set(keys))
+        ).all()
+        return {row.event_id: row for row in rows}
+
+
+class Loaders:
+    """Per-request set of loaders, stored on the GraphQL context."""
+
+    def __init__(self, user_id=None):
+        self.user = ModelLoader(User)
+        self.venue = ModelLoader(Venue)
+        self.event = ModelLoader(Event)
+        self.department = ModelLoader(Department)
+        self.committee = ModelLoader(Committee)
+        self.event_document = ModelLoader(EventDocument)
+
+        self.user_departments = RelatedLoader(
+            UserDepartment, "user_id", "department_id", self.department)
+        self.user_committees = RelatedLoader(
+            UserCommittee, "user_id", "committee_id", self.committee)
+        self.event_attendees = RelatedLoader(
+            EventAttendee, "event_id", "attendee_id", self.user)
+        self.event_document_departments = RelatedLoader(
+            EventDocumentDepartment, "event_document_id", "department_id", self.department)
+
+        self.event_document_note = DocumentNoteLoader(user_id)
+        self.event_access = EventAccessLoader(user_id)
+
+
+def get_viewer_id(info):
+    try:
+        return info.context["request"].user.id
+    except Exception:
+        return None
+
+
+def get_loaders(info):
+    context = info.context
+    loaders = context.get("loaders")
+    if loaders is None:
+        loaders = context["loaders"] = Loaders(get_viewer_id(info))
+    return loaders
@@ -0,0 +1,38 @@
+import os
+
+from app.cache import TTLCache, cached
+from app.models import Committee, Event
+
+LOOKUP_TTL = int(os.getenv("LOOKUP_TTL", 300))
+
+lookup_cache = TTLCache(ttl=LOOKUP_TTL, max_size=64)
+
+
+async def distinct_values(model, field):
+    """``SELECT DISTINCT field`` without nulls, sorted"""
+    values = await model.filter(**{f"{field}__isnull": False}).distinct().values_list(field, flat=True)
+    return sorted(getattr(value, "value", value) for value in values)
+
+
+async def financial_years():
+    return await cached(
+        lookup_cache, "financial_years", (Event,),
+        lambda: distinct_values(Event, "financial_year"),
+    )
+
+
+async def used_event_types():
+    return await cached(
+        lookup_cache, "event_types", (Event,),
+        lambda: distinct_values(Event, "event_type"),
+    )
+
+
+async def committee_options():
+    async def compute():
+        return [
+            {"id": committee_id, "name": name}
+            for committee_id, name in await Committee.filter(is_active=True)
+            .order_by("name").values_list("id", "name")
+        ]
+    return await cached(lookup_cache, "committee_options", (Committee,), compute)
@@ -23,8 +23,15 @@ from starlette.middleware.authentication import AuthenticationMiddleware
 from tortoise.contrib.fastapi import register_tortoise
 from starlette_graphene3 import GraphQLApp, make_graphiql_handler
 from app.g_schema import schema
+from app.loaders import Loaders
+from starlette.background import BackgroundTasks
 from starlette.middleware.cors import CORSMiddleware
 from app.login_manager import JWT_SECRET
+from app.downloads import legacy_document_id
+from services import mail, sms
+from app.outbox import outbox
+from app.passwords import hasher
+from services.storage import storage
 # models.Base.metadata.create_all(engine)
 
 log = logging.getLogger("uvicorn")
@@ -112,6 +119,17 @@ class BasicAuthBackend(AuthenticationBackend):
 
 
 
+def get_graphql_context(request):
+    # a fresh set of loaders per request, batching and caching never
+    # leak between requests or users
+    user_id = getattr(request.scope.get("user"), "id", None)
+    return {
+        "request": request,
+        "background": BackgroundTasks(),
+        "loaders": Loaders(user_id),
+    }
+
+
 app = FastAPI(title="Meeting API",
               middleware=[
                   Middleware(AuthenticationMiddleware, backend=BasicAuthBackend()),
@@ -132,13 +150,38 @@ register_tortoise(
     add_exception_handlers=True,
 )
 
+@app.get("/static/uploads/{path:path}")
+async def legacy_upload(path: str, request: Request):
+    # uploads are not public, old links go through the checked download
+    document_id = await legacy_document_id(request, path)
+    if document_id is None:
+        return Response(status_code=404)
+    return RedirectResponse(f"/api/documents/{document_id}", status_code=307)
+
+
 app.mount("/api", api)
 app.mount("/static", StaticFiles(directory="static"), name="static")
-app.mount("/graphql", GraphQLApp(schema, on_get=make_graphiql_handler()))
+app.mount("/graphql", GraphQLApp(schema,
+                                 on_get=make_graphiql_handler(),
+                                 context_value=get_graphql_context))
 
 manager.useRequest(app)
 
 
+@app.on_event("startup")
+async def start_outbox():
+    outbox.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_services():
+    await outbox.stop()
+    await sms.close_client()
+    await mail.close_client()
+    hasher.shutdown()
+    storage.close()
+
+
 def object_as_dict(obj):
     return {
         c.key: getattr(obj, c.key)
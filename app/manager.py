@@ -1,13 +1,24 @@
 from services.sms import SMS
-from app.validators.phone_validator import PhoneValidator
-from app.models import User, UserOTP, EventAttendee
+from services.mail import Mail, MAIL_ENDPOINT
+from app.validators.phone_validator import PhoneValidator, validate_many
+from app.models import User, UserOTP, EventAttendee, OutboundMessage, MessageChannel
+from app.outbox import outbox
+from app.passwords import hasher
+from app.jobs import save_progress
+from app.search import annotate_email_lower
+from app.utils import chunked, iter_json_array
+import asyncio
+import os
 import random
 import string
-import bcrypt
-import json
 import httpx
+from tortoise.expressions import Subquery
+from tortoise.transactions import in_transaction
 
 
+PROVISIONING_CHUNK_SIZE = int(os.getenv("PROVISIONING_CHUNK_SIZE", 200))
+SYNC_CHUNK_SIZE = int(os.getenv("SYNC_CHUNK_SIZE", 500))
+SYNC_FIELDS = ("first_name", "middle_name", "last_name", "email", "username", "phone")
 
 
 class GeneralMailForwarder:
@@ -15,21 +26,34 @@ class GeneralMailForwarder:
         self.to = to
         self.message = message
         self.title = title
-        self.forward_ip_address = f"http://192.168.1.52/production/manager/send_mail/"
+        self.forward_ip_address = MAIL_ENDPOINT
         self.policy_id = policy_id
         self.to_customer = to_customer
-        self.data = {
-            "message":self.message,
-            "to":self.to,
-            "title":self.title,
-            "policy":self.policy_id,
-            "to_customer":self.to_customer
-        }
+        self.data = Mail.payload(self.to, self.title, self.message, self.policy_id, self.to_customer)
+
     def bridge(self):
+        # blocking, only for scripts outside the event loop
         with httpx.Client() as client:
             response = client.post(self.forward_ip_address, data=self.data)
         return response
 
+    async def forward(self):
+        # non blocking bridge through the shared mail client
+        return await Mail().send(self.to, self.title, self.message, self.policy_id, self.to_customer)
+
+    def outbound_message(self, **kwargs):
+        # the message as an outbox entry, sent along with the sms messages
+        return OutboundMessage(
+            channel=MessageChannel.EMAIL,
+            recipient=self.to,
+            title=self.title,
+            message=self.message,
+            **kwargs
+        )
+
+    async def queue(self, **kwargs):
+        return await outbox.enqueue([self.outbound_message(**kwargs)])
+
 
 class MeetingManager:
     def __init__(self):
@@ -47,39 +71,59 @@ class MeetingManager:
         return token
 
     async def send_meeting_attendee_invitation(self, meeting, attendee):
-        # create sms message 
-        try:
-            user = await User.filter(id=attendee.attendee_id).first()
-            start_time = meeting.start_time.strftime("%d-%m-%Y %H:%M")
-            meeting_link = f"http://meetings.nictanzania.co.tz/meeting/{meeting.id}/{meeting.title}"
-            message = f"""Dear {user.full_name()}, you have been invited to attend a {meeting.title} on {start_time}, please open this link to join the meeting {meeting_link}"""
-            valid_phone = PhoneValidator(user.phone)
-            if valid_phone.validate():
-                sms = SMS()
-                to = valid_phone.international_format()
-                await sms.send(to, message, user.full_name())
-        except:
-            pass
+        # queue sms message 
+        user = await User.filter(id=attendee.attendee_id).first()
+        # check if there is someone to invite and a time to invite them to
+        if user is None or meeting.start_time is None:
+            return False
+        start_time = meeting.start_time.strftime("%d-%m-%Y %H:%M")
+        meeting_link = f"http://meetings.nictanzania.co.tz/meeting/{meeting.id}/{meeting.title}"
+        message = f"""Dear {user.full_name()}, you have been invited to attend a {meeting.title} on {start_time}, please open this link to join the meeting {meeting_link}"""
+        valid_phone = PhoneValidator(user.phone)
+        if valid_phone.validate():
+            await outbox.enqueue([OutboundMessage(
+                channel=MessageChannel.SMS,
+                recipient=valid_phone.international_format(),
+                recipient_name=user.full_name(),
+                message=message,
+                event_id=meeting.id,
+                user_id=user.id,
+            )])
         
         return True
 
-    async def send_all_meeting_attendee_invitation(self, meeting):
-        # create sms message 
-        try:
-            attendees = await EventAttendee.filter(event_id=meeting.id).all()
-            for attendee in attendees:
-                user = await User.filter(id=attendee.attendee_id).first()
-                start_time = meeting.start_time.strftime("%d-%m-%Y %H:%M")
-                message = f"""Dear {user.full_name()}, you have been invited to attend a {meeting.title} on {start_time}"""
-                valid_phone = PhoneValidator(user.phone)
-                if valid_phone.validate():
-                    sms = SMS()
-                    to = valid_phone.international_format()
-                    await sms.send(to, message, user.full_name())
-        except:
-            pass
+    async def send_all_meeting_attendee_invitation(self, meeting, email=False):
+        # queue one sms message per attendee, and an email too when asked,
+        # returns how many were queued
+        if meeting.start_time is None:
+            return 0
+        attendees = await User.filter(
+            id__in=Subquery(EventAttendee.filter(event_id=meeting.id).values("attendee_id"))
+        ).all()
+        start_time = meeting.start_time.strftime("%d-%m-%Y %H:%M")
+        messages = []
+        phones = validate_many([user.phone for user in attendees])
+        for user, phone in zip(attendees, phones):
+            message = f"""Dear {user.full_name()}, you have been invited to attend a {meeting.title} on {start_time}"""
+            if phone.is_valid:
+                messages.append(OutboundMessage(
+                    channel=MessageChannel.SMS,
+                    recipient=phone.international,
+                    recipient_name=user.full_name(),
+                    message=message,
+                    event_id=meeting.id,
+                    user_id=user.id,
+                ))
+            if email and user.email:
+                messages.append(GeneralMailForwarder(
+                    user.email, f"Invitation: {meeting.title}", message
+                ).outbound_message(
+                    recipient_name=user.full_name(),
+                    event_id=meeting.id,
+                    user_id=user.id,
+                ))
         
-        return True
+        return await outbox.enqueue(messages)
 
     async def send_user_recovery_token(self, user):
         token = await self.generate_random_token()
@@ -102,9 +146,7 @@ class MeetingManager:
 
     async def change_user_password(self, user, password):
         # update user password
-        salt_key = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode("utf-8"), salt_key)
-        updated = await User.filter(id=user.id).update(hash_password=hashed.decode("utf-8"), salt_key=salt_key.decode("utf-8"))
+        updated = await hasher.set_password(user, password)
         if updated:
             # create sms message 
             try:
@@ -121,14 +163,18 @@ class MeetingManager:
         return False
             
     
-    async def create_user_credentials(self, user):
-        password = await self.generate_random_password()
+    def credentials_message(self, user, password):
         client_name = f"{user.first_name} {user.middle_name} {user.last_name}"
-        message = f"""{client_name}, Welcome to the Meeting App.your Credentials
+        return f"""{client_name}, Welcome to the Meeting App.your Credentials
         Username:{user.email} , 
         Password:{password}, 
         Please visit http://meetings.nictanzania.co.tz to login
         """
+
+    async def create_user_credentials(self, user):
+        password = await self.generate_random_password()
+        client_name = f"{user.first_name} {user.middle_name} {user.last_name}"
+        message = self.credentials_message(user, password)
         to = user.phone
         
         # check if phone number is valid 
@@ -136,67 +182,127 @@ class MeetingManager:
         if validate_phone.validate():
             
             # update user password
-            salt_key = bcrypt.gensalt()
-            hashed = bcrypt.hashpw(password.encode("utf-8"), salt_key)
-            updated = await User.filter(id=user.id).update(hash_password=hashed.decode("utf-8"), salt_key=salt_key.decode("utf-8"))
+            updated = await hasher.set_password(user, password)
             if updated:
                 sms = SMS()
                 to = validate_phone.international_format()
-                print(message)
                 await sms.send(to, message, client_name)
         
         return True
 
+    async def provision_user_credentials(self, job, chunk_size=PROVISIONING_CHUNK_SIZE):
+        """
+        create credentials for every user without a password, a chunk at a
+        time: the passwords are hashed on the password pool, written with
+        one bulk UPDATE and the SMS are queued on the outbox. Users without
+        a valid phone number are counted as failed and left untouched.
+        """
+        users = User.filter(hash_password__isnull=True, salt_key__isnull=True)
+        job.total = await users.count()
+        await save_progress(job)
+
+        last_id = 0
+        while True:
+            chunk = await users.filter(id__gt=last_id).order_by("id").limit(chunk_size)
+            if not chunk:
+                break
+            last_id = chunk[-1].id
+
+            # check if phone numbers are valid
+            valid = [
+                (user, phone.international)
+                for user, phone in zip(chunk, validate_many([user.phone for user in chunk]))
+                if phone.is_valid
+            ]
+
+            passwords = [await self.generate_random_password() for _ in valid]
+            hashes = await asyncio.gather(*[hasher.hash(password) for password in passwords])
+
+            messages = []
+            for (user, to), password, (hash_password, salt_key) in zip(valid, passwords, hashes):
+                user.hash_password = hash_password
+                user.salt_key = salt_key
+                messages.append(OutboundMessage(
+                    channel=MessageChannel.SMS,
+                    recipient=to,
+                    recipient_name=f"{user.first_name} {user.middle_name} {user.last_name}",
+                    message=self.credentials_message(user, password),
+                    redact=True,
+                    user_id=user.id,
+                ))
+
+            async with in_transaction():
+                if valid:
+                    await User.bulk_update([user for user, _ in valid], fields=["hash_password", "salt_key"])
+                await outbox.enqueue(messages)
+
+            job.processed += len(chunk)
+            job.succeeded += len(valid)
+            job.failed += len(chunk) - len(valid)
+            await save_progress(job)
+
+        return {"provisioned": job.succeeded, "invalid_phone": job.failed}
+
     
-    async def sync_users(self):
-        # get all users from json file
-        # create users in the database
-        
-        users_json = open("users.json", "r")
-        
-        users = json.load(users_json)
-        
-        for user in users:
-            first_name = user["first_name"]
-            middle_name = user["middle_name"]
-            last_name = user["last_name"]
-            email = user["email"]
-            phone = user["phone"]
-            
-            # check if user exists in the database by email 
-            user_exists = await User.filter(email=email).first()
-            
-            if not user_exists:
-                # check if phone number is valid
-                validate_phone = PhoneValidator(phone)
-                
-                if validate_phone.validate():
-                    phone = validate_phone.international_format()
-                    await User.create(
-                        first_name=first_name,
-                        middle_name=middle_name,
-                        last_name=last_name,
-                        email=email,
-                        username=email,
-                        phone=phone
-                    )
-            else:
-                # check if phone number is valid
-                validate_phone = PhoneValidator(phone)
-                
-                if validate_phone.validate():
-                    phone = validate_phone.international_format()
-                    await User.filter(id=user_exists.id).update(
-                        first_name=first_name,
-                        middle_name=middle_name,
-                        last_name=last_name,
-                        email=email,
-                        username=email,
-                        phone=phone
-                    )
-        return True
-        
-        
-        
-        
-        
\ No newline at end of file
+    async def sync_users(self, path="users.json", chunk_size=SYNC_CHUNK_SIZE):
+        """
+        create or update the users listed in ``path`` by email, ignoring
+        case and surrounding blanks. The file is streamed, every chunk
+        costs one query for the existing users, one bulk insert and one
+        bulk update. Returns how many users were inserted, updated, skipped
+        (unchanged or repeated later in the file) and invalid (missing
+        fields or invalid phone number).
+        """
+        counts = {"inserted": 0, "updated": 0, "skipped": 0, "invalid": 0}
+
+        for rows in chunked(iter_json_array(path), chunk_size):
+            # check if phone numbers are valid, once per distinct number
+            phones = validate_many([row.get("phone") for row in rows])
+
+            # the last row of an email wins, like updating in file order
+            users = {}
+            for row, phone in zip(rows, phones):
+                email = str(row.get("email") or "").strip().lower()
+                phone = phone.international if phone.is_valid else None
+                if not email or not row.get("first_name") or not row.get("last_name") or not phone:
+                    counts["invalid"] += 1
+                    continue
+                if email in users:
+                    counts["skipped"] += 1
+                users[email] = dict(
+                    first_name=row["first_name"],
+                    middle_name=row.get("middle_name"),
+                    last_name=row["last_name"],
+                    email=email,
+                    username=email,
+                    phone=phone,
+                )
+
+            # get the existing users of the chunk by email, ignoring case
+            existing = {}
+            for user in await annotate_email_lower(User.all()).filter(
+                email_lower__in=list(users)
+            ).order_by("id"):
+                existing.setdefault(user.email_lower, user)
+
+            created, updated = [], []
+            for email, values in users.items():
+                user = existing.get(email)
+                if user is None:
+                    created.append(User(**values))
+                elif all(getattr(user, field) == value for field, value in values.items()):
+                    counts["skipped"] += 1
+                else:
+                    for field, value in values.items():
+                        setattr(user, field, value)
+                    updated.append(user)
+
+            async with in_transaction():
+                if created:
+                    await User.bulk_create(created)
+                if updated:
+                    await User.bulk_update(updated, fields=list(SYNC_FIELDS))
+            counts["inserted"] += len(created)
+            counts["updated"] += len(updated)
+
+        return counts
@@ -41,7 +41,10 @@ class CommitteeDepartment(MiscFields):
     department = fields.ForeignKeyField('models.Department',
                                         related_name="committee_departments",
                                         on_delete=fields.CASCADE)
-    
+
+    class Meta:
+        unique_together = (("committee", "department"),)
+        indexes = (("department",),)
 
 
 class User(MiscFields):
@@ -52,7 +55,7 @@ class User(MiscFields):
     email = fields.CharField(max_length=100, null=True, blank=True)
     phone = fields.CharField(max_length=100, null=True, blank=True)
     email = fields.CharField(max_length=100, null=True, blank=True)
-    username = fields.CharField(max_length=100, null=False, blank=False)
+    username = fields.CharField(max_length=100, null=False, blank=False, index=True)
     salt_key = fields.CharField(max_length=500, null=True, blank=True)
     hash_password = fields.CharField(max_length=500, null=True, blank=True)
     is_admin = fields.BooleanField(default=False)
@@ -93,6 +96,10 @@ class UserDepartment(MiscFields):
                                         related_name="user_departments",
                                         on_delete=fields.CASCADE)
 
+    class Meta:
+        unique_together = (("user", "department"),)
+        indexes = (("department",),)
+
     class PydanticMeta:
         pass
 
@@ -107,6 +114,9 @@ class UserCommittee(MiscFields):
                                   related_name="user_committees",
                                   on_delete=fields.CASCADE)
 
+    class Meta:
+        unique_together = (("user", "committee"),)
+        indexes = (("committee",),)
 
     class PydanticMeta:
         pass
@@ -143,7 +153,7 @@ class Event(MiscFields):
     id = fields.IntField(pk=True)
     title = fields.CharField(max_length=100, null=False, blank=False)
     description = fields.TextField(null=True, blank=True)
-    event_type = fields.CharEnumField(EventType, default=EventType.MEETING)
+    event_type = fields.CharEnumField(EventType, default=EventType.MEETING, index=True)
     start_time = fields.DatetimeField(null=True, blank=True)
     end_time = fields.DatetimeField(null=True, blank=True)
     venue = fields.ForeignKeyField('models.Venue',
@@ -152,7 +162,7 @@ class Event(MiscFields):
     author = fields.ForeignKeyField('models.User',
                                     related_name="events",
                                     on_delete=fields.CASCADE)
-    financial_year = fields.CharField(max_length=100, null=True, blank=True)
+    financial_year = fields.CharField(max_length=100, null=True, blank=True, index=True)
     
 
     class PydanticMeta:
@@ -170,6 +180,10 @@ class EventDepartment(MiscFields):
                                         related_name="event_departments",
                                         on_delete=fields.CASCADE)
 
+    class Meta:
+        unique_together = (("event", "department"),)
+        indexes = (("department",),)
+
     class PydanticMeta:
         pass
 
@@ -189,6 +203,10 @@ class EventAttendee(MiscFields):
     manage_minutes = fields.BooleanField(default=False)
     manage_agendas = fields.BooleanField(default=False)
 
+    class Meta:
+        unique_together = (("event", "attendee"),)
+        indexes = (("attendee",),)
+
     class PydanticMeta:
         pass
 
@@ -234,6 +252,13 @@ class EventDocument(MiscFields):
     title = fields.CharField(max_length=100, null=False, blank=False)
     description = fields.TextField(null=True, blank=True)
     file = fields.TextField(null=False, blank=False)
+    # content addressed blob behind ``file``, null on documents uploaded
+    # before blobs were deduplicated
+    blob = fields.ForeignKeyField('models.StoredFile',
+                                  related_name="event_documents",
+                                  null=True,
+                                  on_delete=fields.SET_NULL)
+    filename = fields.CharField(max_length=255, null=True, blank=True)
     author = fields.ForeignKeyField('models.User',
                                     related_name="event_documents",
                                     null=True,
@@ -253,6 +278,10 @@ class EventDocumentDepartment(MiscFields):
                                         related_name="event_document_departments",
                                         on_delete=fields.CASCADE)
 
+    class Meta:
+        unique_together = (("event_document", "department"),)
+        indexes = (("department",),)
+
     class PydanticMeta:
         pass
 
@@ -267,6 +296,9 @@ class EventUserDocumentNote(MiscFields):
                                     on_delete=fields.CASCADE)
     note = fields.TextField(null=True, blank=True)
 
+    class Meta:
+        unique_together = (("event_document", "user"),)
+
 
 class EventCommittee(MiscFields):
     id = fields.IntField(pk=True)
@@ -277,5 +309,122 @@ class EventCommittee(MiscFields):
                                        related_name="event_committees",
                                        on_delete=fields.CASCADE)
 
+    class Meta:
+        unique_together = (("event", "committee"),)
+        indexes = (("committee",),)
+
+    class PydanticMeta:
+        pass
+
+class MessageChannel(enum.Enum):
+    SMS = "sms"
+    EMAIL = "email"
+
+
+class MessageStatus(enum.Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class OutboundMessage(MiscFields):
+    id = fields.IntField(pk=True)
+    channel = fields.CharEnumField(MessageChannel, max_length=20, default=MessageChannel.SMS)
+    status = fields.CharEnumField(MessageStatus, max_length=20, default=MessageStatus.PENDING)
+    recipient = fields.CharField(max_length=255, null=False, blank=False)
+    recipient_name = fields.CharField(max_length=255, null=True, blank=True)
+    title = fields.CharField(max_length=255, null=True, blank=True)
+    message = fields.TextField(null=False, blank=False)
+    # the message body is wiped once it is sent or given up on
+    redact = fields.BooleanField(default=False)
+    attempts = fields.IntField(default=0)
+    last_error = fields.TextField(null=True, blank=True)
+    next_attempt_at = fields.DatetimeField(null=True, blank=True)
+    sent_at = fields.DatetimeField(null=True, blank=True)
+    event = fields.ForeignKeyField('models.Event',
+                                   related_name="outbound_messages",
+                                   null=True,
+                                   on_delete=fields.SET_NULL)
+    user = fields.ForeignKeyField('models.User',
+                                  related_name="outbound_messages",
+                                  null=True,
+                                  on_delete=fields.SET_NULL)
+
+    class Meta:
+        indexes = (("status", "next_attempt_at"),)
+
+    class PydanticMeta:
+        pass
+
+
+class JobStatus(enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+# claim holds the kind while the job is pending or running and is unique,
+# so only one unfinished job of a kind can exist. The job renews
+# lease_until while it makes progress, one past its lease has died.
+class BackgroundJob(MiscFields):
+    id = fields.IntField(pk=True)
+    kind = fields.CharField(max_length=100, null=False, blank=False)
+    status = fields.CharEnumField(JobStatus, max_length=20, default=JobStatus.PENDING)
+    claim = fields.CharField(max_length=100, null=True, unique=True)
+    lease_until = fields.DatetimeField(null=True, blank=True)
+    total = fields.IntField(default=0)
+    processed = fields.IntField(default=0)
+    succeeded = fields.IntField(default=0)
+    failed = fields.IntField(default=0)
+    result = fields.JSONField(null=True)
+    error = fields.TextField(null=True, blank=True)
+    started_at = fields.DatetimeField(null=True, blank=True)
+    finished_at = fields.DatetimeField(null=True, blank=True)
+    author = fields.ForeignKeyField('models.User',
+                                    related_name="background_jobs",
+                                    null=True,
+                                    on_delete=fields.SET_NULL)
+
+    class PydanticMeta:
+        pass
+
+
+# an uploaded blob stored once under the sha256 of its content,
+# ref_count is the number of documents pointing at it
+class StoredFile(MiscFields):
+    id = fields.IntField(pk=True)
+    digest = fields.CharField(max_length=64, unique=True)
+    path = fields.TextField(null=False, blank=False)
+    size = fields.BigIntField(default=0)
+    content_type = fields.CharField(max_length=255, null=True, blank=True)
+    ref_count = fields.IntField(default=0)
+
     class PydanticMeta:
-        pass
\ No newline at end of file
+        pass
+
+
+# denormalized membership of users in events, one row per user and event
+# with the roles the user has there, kept up to date by app.access
+class UserEventAccess(Model):
+    id = fields.IntField(pk=True)
+    user = fields.ForeignKeyField('models.User',
+                                  related_name="event_access",
+                                  on_delete=fields.CASCADE)
+    event = fields.ForeignKeyField('models.Event',
+                                   related_name="user_access",
+                                   on_delete=fields.CASCADE)
+    is_author = fields.BooleanField(default=False)
+    is_attendee = fields.BooleanField(default=False)
+    can_upload = fields.BooleanField(default=False)
+    manage_minutes = fields.BooleanField(default=False)
+    manage_agendas = fields.BooleanField(default=False)
+
+    class Meta:
+        table = "user_event_access"
+        unique_together = (("user", "event"),)
+        indexes = (("event",),)
+
+    class PydanticMeta:
+        pass
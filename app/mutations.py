@@ -7,10 +7,18 @@ from app.login_manager import manager
 from tortoise.queryset import (
     Q,
 )
+from tortoise.exceptions import IntegrityError
+from tortoise.transactions import in_transaction
 from app.middlewares.authentication import login_required
 from app.validators.phone_validator import PhoneValidator
 from graphene_file_upload.scalars import Upload
 from app.manager import MeetingManager
+from app.jobs import start_job
+from app.documents import store_file, release_file, release_files
+from app.cache import tables_changed
+from app.search import annotate_email_lower, users_by_email
+from app.access import attendee_user_ids, refresh_attendee_access, refresh_event_access
+from app.bookings import check_venue
 import pendulum
 
 
@@ -26,9 +34,9 @@ class AuthMutation(graphene.Mutation):
 
     async def mutate(self, info, *args, **kwargs):
         print("kwargs", kwargs)
-        user = await models.User.filter(
+        user = await annotate_email_lower(models.User.all()).filter(
             Q(username=str(kwargs.get("email")).strip().lower())
-            | Q(email=str(kwargs.get("email")).strip().lower())
+            | Q(email_lower=str(kwargs.get("email")).strip().lower())
         ).first()
 
         if not user:
@@ -98,6 +106,7 @@ class CreateDepartmentMutation(graphene.Mutation):
                 success=False, message="Directorate already exists"
             )
         department = await models.Department.create(**kwargs)
+        tables_changed(models.Department)
         return CreateDepartmentMutation(
             success=True,
             message="Directorate created successfully",
@@ -158,6 +167,7 @@ class DeleteDepartmentMutation(graphene.Mutation):
                 success=False, message="Directorate does not exist"
             )
         department = await models.Department.filter(id=kwargs.get("id")).delete()
+        tables_changed(models.Department)
         return DeleteDepartmentMutation(
             success=True,
             message="Directorate deleted successfully",
@@ -235,8 +245,7 @@ class CreateUserMutation(graphene.Mutation):
         print("=====kwargs: ", kwargs)
 
         # check if user already exists by email
-        user = await models.User.filter(email__iexact=kwargs.get("email")).first()
-        if user:
+        if kwargs.get("email") and await users_by_email(kwargs.get("email")).exists():
             return CreateUserMutation(success=False, message="User already exists")
 
         # check if phone is valid
@@ -263,15 +272,14 @@ class CreateUserMutation(graphene.Mutation):
             is_admin=kwargs.get("is_admin"),
             is_staff=kwargs.get("is_staff"),
         )
+        tables_changed(models.User)
 
-        # auto create user departments
-        for department in kwargs.get("departments_ids"):
-            if not await models.UserDepartment.filter(
-                department_id=department, user_id=user.id
-            ).first():
-                await models.UserDepartment.create(
-                    user_id=user.id, department_id=department
-                )
+        # auto create user departments, the unique (user, department)
+        # index skips repeated ids
+        await models.UserDepartment.bulk_create([
+            models.UserDepartment(user_id=user.id, department_id=department)
+            for department in kwargs.get("departments_ids") or []
+        ], ignore_conflicts=True)
 
         return CreateUserMutation(
             success=True, message="User created successfully", user=user
@@ -301,12 +309,9 @@ class UpdateUserMutation(graphene.Mutation):
             return CreateUserMutation(success=False, message="User does not exist")
 
         # check if user already exists by email except the current user
-        user = (
-            await models.User.filter(email__iexact=kwargs.get("email"))
-            .exclude(id=user.id)
-            .first()
-        )
-        if user:
+        if kwargs.get("email") and (
+            await users_by_email(kwargs.get("email")).exclude(id=user.id).exists()
+        ):
             return CreateUserMutation(success=False, message="User already exists")
 
         # check if phone is valid
@@ -354,8 +359,16 @@ class DeleteUserMutation(graphene.Mutation):
         if not user:
             return CreateUserMutation(success=False, message="User does not exist")
 
+        # the events the user authored are deleted with them, their
+        # documents' blob references too
+        blob_ids = await models.EventDocument.filter(
+            event__author_id=user.id, blob_id__isnull=False
+        ).values_list("blob_id", flat=True)
+
         # delete user
         user = await models.User.filter(id=kwargs.get("id")).delete()
+        await release_files(blob_ids)
+        tables_changed(models.User, models.Event)
 
         return CreateUserMutation(
             success=True, message="User deleted successfully", user=user
@@ -435,20 +448,16 @@ class AddUserDepartmentMutation(graphene.Mutation):
                 success=False, message="Department does not exist"
             )
 
-        # check if user department already exists
-        user_department = await models.UserDepartment.filter(
-            user_id=kwargs.get("user_id"), department_id=kwargs.get("department_id")
-        ).first()
-        if user_department:
+        # create user department, unique per user and department
+        try:
+            user_department = await models.UserDepartment.create(
+                user_id=kwargs.get("user_id"), department_id=kwargs.get("department_id")
+            )
+        except IntegrityError:
             return AddUserDepartmentMutation(
                 success=False, message="User Department already exists"
             )
 
-        # create user department
-        user_department = await models.UserDepartment.create(
-            user_id=kwargs.get("user_id"), department_id=kwargs.get("department_id")
-        )
-
         return AddUserDepartmentMutation(
             success=True,
             message="User Department created successfully",
@@ -483,20 +492,16 @@ class RemoveUserDepartmentMutation(graphene.Mutation):
                 success=False, message="Department does not exist"
             )
 
-        # check if user department already exists
+        # remove user department
         user_department = await models.UserDepartment.filter(
             user_id=kwargs.get("user_id"), department_id=kwargs.get("department_id")
-        ).first()
+        ).delete()
+        # check if there was a user department to remove
         if not user_department:
             return RemoveUserDepartmentMutation(
                 success=False, message="User Department does not exist"
             )
 
-        # remove user department
-        user_department = await models.UserDepartment.filter(
-            user_id=kwargs.get("user_id"), department_id=kwargs.get("department_id")
-        ).delete()
-
         return RemoveUserDepartmentMutation(
             success=True,
             message="User Department removed successfully",
@@ -522,6 +527,7 @@ class CreateVenueMutation(graphene.Mutation):
         if venue:
             return CreateVenueMutation(success=False, message="Venue already exists")
         venue = await models.Venue.create(**kwargs)
+        tables_changed(models.Venue)
         return CreateVenueMutation(
             success=True, message="Venue created successfully", venue=venue
         )
@@ -570,7 +576,14 @@ class DeleteVenueMutation(graphene.Mutation):
         venue = await models.Venue.filter(id=kwargs.get("id")).first()
         if not venue:
             return DeleteVenueMutation(success=False, message="Venue does not exist")
+        # events of the venue are deleted with it, their documents' blob
+        # references too
+        blob_ids = await models.EventDocument.filter(
+            event__venue_id=venue.id, blob_id__isnull=False
+        ).values_list("blob_id", flat=True)
         venue = await models.Venue.filter(id=kwargs.get("id")).delete()
+        await release_files(blob_ids)
+        tables_changed(models.Venue, models.Event)
         return DeleteVenueMutation(
             success=True, message="Venue deleted successfully", venue=venue
         )
@@ -620,6 +633,8 @@ class CreateEventMutation(graphene.Mutation):
     success = graphene.Boolean()
     message = graphene.String()
     event = graphene.Field(EventObject)
+    conflicts = graphene.List(EventObject)
+    suggested_slots = graphene.List(TimeSlotObject)
 
     class Arguments:
         title = graphene.String(required=True, description="Event Title")
@@ -650,67 +665,70 @@ class CreateEventMutation(graphene.Mutation):
         kwargs["end_time"] = end_time
         kwargs["author_id"] = info.context["request"].user.id
 
-        # check if venue is available for the event time
-        event = await models.Event.filter(
-            venue_id=kwargs.get("venue_id"),
-            start_time__gte=start_time,
-            end_time__lte=end_time,
-        ).first()
-
-        if event:
+        # check if the event ends after it starts
+        if end_time <= start_time:
             return CreateEventMutation(
-                success=False, message="Venue is not available for the event time"
+                success=False, message="End time must be after start time"
             )
 
-        event = await models.Event.create(**kwargs)
-        
-        for department in kwargs.get("departments", []):
-            if not await models.EventDepartment.filter(
-                department_id=department, event_id=event.id
-            ).first():
-                await models.EventDepartment.create(
-                    event_id=event.id, department_id=department
-                )
-            
-            # get all department users
-            department_users = await models.UserDepartment.filter(
-                department_id=department
-            )
-            
-            # adding department users to event as attendees
-            for department_user in department_users:
-                # check if user is already an attendee
-                if not await models.EventAttendee.filter(
-                    attendee_id=department_user.user_id, event_id=event.id
-                ).first():
-                    await models.EventAttendee.create(
-                        event_id=event.id, attendee_id=department_user.user_id
-                    )
-            
-        
-        
-        for committee in kwargs.get("committees", []):
-            if not await models.EventCommittee.filter(
-                committee_id=committee, event_id=event.id
-            ).first():
-                await models.EventCommittee.create(
-                    event_id=event.id, committee_id=committee
-                )
-            
-            # get all committee users
-            committee_users = await models.UserCommittee.filter(
-                committee_id=committee
+        # check if venue is available for the event time, any overlap counts
+        availability = await check_venue(kwargs.get("venue_id"), start_time, end_time)
+        if not availability.available:
+            return CreateEventMutation(
+                success=False,
+                message="Venue is not available for the event time",
+                conflicts=availability.conflicts,
+                suggested_slots=availability.suggested_slots,
             )
-            
-            for committee_user in committee_users:
-                # check if user is already an attendee
-                if not await models.EventAttendee.filter(
-                    attendee_id=committee_user.user_id, event_id=event.id
-                ).first():
-                    await models.EventAttendee.create(
-                        event_id=event.id, attendee_id=committee_user.user_id
-                    )
 
+        departments = list(dict.fromkeys(kwargs.get("departments") or []))
+        committees = list(dict.fromkeys(kwargs.get("committees") or []))
+
+        try:
+            async with in_transaction():
+                event = await models.Event.create(**kwargs)
+
+                await models.EventDepartment.bulk_create([
+                    models.EventDepartment(event_id=event.id, department_id=department)
+                    for department in departments
+                ])
+                await models.EventCommittee.bulk_create([
+                    models.EventCommittee(event_id=event.id, committee_id=committee)
+                    for committee in committees
+                ])
+
+                # get the distinct department and committee users
+                user_ids = []
+                if departments:
+                    user_ids += await models.UserDepartment.filter(
+                        department_id__in=departments
+                    ).values_list("user_id", flat=True)
+                if committees:
+                    user_ids += await models.UserCommittee.filter(
+                        committee_id__in=committees
+                    ).values_list("user_id", flat=True)
+
+                # adding them to the event as attendees, the unique
+                # (event, attendee) index skips the ones already added
+                await models.EventAttendee.bulk_create([
+                    models.EventAttendee(event_id=event.id, attendee_id=user_id)
+                    for user_id in dict.fromkeys(user_ids)
+                ], ignore_conflicts=True)
+
+                # the author and attendees get their access rows
+                await refresh_event_access(event.id)
+        except IntegrityError:
+            # check if the venue exclusion constraint caught a concurrent booking
+            availability = await check_venue(kwargs.get("venue_id"), start_time, end_time)
+            if availability.available:
+                raise
+            return CreateEventMutation(
+                success=False,
+                message="Venue is not available for the event time",
+                conflicts=availability.conflicts,
+                suggested_slots=availability.suggested_slots,
+            )
+        tables_changed(models.Event)
 
         return CreateEventMutation(
             success=True, message="Event created successfully", event=event
@@ -730,7 +748,13 @@ class DeleteEventMutation(graphene.Mutation):
         event = await models.Event.filter(id=kwargs.get("id")).first()
         if not event:
             return DeleteEventMutation(success=False, message="Event does not exist")
+        # documents are deleted with the event, their blob references too
+        blob_ids = await models.EventDocument.filter(
+            event_id=event.id, blob_id__isnull=False
+        ).values_list("blob_id", flat=True)
         event = await models.Event.filter(id=kwargs.get("id")).delete()
+        await release_files(blob_ids)
+        tables_changed(models.Event)
         return DeleteEventMutation(success=True, message="Event deleted successfully")
 
 
@@ -738,6 +762,8 @@ class UpdateEventMutation(graphene.Mutation):
     success = graphene.Boolean()
     message = graphene.String()
     event = graphene.Field(EventObject)
+    conflicts = graphene.List(EventObject)
+    suggested_slots = graphene.List(TimeSlotObject)
 
     class Arguments:
         id = graphene.Int(required=True, description="Event ID")
@@ -761,27 +787,46 @@ class UpdateEventMutation(graphene.Mutation):
         if not venue:
             return UpdateEventMutation(success=False, message="Venue does not exist")
 
-        # check if venue is available for the event time
-        event = await models.Event.filter(
-            venue_id=kwargs.get("venue_id"),
-            start_time__gte=pendulum.parse(kwargs.get("start_time"), strict=False),
-            end_time__lte=pendulum.parse(kwargs.get("end_time"), strict=False),
-        ).exclude(
-            id=kwargs.get("id")
-        ).first()
-
-        if event:
-            return UpdateEventMutation(
-                success=False, message="Venue is not available for the event time"
-            )
-
         id = kwargs.get("id")
         kwargs.pop("id")
     
         kwargs["start_time"] = pendulum.parse(kwargs.get("start_time"), strict=False)
         kwargs["end_time"] = pendulum.parse(kwargs.get("end_time"), strict=False)
-        
-        event = await models.Event.filter(id=id).update(**kwargs)
+
+        # check if the event ends after it starts
+        if kwargs["end_time"] <= kwargs["start_time"]:
+            return UpdateEventMutation(
+                success=False, message="End time must be after start time"
+            )
+
+        # check if venue is available for the event time, any overlap counts
+        availability = await check_venue(
+            kwargs.get("venue_id"), kwargs["start_time"], kwargs["end_time"], exclude_event_id=id
+        )
+        if not availability.available:
+            return UpdateEventMutation(
+                success=False,
+                message="Venue is not available for the event time",
+                conflicts=availability.conflicts,
+                suggested_slots=availability.suggested_slots,
+            )
+
+        try:
+            event = await models.Event.filter(id=id).update(**kwargs)
+        except IntegrityError:
+            # check if the venue exclusion constraint caught a concurrent booking
+            availability = await check_venue(
+                kwargs.get("venue_id"), kwargs["start_time"], kwargs["end_time"], exclude_event_id=id
+            )
+            if availability.available:
+                raise
+            return UpdateEventMutation(
+                success=False,
+                message="Venue is not available for the event time",
+                conflicts=availability.conflicts,
+                suggested_slots=availability.suggested_slots,
+            )
+        tables_changed(models.Event)
         return UpdateEventMutation(
             success=True, 
             message="Event updated successfully", 
@@ -816,20 +861,16 @@ class AddEventDepartmentMutation(graphene.Mutation):
                 success=False, message="Department does not exist"
             )
 
-        # check if event department already exists
-        event_department = await models.EventDepartment.filter(
-            event_id=kwargs.get("event_id"), department_id=kwargs.get("department_id")
-        ).first()
-        if event_department:
+        # create event department, unique per event and department
+        try:
+            event_department = await models.EventDepartment.create(
+                event_id=kwargs.get("event_id"), department_id=kwargs.get("department_id")
+            )
+        except IntegrityError:
             return AddEventDepartmentMutation(
                 success=False, message="Event Department already exists"
             )
 
-        # create event department
-        event_department = await models.EventDepartment.create(
-            event_id=kwargs.get("event_id"), department_id=kwargs.get("department_id")
-        )
-
         return AddEventDepartmentMutation(
             success=True,
             message="Event Department created successfully",
@@ -864,20 +905,16 @@ class RemoveEventDepartmentMutation(graphene.Mutation):
                 success=False, message="Department does not exist"
             )
 
-        # check if event department already exists
+        # remove event department
         event_department = await models.EventDepartment.filter(
             event_id=kwargs.get("event_id"), department_id=kwargs.get("department_id")
-        ).first()
+        ).delete()
+        # check if there was an event department to remove
         if not event_department:
             return RemoveEventDepartmentMutation(
                 success=False, message="Event Department does not exist"
             )
 
-        # remove event department
-        event_department = await models.EventDepartment.filter(
-            event_id=kwargs.get("event_id"), department_id=kwargs.get("department_id")
-        ).delete()
-
         return RemoveEventDepartmentMutation(
             success=True,
             message="Event Department removed successfully",
@@ -910,20 +947,18 @@ class AddEventAttendeeMutation(graphene.Mutation):
                 success=False, message="User does not exist"
             )
 
-        # check if event attendee already exists
-        event_attendee = await models.EventAttendee.filter(
-            event_id=kwargs.get("event_id"), attendee_id=kwargs.get("attendee_id")
-        ).first()
-        if event_attendee:
+        # create event attendee, unique per event and attendee
+        try:
+            async with in_transaction():
+                event_attendee = await models.EventAttendee.create(
+                    event_id=kwargs.get("event_id"), attendee_id=kwargs.get("attendee_id")
+                )
+                await refresh_event_access(kwargs.get("event_id"), [kwargs.get("attendee_id")])
+        except IntegrityError:
             return AddEventAttendeeMutation(
                 success=False, message="Event Attendee already exists"
             )
 
-        # create event attendee
-        event_attendee = await models.EventAttendee.create(
-            event_id=kwargs.get("event_id"), attendee_id=kwargs.get("attendee_id")
-        )
-
         return AddEventAttendeeMutation(
             success=True,
             message="Event Attendee created successfully",
@@ -934,7 +969,7 @@ class AddEventAttendeeMutation(graphene.Mutation):
 class BulkAddEventAttendeeMutation(graphene.Mutation):
     success = graphene.Boolean()
     message = graphene.String()
-    event_attendee = graphene.Field(EventAttendeeObject)
+    event_attendee = graphene.List(EventAttendeeObject)
 
     class Arguments:
         event_id = graphene.Int(required=True)
@@ -942,37 +977,48 @@ class BulkAddEventAttendeeMutation(graphene.Mutation):
 
     @login_required
     async def mutate(self, info, *args, **kwargs):
+        event_id = kwargs.get("event_id")
+        attendee_ids = list(dict.fromkeys(kwargs.get("attendee_ids")))
+
         # check if event already exists by id
-        event = await models.Event.filter(id=kwargs.get("event_id")).first()
+        event = await models.Event.filter(id=event_id).first()
         if not event:
-            return AddEventAttendeeMutation(
+            return BulkAddEventAttendeeMutation(
                 success=False, message="Event does not exist"
             )
 
-        # check if user already exists by id
-        user = await models.User.filter(id__in=kwargs.get("attendee_ids")).first()
-        if not user:
-            return AddEventAttendeeMutation(
-                success=False, message="User does not exist"
-            )
-
-        # create event attendee
-        added = []
-        for attendee_id in kwargs.get("attendee_ids"):
-            # check if event attendee already exists
-            event_attendee = await models.EventAttendee.filter(
-                event_id=kwargs.get("event_id"), attendee_id=attendee_id
-            ).exists()
-            if not event_attendee:
-                event_attendee = await models.EventAttendee.create(
-                    event_id=kwargs.get("event_id"), attendee_id=attendee_id
+        async with in_transaction():
+            # check if users already exists by id
+            user_ids = set(await models.User.filter(
+                id__in=attendee_ids
+            ).values_list("id", flat=True))
+            if not user_ids:
+                return BulkAddEventAttendeeMutation(
+                    success=False, message="User does not exist"
                 )
-                added.append(event_attendee.id)
 
-        return AddEventAttendeeMutation(
+            # skip the users already attending the event
+            existing_ids = set(await models.EventAttendee.filter(
+                event_id=event_id, attendee_id__in=attendee_ids
+            ).values_list("attendee_id", flat=True))
+            added_ids = [
+                attendee_id for attendee_id in attendee_ids
+                if attendee_id in user_ids and attendee_id not in existing_ids
+            ]
+
+            # create event attendees
+            await models.EventAttendee.bulk_create([
+                models.EventAttendee(event_id=event_id, attendee_id=attendee_id)
+                for attendee_id in added_ids
+            ], ignore_conflicts=True)
+            await refresh_event_access(event_id, added_ids)
+
+        return BulkAddEventAttendeeMutation(
             success=True,
             message="Event Attendee created successfully",
-            event_attendee=await models.EventAttendee.filter(id__in=added).all(),
+            event_attendee=await models.EventAttendee.filter(
+                event_id=event_id, attendee_id__in=added_ids
+            ).order_by("id"),
         )
 
 
@@ -1002,11 +1048,14 @@ class RemoveEventAttendeeMutation(graphene.Mutation):
             return RemoveEventAttendeeMutation(
                 success=False, message="Event Attendee does not exist"
             )
+        event_attendee_user_id = event_attendee.attendee_id
 
         # remove event attendee
-        event_attendee = await models.EventAttendee.filter(
-            event_id=kwargs.get("event_id"), id=kwargs.get("attendee_id")
-        ).delete()
+        async with in_transaction():
+            event_attendee = await models.EventAttendee.filter(
+                event_id=kwargs.get("event_id"), id=kwargs.get("attendee_id")
+            ).delete()
+            await refresh_event_access(event.id, [event_attendee_user_id])
 
         return RemoveEventAttendeeMutation(
             success=True,
@@ -1028,17 +1077,20 @@ class BulkRemoveEventAttendeeMutation(graphene.Mutation):
         # check if event already exists by id
         event = await models.Event.filter(id=kwargs.get("event_id")).first()
         if not event:
-            return RemoveEventAttendeeMutation(
+            return BulkRemoveEventAttendeeMutation(
                 success=False, message="Event does not exist"
             )
 
-        # remove event attendee
-        for attendee_id in kwargs.get("attendee_ids"):
-            event_attendee = await models.EventAttendee.filter(
-                event_id=kwargs.get("event_id"), id=attendee_id
-            ).delete()
+        # remove event attendees
+        async with in_transaction():
+            removed = models.EventAttendee.filter(
+                event_id=kwargs.get("event_id"), id__in=kwargs.get("attendee_ids")
+            )
+            user_ids = await removed.values_list("attendee_id", flat=True)
+            await removed.delete()
+            await refresh_event_access(event.id, user_ids)
 
-        return RemoveEventAttendeeMutation(
+        return BulkRemoveEventAttendeeMutation(
             success=True,
             message="Event Attendees removed successfully",
         )
@@ -1157,7 +1209,6 @@ class CreateEventDocumentMutation(graphene.Mutation):
 
     @login_required
     async def mutate(self, info, *args, **kwargs):
-        from services.minio import MinioUploader
         print("=====kwargs: ", kwargs)
         # check if event already exists by id
         event = await models.Event.filter(id=kwargs.get("event_id")).first()
@@ -1177,45 +1228,43 @@ class CreateEventDocumentMutation(graphene.Mutation):
             )
 
         # graphene receive a file and save it in a temporary file
-        # we need to read it and upload it to minio
+        # it is stored once per content under its digest
         file = kwargs.get("file")
         # process file of type starlette.datastructures.UploadFile
-        file = MinioUploader().upload(file)
-
-        kwargs["file"] = file
+        blob = await store_file(file)
 
         # create event document
-        event_document = await models.EventDocument.create(
-            event_id=kwargs.get("event_id"),
-            title=kwargs.get("title"),
-            description=kwargs.get("description"),
-            file=kwargs.get("file"),
-            author_id=info.context['request'].user.id
-        )
+        try:
+            event_document = await models.EventDocument.create(
+                event_id=kwargs.get("event_id"),
+                title=kwargs.get("title"),
+                description=kwargs.get("description"),
+                file=blob.path,
+                blob_id=blob.id,
+                filename=file.filename,
+                author_id=info.context['request'].user.id
+            )
+        except Exception:
+            await release_file(blob.id)
+            raise
         
         
         if kwargs.get("department_id"):
             department_id = kwargs.get("department_id")
-            # check if EventDocumentDepartment already exists
-            event_document_department = await models.EventDocumentDepartment.filter(
-                event_document_id=event_document.id,
-                department_id=department_id
-            ).first()
-            if not event_document_department:
-                await models.EventDocumentDepartment.create(
+            # link the document and the event to the department, the
+            # unique indexes skip the links that exist already
+            await models.EventDocumentDepartment.bulk_create([
+                models.EventDocumentDepartment(
                     event_document_id=event_document.id,
                     department_id=department_id
                 )
-            # check if event department already exists
-            event_department = await models.EventDepartment.filter(
-                event_id=kwargs.get("event_id"),
-                department_id=department_id,
-            ).first()
-            if not event_department:
-                await models.EventDepartment.create(
+            ], ignore_conflicts=True)
+            await models.EventDepartment.bulk_create([
+                models.EventDepartment(
                     event_id=kwargs.get("event_id"),
                     department_id=department_id,
                 )
+            ], ignore_conflicts=True)
 
         return CreateEventDocumentMutation(
             success=True,
@@ -1244,12 +1293,21 @@ class UpdateEventDocumentMutation(graphene.Mutation):
                 success=False, message="Event Document does not exist"
             )
 
+        # store the new file before the old one is released
+        file = kwargs.get("file")
+        blob = await store_file(file)
+        previous_blob_id = event_document.blob_id
+
         # update event document
-        event_document = await models.EventDocument.filter(id=kwargs.get("id")).update(
+        await models.EventDocument.filter(id=kwargs.get("id")).update(
             title=kwargs.get("title"),
             description=kwargs.get("description"),
-            file=kwargs.get("file"),
+            file=blob.path,
+            blob_id=blob.id,
+            filename=file.filename,
         )
+        await release_file(previous_blob_id)
+        event_document = await models.EventDocument.filter(id=kwargs.get("id")).first()
 
         return UpdateEventDocumentMutation(
             success=True,
@@ -1274,8 +1332,9 @@ class DeleteEventDocumentMutation(graphene.Mutation):
                 success=False, message="Event Document does not exist"
             )
 
-        # delete event document
-        event_document = await models.EventDocument.filter(id=kwargs.get("id")).delete()
+        # delete event document, the blob goes with its last document
+        await models.EventDocument.filter(id=kwargs.get("id")).delete()
+        await release_file(event_document.blob_id)
 
         return DeleteEventDocumentMutation(
             success=True, message="Event Document deleted successfully"
@@ -1310,6 +1369,7 @@ class CreateUserCredentialsMutation(graphene.Mutation):
 class CreateAllUsersCredentialsMutation(graphene.Mutation):
     success = graphene.Boolean()
     message = graphene.String()
+    job = graphene.Field(BackgroundJobObject)
     
     class Arguments:
         pass
@@ -1317,16 +1377,17 @@ class CreateAllUsersCredentialsMutation(graphene.Mutation):
     @login_required
     async def mutate(self, info, *args, **kwargs):
         from app.manager import MeetingManager
-        # check if user already exists
-        users = await models.User.filter(hash_password__isnull=True, salt_key__isnull=True)
-        
-        for user in users:
-            try:
-                await MeetingManager().create_user_credentials(user)
-            except:
-                pass
+        # the credentials are created in the background, follow the job
+        # through the background_job query
+        job = await start_job(
+            "create_all_users_credentials",
+            MeetingManager().provision_user_credentials,
+            author_id=info.context["request"].user.id,
+        )
         
-        return CreateAllUsersCredentialsMutation(success=True, message="User credentials created successfully")
+        return CreateAllUsersCredentialsMutation(
+            success=True, message="User credentials are being created", job=job
+        )
 
 
 
@@ -1334,16 +1395,23 @@ class CreateAllUsersCredentialsMutation(graphene.Mutation):
 class SyncUsersMutation(graphene.Mutation):
     success = graphene.Boolean()
     message = graphene.String()
+    inserted = graphene.Int()
+    updated = graphene.Int()
+    skipped = graphene.Int()
+    invalid = graphene.Int()
     
     @login_required
     async def mutate(self, info, *args, **kwargs):
         from app.manager import MeetingManager
-        # check if user already exists
-        sync = await MeetingManager().sync_users()
-        if not sync:
-            return SyncUsersMutation(success=False, message="Users not synced")
-        
-        return SyncUsersMutation(success=True, message="Users synced successfully")
+        # create or update the users from users.json
+        counts = await MeetingManager().sync_users()
+        tables_changed(models.User)
+
+        return SyncUsersMutation(
+            success=True,
+            message="Users synced successfully",
+            **counts
+        )
 
 
 
@@ -1364,6 +1432,7 @@ class CreateCommitteeMutation(graphene.Mutation):
         if committee:
             return CreateCommitteeMutation(success=False, message="Committee already exists")
         committee = await models.Committee.create(**kwargs)
+        tables_changed(models.Committee)
         return CreateCommitteeMutation(
             success=True, message="Committee created successfully", committee=committee
         )
@@ -1397,6 +1466,7 @@ class UpdateCommitteeMutation(graphene.Mutation):
         except:
             pass
         committee = await models.Committee.filter(id=kwargs.get("id")).update(**kwargs_copy)
+        tables_changed(models.Committee)
         return UpdateCommitteeMutation(
             success=True, message="Committee updated successfully", committee=await models.Committee.filter(id=kwargs.get("id")).first()
         )
@@ -1416,6 +1486,7 @@ class DeleteCommitteeMutation(graphene.Mutation):
         if not committee:
             return DeleteCommitteeMutation(success=False, message="Committee does not exist")
         committee = await models.Committee.filter(id=kwargs.get("id")).delete()
+        tables_changed(models.Committee)
         return DeleteCommitteeMutation(success=True, message="Committee deleted successfully")
 
 
@@ -1435,6 +1506,7 @@ class BlockUnblockCommitteeMutation(graphene.Mutation):
         if not committee:
             return BlockUnblockCommitteeMutation(success=False, message="Committee does not exist")
         committee = await models.Committee.filter(id=kwargs.get("id")).update(is_active=kwargs.get("block"))
+        tables_changed(models.Committee)
         return BlockUnblockCommitteeMutation(success=True, message="Committee blocked successfully", committee=committee)
 
 
@@ -1454,6 +1526,7 @@ class BlockCommitteeMutation(graphene.Mutation):
         if not committee:
             return BlockCommitteeMutation(success=False, message="Committee does not exist")
         committee = await models.Committee.filter(id=kwargs.get("id")).update(is_active=False)
+        tables_changed(models.Committee)
         return BlockCommitteeMutation(success=True, message="Committee blocked successfully", committee=committee)
 
 
@@ -1472,6 +1545,7 @@ class UnblockCommitteeMutation(graphene.Mutation):
         if not committee:
             return UnblockCommitteeMutation(success=False, message="Committee does not exist")
         committee = await models.Committee.filter(id=kwargs.get("id")).update(is_active=True)
+        tables_changed(models.Committee)
         return UnblockCommitteeMutation(success=True, message="Committee unblocked successfully", committee=committee)
 
 
@@ -1495,12 +1569,12 @@ class AddCommitteeMemberMutation(graphene.Mutation):
         if not await models.User.filter(id=kwargs.get("user_id")).exists():
             return AddCommitteeMemberMutation(success=False, message="User does not exist")
         
-        # check if committee member already exists
-        if await models.UserCommittee.filter(committee_id=kwargs.get("committee_id"), user_id=kwargs.get("user_id")).exists():
+        # create committee member, unique per committee and user
+        try:
+            user_committee = await models.UserCommittee.create(committee_id=kwargs.get("committee_id"), user_id=kwargs.get("user_id"))
+        except IntegrityError:
             return AddCommitteeMemberMutation(success=False, message="Committee Member already exists")
         
-        user_committee = await models.UserCommittee.create(committee_id=kwargs.get("committee_id"), user_id=kwargs.get("user_id"))
-        
         return AddCommitteeMemberMutation(
             success=True, message="Committee Member created successfully", committee_member=user_committee)
     
@@ -1513,11 +1587,10 @@ class DeleteCommitteeMemberMutation(graphene.Mutation):
     
     @login_required
     async def mutate(self, info, *args, **kwargs):
-        # check if committee member already exists
-        if not await models.UserCommittee.filter(id=kwargs.get("id")).exists():
-            return DeleteCommitteeMemberMutation(success=False, message="Committee Member does not exist")
-        
         user_committee = await models.UserCommittee.filter(id=kwargs.get("id")).delete()
+        # check if there was a committee member to delete
+        if not user_committee:
+            return DeleteCommitteeMemberMutation(success=False, message="Committee Member does not exist")
         
         return DeleteCommitteeMemberMutation(success=True, message="Committee Member deleted successfully")
 
@@ -1535,12 +1608,10 @@ class ForgotPasswordMutation(graphene.Mutation):
         email = kwargs.get("email").strip().lower()
         
         # check if user already exists
-        if not await models.User.filter(email__iexact=email).exists():
+        user = await users_by_email(email).first()
+        if not user:
             return ForgotPasswordMutation(success=False, message=f"User with email {email} does not exist")
         
-        # get user 
-        user = await models.User.filter(email__iexact=email).first()
-        
         # check if user has a phone number
         if not user.phone:
             return ForgotPasswordMutation(success=False, message=f"User with email {email} does not have a phone number, please contact System Administrator for assistance")
@@ -1566,11 +1637,10 @@ class VerifyOtpMutation(graphene.Mutation):
         # sanitize email 
         email = kwargs.get("email").strip().lower()
         # check if user already exists
-        if not models.User.filter(email__iexact=email).exists():
+        user = await users_by_email(email).first()
+        if not user:
             return VerifyOtpMutation(success=False, message=f"User with email {email} does not exist")
         
-        user = await models.User.filter(email__iexact=email).first()
-        
         # sanitize otp 
         otp = kwargs.get("otp").strip()
         # check if user otp is valid 
@@ -1599,11 +1669,10 @@ class UserChangePasswordMutation(graphene.Mutation):
         email = kwargs.get("email").strip().lower()
         
         # check if user exists by email 
-        if not models.User.filter(email__iexact=email).exists():
+        user = await users_by_email(email).first()
+        if not user:
             return UserChangePasswordMutation(success=False, message=f"User with email {email} does not exist")
         
-        user = await models.User.filter(email__iexact=email).first()
-        
         # check if user otp is valid and not used 
         user_otp = await models.UserOTP.filter(user_id=user.id, token=kwargs.get("otp"), is_used=False).first()
         
@@ -1645,13 +1714,12 @@ class AddCommitteDepartmentMutation(graphene.Mutation):
         if not await models.Department.filter(id=kwargs.get("department_id")).exists():
             return AddCommitteDepartmentMutation(success=False, message="Department does not exist")
         
-        # check if committee department already exists
-        if await models.CommitteeDepartment.filter(committee_id=kwargs.get("committee_id"), department_id=kwargs.get("department_id")).exists():
+        # create committee department, unique per committee and department
+        try:
+            committee_department = await models.CommitteeDepartment.create(committee_id=kwargs.get("committee_id"), department_id=kwargs.get("department_id"))
+        except IntegrityError:
             return AddCommitteDepartmentMutation(success=False, message="Committee Department already exists")
         
-        # create committee department
-        committee_department = await models.CommitteeDepartment.create(committee_id=kwargs.get("committee_id"), department_id=kwargs.get("department_id"))
-        
         return AddCommitteDepartmentMutation(success=True, message="Committee Department added successfully", committee_department=committee_department)
 
 
@@ -1673,12 +1741,11 @@ class RemoveCommitteDepartmentMutation(graphene.Mutation):
         if not await models.Department.filter(id=kwargs.get("department_id")).exists():
             return RemoveCommitteDepartmentMutation(success=False, message="Department does not exist")
         
-        # check if committee department already exists
-        if not await models.CommitteeDepartment.filter(committee_id=kwargs.get("committee_id"), department_id=kwargs.get("department_id")).exists():
-            return RemoveCommitteDepartmentMutation(success=False, message="Committee Department does not exist")
-        
         # delete committee department
-        await models.CommitteeDepartment.filter(committee_id=kwargs.get("committee_id"), department_id=kwargs.get("department_id")).delete()
+        deleted = await models.CommitteeDepartment.filter(committee_id=kwargs.get("committee_id"), department_id=kwargs.get("department_id")).delete()
+        # check if there was a committee department to delete
+        if not deleted:
+            return RemoveCommitteDepartmentMutation(success=False, message="Committee Department does not exist")
         
         return RemoveCommitteDepartmentMutation(success=True, message="Committee Department removed successfully")        
 
@@ -1700,18 +1767,19 @@ class CreateEventDocumentNoteMutation(graphene.Mutation):
         if not await models.EventDocument.filter(id=kwargs.get("document_id")).exists():
             return CreateEventDocumentNoteMutation(success=False, message="Document does not exist")
         
-        if await models.EventUserDocumentNote.filter(event_document_id=kwargs.get("document_id"), user_id=info.context['request'].user.id).exists():
-            await models.EventUserDocumentNote.filter(event_document_id=kwargs.get("document_id"), user_id=info.context['request'].user.id).update(
-                note=kwargs.get("note")
-            )
-        else:
-            # create document note
-            await models.EventUserDocumentNote.create(event_document_id=kwargs.get("document_id"), user_id=info.context['request'].user.id, note=kwargs.get("note"))
+        # update the user's note of the document, create it when there is none
+        notes = models.EventUserDocumentNote.filter(event_document_id=kwargs.get("document_id"), user_id=info.context['request'].user.id)
+        if not await notes.update(note=kwargs.get("note")):
+            try:
+                await models.EventUserDocumentNote.create(event_document_id=kwargs.get("document_id"), user_id=info.context['request'].user.id, note=kwargs.get("note"))
+            except IntegrityError:
+                # check if a concurrent request created the note first
+                await notes.update(note=kwargs.get("note"))
     
         
         return CreateEventDocumentNoteMutation(success=True, 
                                                message="Document Note added successfully", 
-                                               event_document_note=await models.EventUserDocumentNote.filter(event_document_id=kwargs.get("document_id"), user_id=info.context['request'].user.id).first(),
+                                               event_document_note=await notes.first(),
                                                event_document=await models.EventDocument.filter(id=kwargs.get("document_id")).first())
 
 
@@ -1735,22 +1803,18 @@ class AddEventCommitteeMutation(graphene.Mutation):
         if not await models.Committee.filter(id=kwargs.get("committee_id")).exists():
             return AddEventCommitteeMutation(success=False, message="Committee does not exist")
         
-        # check if event committee already exists
-        if await models.EventCommittee.filter(event_id=kwargs.get("event_id"), committee_id=kwargs.get("committee_id")).exists():
+        # create event committee, unique per event and committee
+        try:
+            event_committee = await models.EventCommittee.create(
+                event_id=kwargs.get("event_id"), 
+                committee_id=kwargs.get("committee_id"))
+        except IntegrityError:
             return AddEventCommitteeMutation(success=False, message="Event Committee already exists")
         
-        # create event committee
-        await models.EventCommittee.create(
-            event_id=kwargs.get("event_id"), 
-            committee_id=kwargs.get("committee_id"))
-        
         return AddEventCommitteeMutation(
             success=True, 
             message="Event Committee added successfully", 
-            event_committee=await models.EventCommittee.filter(
-                event_id=kwargs.get("event_id"),
-                committee_id=kwargs.get("committee_id")
-            ).first())
+            event_committee=event_committee)
 
 
 
@@ -1772,12 +1836,11 @@ class DeleteEventCommitteeMutation(graphene.Mutation):
         if not await models.Committee.filter(id=kwargs.get("committee_id")).exists():
             return DeleteEventCommitteeMutation(success=False, message="Committee does not exist")
         
-        # check if event committee already exists
-        if not await models.EventCommittee.filter(event_id=kwargs.get("event_id"), committee_id=kwargs.get("committee_id")).exists():
-            return DeleteEventCommitteeMutation(success=False, message="Event Committee does not exist")
-        
         # delete event committee
-        await models.EventCommittee.filter(event_id=kwargs.get("event_id"), committee_id=kwargs.get("committee_id")).delete()
+        deleted = await models.EventCommittee.filter(event_id=kwargs.get("event_id"), committee_id=kwargs.get("committee_id")).delete()
+        # check if there was an event committee to delete
+        if not deleted:
+            return DeleteEventCommitteeMutation(success=False, message="Event Committee does not exist")
         
         return DeleteEventCommitteeMutation(success=True, message="Event Committee removed successfully")
 
@@ -1785,9 +1848,11 @@ class DeleteEventCommitteeMutation(graphene.Mutation):
 class SendMeetingInvitationSmsAllAttendees(graphene.Mutation):
     success = graphene.Boolean()
     message = graphene.String()
+    queued = graphene.Int()
     
     class Arguments:
         event_id = graphene.Int(required=True, description="Event ID")
+        email = graphene.Boolean(required=False, description="Send an email invitation too")
     
     @login_required
     async def mutate(self, info, *args, **kwargs):
@@ -1795,12 +1860,17 @@ class SendMeetingInvitationSmsAllAttendees(graphene.Mutation):
         if not event:
             return SendMeetingInvitationSmsAllAttendees(success=False, message="Event does not exist")
         
-        manager = await MeetingManager().send_all_meeting_attendee_invitation(event)
+        # the messages are sent in the background, see outbound_messages
+        queued = await MeetingManager().send_all_meeting_attendee_invitation(
+            event, email=bool(kwargs.get("email"))
+        )
         
-        if not manager:
-            return SendMeetingInvitationSmsAllAttendees(success=False, message="SMS not sent")
+        if not queued:
+            return SendMeetingInvitationSmsAllAttendees(success=False, message="SMS not sent", queued=0)
     
-        return SendMeetingInvitationSmsAllAttendees(success=True, message="SMS sent successfully")
+        return SendMeetingInvitationSmsAllAttendees(
+            success=True, message=f"{queued} messages queued for sending", queued=queued
+        )
 
 
 class SendMeetingInvitationAttendee(graphene.Mutation):
@@ -1821,7 +1891,7 @@ class SendMeetingInvitationAttendee(graphene.Mutation):
                 attendee
             )
             if manager:
-                return SendMeetingInvitationAttendee(success=True, message="SMS sent successfully")
+                return SendMeetingInvitationAttendee(success=True, message="SMS queued for sending")
         return SendMeetingInvitationAttendee(success=False, message="SMS not sent")
 
 
@@ -1928,7 +1998,10 @@ class AddDocumentManagerMutation(graphene.Mutation):
             return AddDocumentManagerMutation(success=False, message="Attendee does not exist")
         
         # update attendee can upload 
-        await models.EventAttendee.filter(id=kwargs.get("id")).update(can_upload=True)
+        async with in_transaction():
+            pairs = await attendee_user_ids([kwargs.get("id")])
+            await models.EventAttendee.filter(id=kwargs.get("id")).update(can_upload=True)
+            await refresh_attendee_access(pairs)
         return AddDocumentManagerMutation(success=True, message="Attendee can upload successfully")
 
 
@@ -1946,7 +2019,10 @@ class RemoveDocumentManagerMutation(graphene.Mutation):
             return RemoveDocumentManagerMutation(success=False, message="Attendee does not exist")
         
         # update attendee can upload 
-        await models.EventAttendee.filter(id=kwargs.get("id")).update(can_upload=False)
+        async with in_transaction():
+            pairs = await attendee_user_ids([kwargs.get("id")])
+            await models.EventAttendee.filter(id=kwargs.get("id")).update(can_upload=False)
+            await refresh_attendee_access(pairs)
         return RemoveDocumentManagerMutation(success=True, message="Attendee can upload successfully")
 
 
@@ -1,10 +1,11 @@
 import graphene
 from app import models
 from app.graphene_custom_fields import JSON
+from app.loaders import get_loaders
+from app.permissions import get_permissions
 from settings import settings
 from app.models import *
-import pendulum
-import math
+from app.fiscal import fiscal_week, fiscal_year_label, quarter_label
 
 class DataObject(graphene.ObjectType):
     data = JSON()
@@ -28,8 +29,11 @@ class MiscPaginatedObject(graphene.ObjectType):
     total = graphene.Int()
     page = graphene.Int()
     pages = graphene.Int()
+    approximate = graphene.Boolean()
     has_next = graphene.Boolean()
     has_prev = graphene.Boolean()
+    start_cursor = graphene.String()
+    end_cursor = graphene.String()
 
 
 
@@ -47,14 +51,12 @@ class UserObject(MiscFieldObject):
     committees = graphene.List(lambda: CommitteeObject)
     
     async def resolve_departments(self, info, **kwargs):
-        # get user departments 
-        user_departments = [ud.department_id for ud in await UserDepartment.filter(user=self.id).all()]
-        return await Department.filter(id__in=user_departments).all()
+        # get user departments
+        return await get_loaders(info).user_departments.load(self.id)
 
     async def resolve_committees(self, info, **kwargs):
-        # get user committees 
-        user_committees = [uc.committee_id for uc in await UserCommittee.filter(user=self.id).all()]
-        return await Committee.filter(id__in=user_committees).all()
+        # get user committees
+        return await get_loaders(info).user_committees.load(self.id)
 
     async def resolve_can_edit(self, info, *args, **kwargs):
         try:
@@ -91,22 +93,13 @@ class DepartmentObject(MiscFieldObject):
     description = graphene.String()
     
     async def resolve_can_edit(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        return False
+        return await get_permissions(info).is_admin()
     
     async def resolve_can_delete(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        return False
+        return await get_permissions(info).is_admin()
     
     async def resolve_can_manage(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        return False
+        return await get_permissions(info).is_admin()
 
 
 class DepartmentPaginatedObject(MiscPaginatedObject):
@@ -116,24 +109,21 @@ class DepartmentPaginatedObject(MiscPaginatedObject):
 class UserDepartmentObject(MiscFieldObject):
     user = graphene.Field(UserObject)
     department = graphene.Field(DepartmentObject)
+
+    async def resolve_user(self, info, **kwargs):
+        return await get_loaders(info).user.load(self.user_id)
+
+    async def resolve_department(self, info, **kwargs):
+        return await get_loaders(info).department.load(self.department_id)
     
     async def resolve_can_edit(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        return False
+        return await get_permissions(info).is_admin()
     
     async def resolve_can_delete(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        return False
+        return await get_permissions(info).is_admin()
     
     async def resolve_can_manage(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        return False
+        return await get_permissions(info).is_admin()
 
 class UserDepartmentPaginatedObject(MiscPaginatedObject):
     results = graphene.List(UserDepartmentObject)
@@ -149,22 +139,13 @@ class VenueObject(MiscFieldObject):
         return self.venue_type.name
     
     async def resolve_can_edit(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        return False
+        return await get_permissions(info).is_admin()
     
     async def resolve_can_delete(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        return False
+        return await get_permissions(info).is_admin()
     
     async def resolve_can_manage(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        return False
+        return await get_permissions(info).is_admin()
 
 
 class VenuePaginatedObject(MiscPaginatedObject):
@@ -184,51 +165,34 @@ class EventObject(MiscFieldObject):
     author = graphene.Field(UserObject)
     attendees = graphene.List(lambda: UserObject)
     quarter = graphene.String()
+    fiscal_week = graphene.Int()
     financial_year = graphene.String()
     manage_documents = graphene.Boolean()
     manage_agendas = graphene.Boolean()
     manage_minutes = graphene.Boolean()
     
     async def resolve_quarter(self, info, *args, **kwargs):
-        sd = pendulum.parse(str(self.start_time), strict=False)
-        years = []
-        if sd.month >= 7:
-            years = [sd.year, int(sd.year) + 1]
-            start_date = pendulum.parse(f"07/01/{years[0]}", strict=False)
-            end_date = start_date.add(months=12).subtract(days=1)
-            # create date range for the financial year
-            date_range = pendulum.period(start_date, end_date).range('days')
-            date_range = list(date_range)
-            # get all teh dates in the date range
-            dates = [str(d.date()) for d in date_range]
-            # split the dates into 4 quarters of 3 months each
-            splitted_dates = []
-            for d in dates:
-                three_month_dates = []
-                
-                
-                
-            return f"Q1"
-        else:
-            years = [int(sd.year) - 1, sd.year]
-            start_date = pendulum.parse(f"07/01/{years[0]}", strict=False)
-            end_date = start_date.add(months=12).subtract(days=1)
-            # create date range for the financial year
-            date_range = pendulum.period(start_date, end_date).range('days')
-            date_range = list(date_range)
-            # create group of 3 months from the date range
-            quarter_date_range = [date_range[i:i + 3] for i in range(0, len(date_range), 3)]
-            # check if teh sd is in which group of 3 months and return the index
-            for i, qdr in enumerate(quarter_date_range):
-                if sd in qdr:
-                    q = f"Q{i + 1}"
-                    print("Q", q)
-                    return q
-        
-    
+        return quarter_label(self.start_time)
+
+    async def resolve_fiscal_week(self, info, *args, **kwargs):
+        if self.start_time is None:
+            return None
+        return fiscal_week(self.start_time)
+
+    async def resolve_financial_year(self, info, *args, **kwargs):
+        # check if the event was saved without one, it follows from the date
+        if self.financial_year or self.start_time is None:
+            return self.financial_year
+        return fiscal_year_label(self.start_time)
+
+    async def resolve_venue(self, info, **kwargs):
+        return await get_loaders(info).venue.load(self.venue_id)
+
+    async def resolve_author(self, info, **kwargs):
+        return await get_loaders(info).user.load(self.author_id)
+
     async def resolve_attendees(self, info, **kwargs):
-        event_attendees = [ea.attendee_id for ea in await EventAttendee.filter(event=self.id).all()]
-        return await User.filter(id__in=event_attendees).all()
+        return await get_loaders(info).event_attendees.load(self.id)
     
     async def resolve_event_type(self, info, **kwargs):
         try:
@@ -243,43 +207,40 @@ class EventObject(MiscFieldObject):
             return None
     
     async def resolve_can_edit(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
+        permissions = get_permissions(info)
+        if await permissions.is_admin():
             return True
-        return info.context['request'].user.id == self.author_id
+        return permissions.is_viewer(self.author_id)
     
     async def resolve_can_delete(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
+        permissions = get_permissions(info)
+        if await permissions.is_admin():
             return True
-        return info.context['request'].user.id == self.author_id
+        return permissions.is_viewer(self.author_id)
     
     async def resolve_can_manage(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
+        permissions = get_permissions(info)
+        if await permissions.is_admin():
             return True
-        return info.context['request'].user.id == self.author_id
+        return permissions.is_viewer(self.author_id)
     
     async def resolve_manage_documents(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
+        permissions = get_permissions(info)
+        if await permissions.is_admin() or permissions.is_viewer(self.author_id):
             return True
-        attendee = await EventAttendee.filter(attendee_id=info.context['request'].user.id, event_id=self.id, can_upload=True).exists()
-        return attendee or info.context['request'].user.id == self.author_id
+        return await permissions.has_event_flag(self.id, "can_upload")
 
     async def resolve_manage_agendas(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
+        permissions = get_permissions(info)
+        if await permissions.is_admin() or permissions.is_viewer(self.author_id):
             return True
-        attendee = await EventAttendee.filter(attendee_id=info.context['request'].user.id, event_id=self.id, manage_agendas=True).exists()
-        return attendee or info.context['request'].user.id == self.author_id
+        return await permissions.has_event_flag(self.id, "manage_agendas")
     
     async def resolve_manage_minutes(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
+        permissions = get_permissions(info)
+        if await permissions.is_admin() or permissions.is_viewer(self.author_id):
             return True
-        attendee = await EventAttendee.filter(attendee_id=info.context['request'].user.id, event_id=self.id, manage_minutes=True).exists()
-        return attendee or info.context['request'].user.id == self.author_id
+        return await permissions.has_event_flag(self.id, "manage_minutes")
         
 
 
@@ -291,34 +252,22 @@ class EventPaginatedObject(MiscPaginatedObject):
 class EventDepartmentObject(MiscFieldObject):
     event = graphene.Field(EventObject)
     department = graphene.Field(DepartmentObject)
+
+    async def resolve_event(self, info, **kwargs):
+        return await get_loaders(info).event.load(self.event_id)
+
+    async def resolve_department(self, info, **kwargs):
+        return await get_loaders(info).department.load(self.department_id)
     
     async def resolve_can_edit(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        event_obj = await Event.get(id=self.event_id)
-        if event_obj:
-            return info.context['request'].user.id == event_obj.author_id
-        return False
+        return await get_permissions(info).can_manage_event(self.event_id)
     
     
     async def resolve_can_delete(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        event_obj = await Event.get(id=self.event_id)
-        if event_obj:
-            return info.context['request'].user.id == event_obj.author_id
-        return False
+        return await get_permissions(info).can_manage_event(self.event_id)
     
     async def resolve_can_manage(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        event_obj = await Event.get(id=self.event_id)
-        if event_obj:
-            return info.context['request'].user.id == event_obj.author_id
-        return False
+        return await get_permissions(info).can_manage_event(self.event_id)
 
 
 class EventDepartmentPaginatedObject(MiscPaginatedObject):
@@ -329,33 +278,21 @@ class EventAttendeeObject(MiscFieldObject):
     event = graphene.Field(EventObject)
     attendee = graphene.Field(UserObject)
     is_attending = graphene.Boolean()
+
+    async def resolve_event(self, info, **kwargs):
+        return await get_loaders(info).event.load(self.event_id)
+
+    async def resolve_attendee(self, info, **kwargs):
+        return await get_loaders(info).user.load(self.attendee_id)
     
     async def resolve_can_edit(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        event_obj = await Event.get(id=self.event_id)
-        if event_obj:
-            return info.context['request'].user.id == event_obj.author_id
-        return False
+        return await get_permissions(info).can_manage_event(self.event_id)
     
     async def resolve_can_delete(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        event_obj = await Event.get(id=self.event_id)
-        if event_obj:
-            return info.context['request'].user.id == event_obj.author_id
-        return False
+        return await get_permissions(info).can_manage_event(self.event_id)
     
     async def resolve_can_manage(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        event_obj = await Event.get(id=self.event_id)
-        if event_obj:
-            return info.context['request'].user.id == event_obj.author_id
-        return False
+        return await get_permissions(info).can_manage_event(self.event_id)
 
 
 class EventAttendeePaginatedObject(MiscPaginatedObject):
@@ -369,33 +306,18 @@ class EventAgendaObject(MiscFieldObject):
     start_time = graphene.DateTime()
     end_time = graphene.DateTime()
     index = graphene.Int()
+
+    async def resolve_event(self, info, **kwargs):
+        return await get_loaders(info).event.load(self.event_id)
     
     async def resolve_can_edit(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        event_obj = await Event.get(id=self.event_id)
-        if event_obj:
-            return info.context['request'].user.id == event_obj.author_id
-        return False
+        return await get_permissions(info).can_manage_event(self.event_id)
     
     async def resolve_can_delete(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        event_obj = await Event.get(id=self.event_id)
-        if event_obj:
-            return info.context['request'].user.id == event_obj.author_id
-        return False
+        return await get_permissions(info).can_manage_event(self.event_id)
     
     async def resolve_can_manage(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        event_obj = await Event.get(id=self.event_id)
-        if event_obj:
-            return info.context['request'].user.id == event_obj.author_id
-        return False
+        return await get_permissions(info).can_manage_event(self.event_id)
 
 
 class EventAgendaPaginatedObject(MiscPaginatedObject):
@@ -411,39 +333,30 @@ class EventDocumentObject(MiscFieldObject):
     note = graphene.Field(lambda: EventUserDocumentNoteObject)
     departments = graphene.List(lambda: DepartmentObject)
     
+    async def resolve_event(self, info, **kwargs):
+        return await get_loaders(info).event.load(self.event_id)
+
+    async def resolve_author(self, info, **kwargs):
+        return await get_loaders(info).user.load(self.author_id)
+
     async def resolve_departments(self, info, **kwargs):
-        deps = await EventDocumentDepartment.filter(event_document_id=self.id).all()
-        return await Department.filter(id__in=[d.department_id for d in deps]).all()
+        return await get_loaders(info).event_document_departments.load(self.id)
 
     async def resolve_file(self, info, **kwargs):
-        return f"{settings.MINIO_SERVER}{self.file}"
+        # served by the authenticated download endpoint of the api
+        return f"{settings.MINIO_SERVER}api/documents/{self.id}"
 
     async def resolve_note(self, info, **kwargs):
-       return await EventUserDocumentNote.filter(
-           event_document_id=self.id, 
-           user_id=info.context['request'].user.id
-        ).first()
+        return await get_loaders(info).event_document_note.load(self.id)
 
     async def resolve_can_edit(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        event_obj = await Event.get(id=self.event_id)
-        return info.context['request'].user.id == event_obj.author_id
+        return await get_permissions(info).can_manage_event(self.event_id)
     
     async def resolve_can_delete(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        event_obj = await Event.get(id=self.event_id)
-        return info.context['request'].user.id == event_obj.author_id
+        return await get_permissions(info).can_manage_event(self.event_id)
     
     async def resolve_can_manage(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        event_obj = await Event.get(id=self.event_id)
-        return info.context['request'].user.id == event_obj.author_id
+        return await get_permissions(info).can_manage_event(self.event_id)
 
 class EventDocumentPaginatedObject(MiscPaginatedObject):
     results = graphene.List(EventDocumentObject)
@@ -456,22 +369,13 @@ class CommitteeObject(MiscFieldObject):
     description = graphene.String()
     
     async def resolve_can_edit(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        return False
+        return await get_permissions(info).is_admin()
     
     async def resolve_can_delete(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        return False
+        return await get_permissions(info).is_admin()
     
     async def resolve_can_manage(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        return False
+        return await get_permissions(info).is_admin()
 
 
 class CommitteePaginatedObject(MiscPaginatedObject):
@@ -481,24 +385,21 @@ class CommitteePaginatedObject(MiscPaginatedObject):
 class userCommitteeObject(MiscFieldObject):
     user = graphene.Field(UserObject)
     committee = graphene.Field(CommitteeObject)
+
+    async def resolve_user(self, info, **kwargs):
+        return await get_loaders(info).user.load(self.user_id)
+
+    async def resolve_committee(self, info, **kwargs):
+        return await get_loaders(info).committee.load(self.committee_id)
     
     async def resolve_can_edit(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        return False
+        return await get_permissions(info).is_admin()
     
     async def resolve_can_delete(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        return False
+        return await get_permissions(info).is_admin()
     
     async def resolve_can_manage(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        return False
+        return await get_permissions(info).is_admin()
 
 
 class userCommitteePaginatedObject(MiscPaginatedObject):
@@ -508,24 +409,21 @@ class userCommitteePaginatedObject(MiscPaginatedObject):
 class CommitteeDepartmentObject(MiscFieldObject):
     committee = graphene.Field(CommitteeObject)
     department = graphene.Field(DepartmentObject)
+
+    async def resolve_committee(self, info, **kwargs):
+        return await get_loaders(info).committee.load(self.committee_id)
+
+    async def resolve_department(self, info, **kwargs):
+        return await get_loaders(info).department.load(self.department_id)
     
     async def resolve_can_edit(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        return False
+        return await get_permissions(info).is_admin()
     
     async def resolve_can_delete(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        return False
+        return await get_permissions(info).is_admin()
     
     async def resolve_can_manage(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        return False
+        return await get_permissions(info).is_admin()
 
 
 class CommitteeDepartmentPaginatedObject(MiscPaginatedObject):
@@ -537,47 +435,46 @@ class EventUserDocumentNoteObject(MiscFieldObject):
     user = graphene.Field(UserObject)
     event_document = graphene.Field(EventDocumentObject)
     note = graphene.String()
+
+    async def resolve_event(self, info, **kwargs):
+        # notes are linked to the event through their document
+        loaders = get_loaders(info)
+        event_document = await loaders.event_document.load(self.event_document_id)
+        if not event_document:
+            return None
+        return await loaders.event.load(event_document.event_id)
+
+    async def resolve_user(self, info, **kwargs):
+        return await get_loaders(info).user.load(self.user_id)
+
+    async def resolve_event_document(self, info, **kwargs):
+        return await get_loaders(info).event_document.load(self.event_document_id)
     
     async def resolve_can_edit(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-    
-        if self.user_id == info.context['request'].user.id:
+        permissions = get_permissions(info)
+        if await permissions.is_admin() or permissions.is_viewer(self.user_id):
             return True
-        
-        event_obj = await Event.get(id=self.event_id)
-        if event_obj:
-            return info.context['request'].user.id == event_obj.author_id
-        
+        event_document = await get_loaders(info).event_document.load(self.event_document_id)
+        if event_document:
+            return await permissions.is_event_author(event_document.event_id)
         return False
     
     async def resolve_can_delete(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
+        permissions = get_permissions(info)
+        if await permissions.is_admin() or permissions.is_viewer(self.user_id):
             return True
-    
-        if self.user_id == info.context['request'].user.id:
-            return True
-        
-        event_obj = await Event.get(id=self.event_id)
-        if event_obj:
-            return info.context['request'].user.id == event_obj.author_id
-        
+        event_document = await get_loaders(info).event_document.load(self.event_document_id)
+        if event_document:
+            return await permissions.is_event_author(event_document.event_id)
         return False
     
     async def resolve_can_manage(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-    
-        if self.user_id == info.context['request'].user.id:
+        permissions = get_permissions(info)
+        if await permissions.is_admin() or permissions.is_viewer(self.user_id):
             return True
-        
-        event_obj = await Event.get(id=self.event_id)
-        if event_obj:
-            return info.context['request'].user.id == event_obj.author_id
-        
+        event_document = await get_loaders(info).event_document.load(self.event_document_id)
+        if event_document:
+            return await permissions.is_event_author(event_document.event_id)
         return False
 
 
@@ -588,39 +485,21 @@ class EventUserDocumentNotePaginatedObject(MiscPaginatedObject):
 class EventCommitteeObject(MiscFieldObject):
     event = graphene.Field(EventObject)
     committee = graphene.Field(CommitteeObject)
+
+    async def resolve_event(self, info, **kwargs):
+        return await get_loaders(info).event.load(self.event_id)
+
+    async def resolve_committee(self, info, **kwargs):
+        return await get_loaders(info).committee.load(self.committee_id)
     
     async def resolve_can_edit(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        
-        event_obj = await Event.get(id=self.event_id)
-        if event_obj:
-            return info.context['request'].user.id == event_obj.author_id
-        
-        return False
+        return await get_permissions(info).can_manage_event(self.event_id)
     
     async def resolve_can_delete(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        
-        event_obj = await Event.get(id=self.event_id)
-        if event_obj:
-            return info.context['request'].user.id == event_obj.author_id
-        
-        return False
+        return await get_permissions(info).can_manage_event(self.event_id)
     
     async def resolve_can_manage(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        
-        event_obj = await Event.get(id=self.event_id)
-        if event_obj:
-            return info.context['request'].user.id == event_obj.author_id
-        
-        return False
+        return await get_permissions(info).can_manage_event(self.event_id)
 
 
 class EventCommitteePaginatedObject(MiscPaginatedObject):
@@ -632,48 +511,21 @@ class EventMinuteObject(MiscFieldObject):
     content = graphene.String()
     author = graphene.Field(UserObject)
     index = graphene.Int()
+
+    async def resolve_event(self, info, **kwargs):
+        return await get_loaders(info).event.load(self.event_id)
+
+    async def resolve_author(self, info, **kwargs):
+        return await get_loaders(info).user.load(self.author_id)
     
     async def resolve_can_edit(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        
-        event_obj = await Event.get(id=self.event_id)
-        if event_obj:
-            return info.context['request'].user.id == event_obj.author_id
-    
-        if self.author_id == info.context['request'].user.id:
-            return True
-        
-        return False
+        return await get_permissions(info).can_manage_event(self.event_id)
     
     async def resolve_can_delete(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        
-        event_obj = await Event.get(id=self.event_id)
-        if event_obj:
-            return info.context['request'].user.id == event_obj.author_id
-    
-        if self.author_id == info.context['request'].user.id:
-            return True
-        
-        return False
+        return await get_permissions(info).can_manage_event(self.event_id)
     
     async def resolve_can_manage(self, info, *args, **kwargs):
-        user = await User.get(id=info.context['request'].user.id)
-        if user and user.is_admin:
-            return True
-        
-        event_obj = await Event.get(id=self.event_id)
-        if event_obj:
-            return info.context['request'].user.id == event_obj.author_id
-    
-        if self.author_id == info.context['request'].user.id:
-            return True
-        
-        return False
+        return await get_permissions(info).can_manage_event(self.event_id)
 
 
 class EventMinutePaginatedObject(MiscPaginatedObject):
@@ -681,3 +533,85 @@ class EventMinutePaginatedObject(MiscPaginatedObject):
 
     
 
+
+
+class OutboundMessageObject(MiscFieldObject):
+    channel = graphene.String()
+    status = graphene.String()
+    recipient = graphene.String()
+    recipient_name = graphene.String()
+    title = graphene.String()
+    message = graphene.String()
+    attempts = graphene.Int()
+    last_error = graphene.String()
+    next_attempt_at = graphene.DateTime()
+    sent_at = graphene.DateTime()
+    event = graphene.Field(EventObject)
+    user = graphene.Field(UserObject)
+
+    async def resolve_channel(self, info, **kwargs):
+        return self.channel.value
+
+    async def resolve_status(self, info, **kwargs):
+        return self.status.value
+
+    async def resolve_message(self, info, **kwargs):
+        # check if the message holds credentials
+        if self.redact:
+            return "[redacted]"
+        return self.message
+
+    async def resolve_event(self, info, **kwargs):
+        return await get_loaders(info).event.load(self.event_id)
+
+    async def resolve_user(self, info, **kwargs):
+        return await get_loaders(info).user.load(self.user_id)
+
+
+class OutboundMessagePaginatedObject(MiscPaginatedObject):
+    results = graphene.List(OutboundMessageObject)
+
+
+class BackgroundJobObject(MiscFieldObject):
+    kind = graphene.String()
+    status = graphene.String()
+    total = graphene.Int()
+    processed = graphene.Int()
+    succeeded = graphene.Int()
+    failed = graphene.Int()
+    progress = graphene.Float()
+    result = JSON()
+    error = graphene.String()
+    started_at = graphene.DateTime()
+    finished_at = graphene.DateTime()
+    author = graphene.Field(UserObject)
+
+    async def resolve_status(self, info, **kwargs):
+        return self.status.value
+
+    async def resolve_progress(self, info, **kwargs):
+        if self.status == JobStatus.COMPLETED:
+            return 100.0
+        if not self.total:
+            return 0.0
+        return round(self.processed * 100.0 / self.total, 1)
+
+    async def resolve_author(self, info, **kwargs):
+        return await get_loaders(info).user.load(self.author_id)
+
+
+class TimeSlotObject(graphene.ObjectType):
+    start_time = graphene.DateTime()
+    end_time = graphene.DateTime()
+
+
+class VenueAvailabilityObject(graphene.ObjectType):
+    venue = graphene.Field(VenueObject)
+    available = graphene.Boolean()
+    start_time = graphene.DateTime()
+    end_time = graphene.DateTime()
+    conflicts = graphene.List(EventObject)
+    suggested_slots = graphene.List(TimeSlotObject)
+
+    async def resolve_venue(self, info, **kwargs):
+        return await get_loaders(info).venue.load(self.venue_id)
@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import os
+import random
+from collections import defaultdict
+from datetime import timedelta
+
+from tortoise import timezone
+from tortoise.queryset import Q
+from tortoise.transactions import in_transaction
+
+from app.models import OutboundMessage, MessageChannel, MessageStatus
+from services import mail
+from services.sms import SMS
+
+log = logging.getLogger("meeting.outbox")
+
+OUTBOX_CONCURRENCY = int(os.getenv("OUTBOX_CONCURRENCY", 10))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 100))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 5))
+# seconds before the first retry, doubled on every further attempt
+OUTBOX_RETRY_DELAY = float(os.getenv("OUTBOX_RETRY_DELAY", 30))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", 5))
+# seconds a claimed message stays "sending" before it is picked up again,
+# covers workers that died halfway through a batch
+OUTBOX_LEASE = 300
+REDACTED = "[redacted]"
+
+
+async def send_sms(message):
+    return await SMS().send(message.recipient, message.message, message.recipient_name or "")
+
+
+async def send_email(message):
+    return await mail.Mail().send(message.recipient, message.title or "", message.message)
+
+
+async def send_email_batch(messages):
+    return await mail.Mail().send_batch([
+        mail.Mail.payload(message.recipient, message.title or "", message.message)
+        for message in messages
+    ])
+
+
+SENDERS = {
+    MessageChannel.SMS: send_sms,
+    MessageChannel.EMAIL: send_email,
+}
+
+
+def batch_sender(channel):
+    """sender taking a list of messages, when the channel's gateway has one"""
+    if channel == MessageChannel.EMAIL and mail.MAIL_BATCH_ENDPOINT:
+        return send_email_batch
+    return None
+
+
+def retry_delay(attempts):
+    """exponential backoff with some jitter so retries do not line up"""
+    delay = OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return delay + random.uniform(0, delay / 2)
+
+
+class Outbox:
+    """
+    Persistent queue of outbound messages. Messages are stored in
+    ``OutboundMessage`` and delivered by a background task with at most
+    ``concurrency`` sends in flight; failed sends are retried with
+    exponential backoff until ``OUTBOX_MAX_ATTEMPTS`` is reached.
+    """
+
+    def __init__(self, concurrency=OUTBOX_CONCURRENCY):
+        self.concurrency = concurrency
+        self._wakeup = None
+        self._task = None
+
+    async def enqueue(self, messages):
+        """store unsaved ``OutboundMessage`` instances and wake the workers"""
+        if messages:
+            await OutboundMessage.bulk_create(messages)
+            self.wake()
+        return len(messages)
+
+    def wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        while True:
+            self._wakeup.clear()
+            try:
+                messages = await self.claim()
+            except Exception:
+                log.exception("claiming outbound messages failed")
+                messages = []
+
+            if messages:
+                try:
+                    await asyncio.gather(*self.dispatch(messages, semaphore))
+                except Exception:
+                    # unrecorded messages are claimed again once their lease ends
+                    log.exception("delivering outbound messages failed")
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), OUTBOX_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def claim(self, limit=OUTBOX_BATCH_SIZE):
+        """
+        lock a batch of due messages and mark them as sending, SKIP LOCKED
+        lets several application processes share the queue
+        """
+        now = timezone.now()
+        async with in_transaction():
+            messages = await OutboundMessage.filter(
+                Q(status=MessageStatus.PENDING) | Q(status=MessageStatus.SENDING),
+                Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now),
+            ).select_for_update(skip_locked=True).order_by("id").limit(limit)
+
+            if messages:
+                await OutboundMessage.filter(id__in=[m.id for m in messages]).update(
+                    status=MessageStatus.SENDING,
+                    next_attempt_at=now + timedelta(seconds=OUTBOX_LEASE),
+                )
+        return messages
+
+    def dispatch(self, messages, semaphore):
+        """one delivery per message, or per batch on channels sending batches"""
+        batches = defaultdict(list)
+        deliveries = []
+        for message in messages:
+            if batch_sender(message.channel):
+                batches[message.channel].append(message)
+            else:
+                deliveries.append(self.deliver(message, semaphore))
+        for channel, batch in batches.items():
+            deliveries.append(self.deliver_batch(batch_sender(channel), batch, semaphore))
+        return deliveries
+
+    async def deliver(self, message, semaphore):
+        async with semaphore:
+            error = None
+            try:
+                delivered = await SENDERS[message.channel](message)
+                if not delivered:
+                    error = "rejected by gateway"
+            except Exception as e:
+                delivered, error = False, repr(e)
+        await self.record(message, delivered, error)
+
+    async def deliver_batch(self, sender, messages, semaphore):
+        async with semaphore:
+            try:
+                results = [(delivered, None if delivered else "rejected by gateway")
+                           for delivered in await sender(messages)]
+            except Exception as e:
+                results = [(False, repr(e))] * len(messages)
+        # check if the gateway answered for fewer messages than it was sent
+        results += [(False, "no result from gateway")] * (len(messages) - len(results))
+        for message, (delivered, error) in zip(messages, results):
+            await self.record(message, delivered, error)
+
+    async def record(self, message, delivered, error):
+        attempts = message.attempts + 1
+        now = timezone.now()
+        if delivered:
+            fields = dict(status=MessageStatus.SENT, sent_at=now, last_error=None)
+        elif attempts >= OUTBOX_MAX_ATTEMPTS:
+            fields = dict(status=MessageStatus.FAILED, last_error=error)
+        else:
+            fields = dict(
+                status=MessageStatus.PENDING,
+                last_error=error,
+                next_attempt_at=now + timedelta(seconds=retry_delay(attempts)),
+            )
+        if message.redact and fields["status"] != MessageStatus.PENDING:
+            fields["message"] = REDACTED
+        await OutboundMessage.filter(id=message.id).update(attempts=attempts, **fields)
+
+        log.info(
+            "outbound message %s", fields["status"].value,
+            extra={"message_id": message.id, "channel": message.channel.value,
+                   "recipient": message.recipient, "attempts": attempts, "error": error},
+        )
+
+
+outbox = Outbox()
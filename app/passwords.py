@@ -0,0 +1,89 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from app.models import User
+
+# bcrypt work factor of new hashes, existing hashes with another factor
+# are rehashed on the next successful login
+PASSWORD_ROUNDS = int(os.getenv("PASSWORD_ROUNDS", 12))
+PASSWORD_POOL_SIZE = int(os.getenv("PASSWORD_POOL_SIZE", min(4, os.cpu_count() or 1)))
+
+
+class PasswordHasher:
+    """
+    bcrypt hashing on a bounded thread pool. bcrypt releases the GIL, so
+    the event loop keeps serving other requests while a hash is computed
+    and at most ``pool_size`` hashes run at a time.
+    """
+
+    def __init__(self, rounds=PASSWORD_ROUNDS, pool_size=PASSWORD_POOL_SIZE):
+        self.rounds = rounds
+        self.pool_size = pool_size
+        self._executor = None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.pool_size, thread_name_prefix="bcrypt"
+            )
+        return self._executor
+
+    async def run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    def _hash(self, password):
+        salt = bcrypt.gensalt(self.rounds)
+        return bcrypt.hashpw(password.encode("utf-8"), salt), salt
+
+    @staticmethod
+    def _verify(password, hashed):
+        try:
+            return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+        except ValueError:
+            # check if the stored value is not a bcrypt hash at all
+            return False
+
+    async def hash(self, password):
+        """returns the ``(hash_password, salt_key)`` strings stored on users"""
+        hashed, salt = await self.run(self._hash, password)
+        return hashed.decode("utf-8"), salt.decode("utf-8")
+
+    async def verify(self, password, hashed):
+        if not password or not hashed:
+            return False
+        return await self.run(self._verify, password, hashed)
+
+    def needs_rehash(self, hashed):
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return True
+
+    async def set_password(self, user, password):
+        hash_password, salt_key = await self.hash(password)
+        return await User.filter(id=user.id).update(
+            hash_password=hash_password, salt_key=salt_key
+        )
+
+    async def verify_user(self, user, password):
+        """
+        check ``password`` against the user's hash, rehashing it with the
+        current work factor when it was made with another one
+        """
+        if not await self.verify(password, user.hash_password):
+            return False
+        if self.needs_rehash(user.hash_password):
+            await self.set_password(user, password)
+        return True
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+hasher = PasswordHasher()
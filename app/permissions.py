@@ -0,0 +1,71 @@
+import asyncio
+from app.loaders import get_loaders, get_viewer_id
+
+
+class Permissions:
+    """Request-scoped viewer with memoized permission checks.
+
+    The viewer is loaded once per request and every check goes through the
+    request loaders, so the viewer's ``UserEventAccess`` rows needed by all
+    rows of a page are fetched in one batch.
+    """
+
+    def __init__(self, user_id, loaders):
+        self.user_id = user_id
+        self.loaders = loaders
+        self._memo = {}
+
+    def _memoize(self, key, compute):
+        if key not in self._memo:
+            self._memo[key] = asyncio.ensure_future(compute())
+        return self._memo[key]
+
+    async def viewer(self):
+        if self.user_id is None:
+            return None
+        return await self.loaders.user.load(self.user_id)
+
+    async def _is_admin(self):
+        viewer = await self.viewer()
+        return bool(viewer and viewer.is_admin)
+
+    async def is_admin(self):
+        return await self._memoize(("is_admin",), self._is_admin)
+
+    def is_viewer(self, user_id):
+        return self.user_id is not None and self.user_id == user_id
+
+    async def _is_event_author(self, event_id):
+        access = await self.loaders.event_access.load(event_id)
+        return bool(access and access.is_author)
+
+    async def is_event_author(self, event_id):
+        return await self._memoize(
+            ("is_event_author", event_id),
+            lambda: self._is_event_author(event_id))
+
+    async def can_manage_event(self, event_id):
+        # admins and the event author manage everything attached to an event
+        if await self.is_admin():
+            return True
+        return await self.is_event_author(event_id)
+
+    async def _has_event_flag(self, event_id, flag):
+        access = await self.loaders.event_access.load(event_id)
+        return bool(access and access.is_attendee and getattr(access, flag))
+
+    async def has_event_flag(self, event_id, flag):
+        """Whether the viewer attends the event with ``flag`` (``can_upload``,
+        ``manage_minutes`` or ``manage_agendas``) set."""
+        return await self._memoize(
+            ("has_event_flag", event_id, flag),
+            lambda: self._has_event_flag(event_id, flag))
+
+
+def get_permissions(info):
+    context = info.context
+    permissions = context.get("permissions")
+    if permissions is None:
+        permissions = context["permissions"] = Permissions(
+            get_viewer_id(info), get_loaders(info))
+    return permissions
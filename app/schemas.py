@@ -1,7 +1,15 @@
 import graphene
 from app import models
+from app.analytics import get_analytics
+from app.bookings import venue_availability
+from app.fiscal import creation_fiscal_years
+from app.lookups import committee_options, financial_years, used_event_types
 from app.middlewares.authentication import login_required
 from app.nodes import *
+from app.permissions import get_permissions
+from app.search import search_attendees, search_ordering, search_users
+from app.utils import page_requested, paginate
+from app.visibility import attended_event_ids, filter_events, visible_event_ids, visible_events
 from tortoise.queryset import (
     Q,
 )
@@ -24,15 +32,7 @@ class Query(graphene.ObjectType):
     
     @login_required
     async def resolve_analytics(self, info, *args, **kwargs):
-        return DataObject(
-            data={
-                "total_users": await models.User.all().count(),
-                "total_events": await models.Event.all().count(),
-                "total_departments": await models.Department.all().count(),
-                "total_committees": await models.Committee.all().count(),
-                "total_venues": await models.Venue.all().count(),
-            }
-        )
+        return DataObject(data=await get_analytics())
 
 
     users = graphene.Field(
@@ -42,36 +42,19 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
     user = graphene.Field(UserObject, id=graphene.Int(required=True))
 
     @login_required
     async def resolve_users(self, info, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
 
-        s = models.User.filter(
-            Q(first_name__icontains=key) |
-            Q(middle_name__icontains=key) |
-            Q(last_name__icontains=key) |
-            Q(email__icontains=key) | 
-            Q(phone__icontains=key)
-        ).order_by("-created")
+        s = search_users(models.User.all(), key)
 
-        # get total count
-        total_count = await s.count()
-
-        return UserPaginatedObject(
-            total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all().order_by("-created"),
-        )
+        return await paginate(info, s, UserPaginatedObject, kwargs, ordering=search_ordering(key))
 
     @login_required
     async def resolve_user(self, info, **kwargs):
@@ -85,6 +68,9 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
 
     department = graphene.Field(DepartmentObject, id=graphene.Int(required=True))
@@ -92,24 +78,10 @@ class Query(graphene.ObjectType):
     @login_required
     async def resolve_departments(self, info, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
 
         s = models.Department.all()
 
-        # get total count
-        total_count = await s.count()
-
-        return DepartmentPaginatedObject(
-            total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all().order_by("-created"),
-        )
+        return await paginate(info, s, DepartmentPaginatedObject, kwargs)
 
     @login_required
     async def resolve_department(self, info, **kwargs):
@@ -123,6 +95,9 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
 
     venue = graphene.Field(VenueObject, id=graphene.Int(required=True))
@@ -130,30 +105,40 @@ class Query(graphene.ObjectType):
     @login_required
     async def resolve_venues(self, info, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
 
         s = models.Venue.all()
 
-        # get total count
-        total_count = await s.count()
-
-        return VenuePaginatedObject(
-            total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all().order_by("-created"),
-        )
+        return await paginate(info, s, VenuePaginatedObject, kwargs)
 
     @login_required
     async def resolve_venue(self, info, **kwargs):
         id = kwargs.get("id")
         return await models.Venue.get(id=id)
 
+    venue_availability = graphene.List(
+        VenueAvailabilityObject,
+        start_time=graphene.String(required=True),
+        end_time=graphene.String(required=True),
+        venue_ids=graphene.List(graphene.Int, required=False),
+        exclude_event_id=graphene.Int(required=False),
+    )
+
+    @login_required
+    async def resolve_venue_availability(self, info, **kwargs):
+        start_time = pendulum.parse(kwargs.get("start_time"), strict=False)
+        end_time = pendulum.parse(kwargs.get("end_time"), strict=False)
+        if end_time <= start_time:
+            raise Exception("End time must be after start time")
+
+        # check if venues are asked for, all active venues otherwise
+        venue_ids = kwargs.get("venue_ids")
+        if not venue_ids:
+            venue_ids = await models.Venue.filter(is_active=True).order_by("id").values_list("id", flat=True)
+
+        return await venue_availability(
+            venue_ids, start_time, end_time, exclude_event_id=kwargs.get("exclude_event_id")
+        )
+
     events = graphene.Field(
         EventPaginatedObject,
         key=graphene.String(required=False),
@@ -161,6 +146,9 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
         event_type=graphene.String(required=False),
     )
 
@@ -169,26 +157,12 @@ class Query(graphene.ObjectType):
     @login_required
     async def resolve_events(self, info, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
 
         s = models.Event.all()
         if kwargs.get("event_type"):
             s = s.filter(event_type=kwargs.get("event_type"))
 
-        # get total count
-        total_count = await s.count()
-
-        return EventPaginatedObject(
-            total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all(),
-        )
+        return await paginate(info, s, EventPaginatedObject, kwargs)
     
 
     @login_required
@@ -205,35 +179,18 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
     
     @login_required
     async def resolve_event_documents_managers(self, info, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
 
-        offset = (page - 1) * size
-
-        s = models.EventAttendee.filter(event_id=kwargs.get("id"), can_upload=True).filter(
-            Q(attendee__first_name__icontains=key) | 
-            Q(attendee__middle_name__icontains=key) | 
-            Q(attendee__last_name__icontains=key) | 
-            Q(attendee__email__icontains=key) | 
-            Q(attendee__username__icontains=key)
-        )
+        s = search_attendees(models.EventAttendee.filter(event_id=kwargs.get("id"), can_upload=True), key)
 
-        # get total count
-        total_count = await s.count()
-
-        return EventAttendeePaginatedObject(
-            total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all(),
-        )
+        return await paginate(info, s, EventAttendeePaginatedObject, kwargs)
     
     
     not_event_documents_managers = graphene.Field(
@@ -244,35 +201,18 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
     
     @login_required
     async def resolve_not_event_documents_managers(self, info, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
-
-        s = models.EventAttendee.filter(event_id=kwargs.get("id"), can_upload=False).filter(
-            Q(attendee__first_name__icontains=key) | 
-            Q(attendee__middle_name__icontains=key) | 
-            Q(attendee__last_name__icontains=key) | 
-            Q(attendee__email__icontains=key) | 
-            Q(attendee__username__icontains=key)
-        )
 
-        # get total count
-        total_count = await s.count()
+        s = search_attendees(models.EventAttendee.filter(event_id=kwargs.get("id"), can_upload=False), key)
 
-        return EventAttendeePaginatedObject(
-            total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all(),
-        )
+        return await paginate(info, s, EventAttendeePaginatedObject, kwargs)
         
     
     
@@ -284,35 +224,18 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
     
     @login_required
     async def resolve_event_minutes_managers(self, info, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
-
-        s = models.EventAttendee.filter(event_id=kwargs.get("id"), manage_minutes=True).filter(
-            Q(attendee__first_name__icontains=key) | 
-            Q(attendee__middle_name__icontains=key) | 
-            Q(attendee__last_name__icontains=key) | 
-            Q(attendee__email__icontains=key) | 
-            Q(attendee__username__icontains=key)
-        )
 
-        # get total count
-        total_count = await s.count()
+        s = search_attendees(models.EventAttendee.filter(event_id=kwargs.get("id"), manage_minutes=True), key)
 
-        return EventAttendeePaginatedObject(
-            total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all(),
-        )
+        return await paginate(info, s, EventAttendeePaginatedObject, kwargs)
     
     
     event_agendas_managers = graphene.Field(
@@ -323,36 +246,19 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
     
     
     @login_required
     async def resolve_evenet_agendas_managers(self, info, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
-
-        s = models.EventAttendee.filter(event_id=kwargs.get("id"), manage_agendas=True).filter(
-            Q(attendee__first_name__icontains=key) | 
-            Q(attendee__middle_name__icontains=key) | 
-            Q(attendee__last_name__icontains=key) | 
-            Q(attendee__email__icontains=key) | 
-            Q(attendee__username__icontains=key)
-        )
 
-        # get total count
-        total_count = await s.count()
+        s = search_attendees(models.EventAttendee.filter(event_id=kwargs.get("id"), manage_agendas=True), key)
 
-        return EventAttendeePaginatedObject(
-            total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all(),
-        )
+        return await paginate(info, s, EventAttendeePaginatedObject, kwargs)
 
     event_attendees = graphene.Field(
         EventAttendeePaginatedObject,
@@ -362,6 +268,9 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
 
     event_attendee = graphene.Field(EventAttendeeObject, id=graphene.Int(required=True))
@@ -369,30 +278,10 @@ class Query(graphene.ObjectType):
     @login_required
     async def resolve_event_attendees(self, info, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
 
-        s = models.EventAttendee.filter(event_id=kwargs.get("id")).filter(
-            Q(attendee__first_name__icontains=key) | 
-            Q(attendee__middle_name__icontains=key) | 
-            Q(attendee__last_name__icontains=key) | 
-            Q(attendee__email__icontains=key) | 
-            Q(attendee__username__icontains=key)
-        )
+        s = search_attendees(models.EventAttendee.filter(event_id=kwargs.get("id")), key)
 
-        # get total count
-        total_count = await s.count()
-
-        return EventAttendeePaginatedObject(
-            total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all(),
-        )
+        return await paginate(info, s, EventAttendeePaginatedObject, kwargs)
 
     @login_required
     async def resolve_event_attendee(self, info, **kwargs):
@@ -407,6 +296,9 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
 
     event_document = graphene.Field(EventDocumentObject, id=graphene.Int(required=True))
@@ -414,26 +306,12 @@ class Query(graphene.ObjectType):
     @login_required
     async def resolve_event_documents(self, info, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
 
         s = models.EventDocument.filter(
             event_id=kwargs.get("event_id")
         )
 
-        # get total count
-        total_count = await s.count()
-
-        return EventDocumentPaginatedObject(
-            total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all().order_by("-created"),
-        )
+        return await paginate(info, s, EventDocumentPaginatedObject, kwargs)
 
     @login_required
     async def resolve_event_document(self, info, **kwargs):
@@ -448,6 +326,9 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
 
     event_agenda = graphene.Field(EventAgendaObject, id=graphene.Int(required=True))
@@ -455,10 +336,6 @@ class Query(graphene.ObjectType):
     @login_required
     async def resolve_event_agendas(self, info, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
 
         s = models.EventAgenda.filter(
             event_id=kwargs.get("event_id")
@@ -467,17 +344,7 @@ class Query(graphene.ObjectType):
             Q(description__icontains=key)
         )
 
-        # get total count
-        total_count = await s.count()
-
-        return EventAgendaPaginatedObject(
-            total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all().order_by("index"),
-        )
+        return await paginate(info, s, EventAgendaPaginatedObject, kwargs, ordering=("index", "id"))
 
     @login_required
     async def resolve_event_agenda(self, info, **kwargs):
@@ -489,35 +356,31 @@ class Query(graphene.ObjectType):
     
     @login_required
     async def resolve_creation_financial_years(self, info, *args, **kwargs):
-        c_date = pendulum.now()
-        years = []
-        if c_date.month >= 7:
-            years.append(f"{c_date.year + 1}/{c_date.year + 2}")
-            years.append(f"{c_date.year}/{c_date.year + 1}")
-        else:
-            years.append(f"{c_date.year}/{c_date.year + 1}")
-            years.append(f"{c_date.year - 1}/{c_date.year}")
-        
-        return DataObject(data=years)
+        return DataObject(data=creation_fiscal_years(pendulum.now()))
     
     
     financial_years = graphene.Field(DataObject)
     
     @login_required
     async def resolve_financial_years(self, info, *args, **kwargs):
-        all_events = await models.Event.all()
-        unique_years = set(
-            event.financial_year for event in all_events if event.financial_year is not None)
-        unique_years_list = list(unique_years)
-        return DataObject(data=unique_years_list)
+        return DataObject(data=await financial_years())
 
-    event_types = graphene.Field(DataObject)
+    event_types = graphene.Field(DataObject, in_use=graphene.Boolean(required=False))
 
     @login_required
     async def resolve_event_types(self, info, **kwargs):
+        # check if only the types events have, i.e. for the filter dropdown
+        if kwargs.get("in_use"):
+            return DataObject(data=await used_event_types())
         datas = [e.value for e in models.EventType]
         return DataObject(data=datas)
 
+    committee_options = graphene.Field(DataObject)
+
+    @login_required
+    async def resolve_committee_options(self, info, **kwargs):
+        return DataObject(data=await committee_options())
+
     venue_types = graphene.Field(DataObject)
 
     @login_required
@@ -532,6 +395,9 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
 
     department_user = graphene.Field(
@@ -541,24 +407,10 @@ class Query(graphene.ObjectType):
     @login_required
     async def resolve_department_users(self, info, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
 
         s = models.UserDepartment.all()
 
-        # get total count
-        total_count = await s.count()
-
-        return UserDepartmentPaginatedObject(
-            total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all(),
-        )
+        return await paginate(info, s, UserDepartmentPaginatedObject, kwargs)
 
     @login_required
     async def resolve_department_user(self, info, **kwargs):
@@ -574,15 +426,14 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
 
     @login_required
     async def resolve_event_attendees_to_add(self, info, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
 
         # check if event exists
         event = await models.Event.get(id=kwargs.get("event_id"))
@@ -600,34 +451,13 @@ class Query(graphene.ObjectType):
 
         # get all users except the ones already added
         if len(department_users) > 0:
-            s = models.User.filter(
+            s = search_users(models.User.filter(
                 id__in=[e.user_id for e in department_users]
-            ).filter(
-                Q(first_name__icontains=key) |
-                Q(middle_name__icontains=key) | 
-                Q(last_name__icontains=key) |
-                Q(email__icontains=key) |
-                Q(phone__icontains=key)
-            ).all()
+            ), key)
         else:
-            s = models.User.filter(~Q(id__in=event_attendees_ids)).filter(
-                Q(first_name__icontains=key) |
-                Q(middle_name__icontains=key) | 
-                Q(last_name__icontains=key) |
-                Q(email__icontains=key) |
-                Q(phone__icontains=key)).all()
-
-        # get total count
-        total_count = await s.count()
+            s = search_users(models.User.filter(~Q(id__in=event_attendees_ids)), key)
 
-        return UserPaginatedObject(
-            total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all(),
-        )
+        return await paginate(info, s, UserPaginatedObject, kwargs, ordering=search_ordering(key))
 
     event_attendees_to_add_by_departments = graphene.Field(
         UserPaginatedObject,
@@ -638,15 +468,14 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
 
     @login_required
     async def resolve_event_attendees_to_add_by_departments(self, info, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
 
         # check if event exists
         event = await models.Event.get(id=kwargs.get("event_id"))
@@ -657,34 +486,19 @@ class Query(graphene.ObjectType):
         # get all event attendees
         event_attendees = await models.EventAttendee.filter(event=event).all()
 
-        event_attendees_ids = [e.attendee.id for e in event_attendees]
+        event_attendees_ids = [e.attendee_id for e in event_attendees]
 
         # get all users by department except the ones already added
         department_users = await models.UserDepartment.filter(
-            department__in=kwargs.get("department_ids")
+            department_id__in=kwargs.get("department_ids")
         ).all()
-        department_users_ids = [e.user.id for e in department_users]
+        department_users_ids = [e.user_id for e in department_users]
 
-        s = models.User.filter(
+        s = search_users(models.User.filter(
             Q(id__in=department_users_ids) & ~Q(id__in=event_attendees_ids)
-        ).filter(
-             Q(first_name__icontains=key) |
-                Q(middle_name__icontains=key) | 
-                Q(last_name__icontains=key) |
-                Q(email__icontains=key) |
-                Q(phone__icontains=key)).all()
+        ), key)
 
-        # get total count
-        total_count = await s.count()
-
-        return UserPaginatedObject(
-            total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all(),
-        )
+        return await paginate(info, s, UserPaginatedObject, kwargs, ordering=search_ordering(key))
 
     my_events = graphene.Field(
         EventPaginatedObject,
@@ -693,6 +507,9 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
         event_type=graphene.String(required=False),
         financial_year=graphene.String(required=False),
         committee_id=graphene.Int(required=False),
@@ -702,71 +519,19 @@ class Query(graphene.ObjectType):
     @login_required
     async def resolve_my_events(self, info, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
-        # get all events where user is an attendee
-        user = await models.User.get(id=info.context["request"].user.id)
-
-        # get all event attendees
-        event_attendees = await models.EventAttendee.filter(attendee=user).all()
-
-        event_attendees_ids = [e.event_id for e in event_attendees]
-
-        # get all events created by user
-        events = await models.Event.filter(author=user).all()
-
-        event_ids = [e.id for e in events]
-
-        # combine both lists
-        event_ids = event_ids + event_attendees_ids
-
-        # get all events
-        s = models.Event.filter(id__in=event_ids).all()
-        
-        # get event type 
-        event_type = kwargs.get("event_type")
-        # check if event type is not none
-        if event_type:
-            s = s.filter(event_type=event_type)
-        
-        committee_id = kwargs.get("committee_id")
-        if committee_id:
-            committee_events = [
-                ec.event_id for ec in await models.EventCommittee.filter(
-                    committee_id=committee_id)
-            ]
-            s = s.filter(id__in=committee_events)
-        
-        department_id = kwargs.get("department_id")
-        if department_id:
-            department_events = [
-                ed.event_id for ed in await models.EventDepartment.filter(
-                    department_id=department_id)
-            ]
-            s = s.filter(id__in=department_events)
-        
-        financial_year = kwargs.get("financial_year")
-        if financial_year:
-            fy_splitted = str(financial_year).split("/")
-            fy_start_string = f"01/07/{fy_splitted[0]}"
-            fy_start = pendulum.parse(fy_start_string, strict=False)
-            fy_end = pendulum.parse(fy_start_string, strict=False).add(months=12).subtract(days=1)
-            s = s.filter(start_time__gt=fy_start, start_time__lt=fy_end)
-
-        # get total count
-        total_count = await s.count()
-
-        return EventPaginatedObject(
-            total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all(),
+        # get all events where user is an attendee or the author
+        s = visible_events(info.context["request"].user.id)
+
+        s = filter_events(
+            s,
+            event_type=kwargs.get("event_type"),
+            committee_id=kwargs.get("committee_id"),
+            department_id=kwargs.get("department_id"),
+            financial_year=kwargs.get("financial_year"),
         )
 
+        return await paginate(info, s, EventPaginatedObject, kwargs)
+
     user_events = graphene.Field(
         EventPaginatedObject,
         key=graphene.String(required=False),
@@ -774,15 +539,14 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
 
     @login_required
     async def resolve_user_events(self, info, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
 
         # get all events where user is an author
         user = await models.User.get(id=info.context["request"].user.id)
@@ -790,17 +554,7 @@ class Query(graphene.ObjectType):
         # get all events created by user
         s = models.Event.filter(author=user).all()
 
-        # get total count
-        total_count = await s.count()
-
-        return EventPaginatedObject(
-            total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all(),
-        )
+        return await paginate(info, s, EventPaginatedObject, kwargs)
 
     user_events_subscribed = graphene.Field(
         EventPaginatedObject,
@@ -809,38 +563,19 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
 
     @login_required
     async def resolve_user_events_subscribed(self, info, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
 
         # get all events where user is an attendee
-        user = await models.User.get(id=info.context["request"].user.id)
-
-        # get all event attendees
-        attendees = await models.EventAttendee.filter(attendee=user).all()
+        s = models.Event.filter(id__in=attended_event_ids(info.context["request"].user.id))
 
-        event_ids = [e.event.id for e in attendees]
-
-        # get all events
-        s = models.Event.filter(id__in=event_ids).all()
-
-        # get total count
-        total_count = await s.count()
-
-        return EventPaginatedObject(
-            total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all(),
-        )
+        return await paginate(info, s, EventPaginatedObject, kwargs)
     
     
     timeline = graphene.Field(
@@ -852,32 +587,12 @@ class Query(graphene.ObjectType):
     @login_required
     async def resolve_timeline(self, info, *args, **kwargs):
         fetch_date = pendulum.parse(kwargs.get("fetch_date"), strict=False)
-        
-        event_attendees = await models.EventAttendee.filter(
-            attendee_id=info.context["request"].user.id
-        ).all()
-        
-        # get list of event ids
-        events_ids = [e.event_id for e in event_attendees]
-        
-        # get all events created by user
-        event_author = await models.Event.filter(
-            author_id=info.context["request"].user.id,
-            start_time__year=fetch_date.year, 
-            start_time__month=fetch_date.month
-        ).all()
-        
-        # get list of event ids
-        events_author_ids = [e.id for e in event_author]
-        
-        # combine both lists
-        events_ids = events_ids + events_author_ids
-        
-        # get all events
-        events = await models.Event.filter(
-            id__in=events_ids, start_time__year=fetch_date.year, 
+
+        # get the events of the month the user attends or authored
+        events = await visible_events(info.context["request"].user.id).filter(
+            start_time__year=fetch_date.year,
             start_time__month=fetch_date.month
-        ).all()
+        )
         
         datas = []
         
@@ -901,27 +616,24 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
     
     @login_required
     async def resolve_my_todays_events(self, info, *args, **kwargs):
-        # get all events where current user is an attendee
-        events_ids = [e.event_id for e in await models.EventAttendee.filter(
-            attendee_id=info.context['request'].user.id)] + [
-                e.id for e in await Event.filter(
-                author_id=info.context['request'].user.id)
-            ]
-        
-        # filter unique events
-        events_ids = list(set(events_ids))
-        
-        # get all events order by start time in wqhich start time is starting from today
+        # get all events where current user is an attendee or the author
+        # in which start time is before now and end time after now
         c_date = pendulum.now()
-        events = await models.Event.filter(
-            id__in=events_ids
-        ).filter(
+        s = visible_events(info.context['request'].user.id).filter(
             start_time__lt=c_date, 
-            end_time__gt=c_date).order_by("-start_time")
+            end_time__gt=c_date)
+
+        if page_requested(kwargs):
+            return await paginate(info, s, EventPaginatedObject, kwargs, ordering=("-start_time", "-id"))
+
+        events = await s.order_by("-start_time")
         
         # only 4
         events = events[:10]
@@ -938,24 +650,24 @@ class Query(graphene.ObjectType):
     
     
     my_documents = graphene.Field(
-        EventDocumentPaginatedObject
+        EventDocumentPaginatedObject,
+        page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
     
     @login_required
     async def resolve_my_documents(self, info, *args, **kwargs):
-        # get all events where current user is an attendee
-        events_attendee = await models.EventAttendee.filter(
-            attendee_id=info.context['request'].user.id).all()
-        
-        events_ids = [e.event_id for e in events_attendee] + [
-            e.id for e in await Event.filter(
-                author_id=info.context['request'].user.id
-            )
-        ]
-        
-        # get all events documents order by created 
-        documents = await models.EventDocument.filter(
-            event_id__in=events_ids).order_by("-created").all()
+        # get all documents of the events the current user attends or authored
+        s = models.EventDocument.filter(
+            event_id__in=visible_event_ids(info.context['request'].user.id)
+        )
+
+        if page_requested(kwargs):
+            return await paginate(info, s, EventDocumentPaginatedObject, kwargs)
+
+        documents = await s.order_by("-created").all()
         
         return EventDocumentPaginatedObject(
             total=len(documents),
@@ -973,6 +685,9 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
     
     committee = graphene.Field(CommitteeObject, id=graphene.Int(required=True))
@@ -981,26 +696,13 @@ class Query(graphene.ObjectType):
     @login_required
     async def resolve_committees(self, info, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
         
         s = models.Committee.filter(
             Q(name__icontains=key) |
             Q(description__icontains=key)
         ).order_by("-created")
         
-        total_count = await s.count()
-        
-        return CommitteePaginatedObject(
-            total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all(),
-        )
+        return await paginate(info, s, CommitteePaginatedObject, kwargs)
     
     
     committee_members = graphene.Field(
@@ -1011,30 +713,20 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
     
     @login_required
     async def resolve_committee_members(self, info, *args, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
         
         s = models.UserCommittee.filter(
             committee_id=kwargs.get("id")
         ).order_by("-created")
         
-        total_count = await s.count()
-        
-        return userCommitteePaginatedObject(
-            total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all(),
-        )
+        return await paginate(info, s, userCommitteePaginatedObject, kwargs)
     
     committee_member = graphene.Field(
         userCommitteeObject, id=graphene.Int(required=True)
@@ -1053,15 +745,14 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
     
     @login_required
     async def resolve_not_committee_members(self, info, *args, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
         
         committee = await models.Committee.get(id=kwargs.get("id"))
         
@@ -1072,26 +763,9 @@ class Query(graphene.ObjectType):
             ).all()
         ]
         
-        s = models.User.filter(
-            ~Q(id__in=committee_members)
-        ).filter(
-            Q(first_name__icontains=key) |
-            Q(middle_name__icontains=key) |
-            Q(last_name__icontains=key) |
-            Q(email__icontains=key) |
-            Q(phone__icontains=key)
-        ).order_by("-created")
+        s = search_users(models.User.filter(~Q(id__in=committee_members)), key)
         
-        total_count = await s.count()
-        
-        return UserPaginatedObject(
-             total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all(),
-        )
+        return await paginate(info, s, UserPaginatedObject, kwargs, ordering=search_ordering(key))
             
         
     
@@ -1104,30 +778,20 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
     
     @login_required
     async def resolve_committee_departments(self, info, *args, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
         
         s = models.CommitteeDepartment.filter(
             committee_id=kwargs.get("id")
         ).order_by("-created")
         
-        total_count = await s.count()
-        
-        return CommitteeDepartmentPaginatedObject(
-            total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all(),
-        )
+        return await paginate(info, s, CommitteeDepartmentPaginatedObject, kwargs)
     
     committee_department = graphene.Field(
         CommitteeDepartmentObject, id=graphene.Int(required=True)
@@ -1146,15 +810,14 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
     
     @login_required
     async def resolve_not_committee_departments(self, info, *args, **kwargs):
         key = kwargs.get("key") if kwargs.get("key") else ""
-        page = kwargs.get("page") if kwargs.get("page") else 1
-        size = kwargs.get("page_size") if kwargs.get("page_size") else 25
-
-        offset = (page - 1) * size
         
         committee = await models.Committee.get(id=kwargs.get("id"))
         
@@ -1172,16 +835,7 @@ class Query(graphene.ObjectType):
             Q(description__icontains=key)
         ).order_by("-created")
         
-        total_count = await s.count()
-        
-        return DepartmentPaginatedObject(
-             total=total_count,
-            page=page,
-            pages=total_count // size,
-            has_next=total_count > offset + size,
-            has_prev=page > 1,
-            results=await s.offset(offset).limit(size).all(),
-        )
+        return await paginate(info, s, DepartmentPaginatedObject, kwargs)
     
     
     event_committees = graphene.Field(
@@ -1192,6 +846,9 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
     
     @login_required
@@ -1202,6 +859,9 @@ class Query(graphene.ObjectType):
             event_id=kwargs.get("id")
         ).order_by("-created")
         
+        if page_requested(kwargs):
+            return await paginate(info, s, EventCommitteePaginatedObject, kwargs)
+
         total_count = await s.count()
         
         return EventCommitteePaginatedObject(
@@ -1229,6 +889,9 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
     
     @login_required
@@ -1249,6 +912,9 @@ class Query(graphene.ObjectType):
             Q(description__icontains=key)
         ).order_by("-created")
         
+        if page_requested(kwargs):
+            return await paginate(info, s, CommitteePaginatedObject, kwargs)
+
         total_count = await s.count()
         
         return CommitteePaginatedObject(
@@ -1285,6 +951,9 @@ class Query(graphene.ObjectType):
         where=graphene.JSONString(required=False),
         page=graphene.Int(required=False),
         page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
     )
     
     @login_required
@@ -1295,6 +964,9 @@ class Query(graphene.ObjectType):
             event_id=kwargs.get("event_id")
         ).order_by("index")
         
+        if page_requested(kwargs):
+            return await paginate(info, s, EventMinutePaginatedObject, kwargs, ordering=("index", "id"))
+
         total_count = await s.count()
         
         return EventMinutePaginatedObject(
@@ -1311,3 +983,59 @@ class Query(graphene.ObjectType):
     
         
     
+
+    outbound_messages = graphene.Field(
+        OutboundMessagePaginatedObject,
+        event_id=graphene.Int(required=False, description="Event ID"),
+        status=graphene.String(required=False),
+        key=graphene.String(required=False),
+        sort=graphene.String(required=False),
+        where=graphene.JSONString(required=False),
+        page=graphene.Int(required=False),
+        page_size=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        before=graphene.String(required=False),
+        approximate=graphene.Boolean(required=False),
+    )
+
+    @login_required
+    async def resolve_outbound_messages(self, info, *args, **kwargs):
+        key = kwargs.get("key") if kwargs.get("key") else ""
+        event_id = kwargs.get("event_id")
+
+        # check if user can see the event messages, or all of them
+        permissions = get_permissions(info)
+        if event_id:
+            if not await permissions.can_manage_event(event_id):
+                raise Exception("Permission denied")
+        elif not await permissions.is_admin():
+            raise Exception("Permission denied")
+
+        s = models.OutboundMessage.filter(
+            Q(recipient__icontains=key) |
+            Q(recipient_name__icontains=key)
+        )
+        if event_id:
+            s = s.filter(event_id=event_id)
+        if kwargs.get("status"):
+            try:
+                s = s.filter(status=models.MessageStatus(kwargs.get("status")))
+            except ValueError:
+                raise Exception("Invalid status")
+
+        return await paginate(info, s, OutboundMessagePaginatedObject, kwargs)
+
+    background_job = graphene.Field(BackgroundJobObject, id=graphene.Int(required=True))
+
+    @login_required
+    async def resolve_background_job(self, info, *args, **kwargs):
+        job = await models.BackgroundJob.get_or_none(id=kwargs.get("id"))
+        if not job:
+            raise Exception("Job not found")
+
+        # check if user started the job or is an admin
+        permissions = get_permissions(info)
+        if not permissions.is_viewer(job.author_id) and not await permissions.is_admin():
+            raise Exception("Permission denied")
+
+        return job
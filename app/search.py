@@ -0,0 +1,79 @@
+from pypika.functions import Function
+from pypika.terms import Field, ValueWrapper
+from tortoise.expressions import Subquery
+from tortoise.functions import Lower
+from tortoise.queryset import Q
+from app.models import User
+
+
+# columns concatenated into "user"."search_text", see migration 6
+USER_SEARCH_FIELDS = ("first_name", "middle_name", "last_name", "email", "phone", "username")
+
+# ranked results, closest trigram similarity first
+SIMILARITY_ORDERING = ("-rank", "-id")
+
+
+def uses_search_index():
+    """the trigram column only exists on PostgreSQL"""
+    return User._meta.db.capabilities.dialect == "postgres"
+
+
+def escape_like(key):
+    return key.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def user_search_q(key):
+    """the plain ``icontains`` chain, used where the index is missing"""
+    q = Q()
+    for field in USER_SEARCH_FIELDS:
+        q |= Q(**{f"{field}__icontains": key})
+    return q
+
+
+def search_users(qs, key):
+    """
+    filter a ``User`` queryset by ``key`` and annotate each row with its
+    ``rank``. On PostgreSQL the match is a ``LIKE`` on the lower-cased
+    ``search_text`` column, which the pg_trgm GIN index answers without
+    scanning the table, and the rank is the trigram similarity.
+    """
+    if not key:
+        return qs
+    if not uses_search_index():
+        return qs.filter(user_search_q(key))
+
+    search_text = Field("search_text", table=User._meta.basetable)
+    return qs.annotate(
+        search_match=search_text.like(ValueWrapper(f"%{escape_like(key.lower())}%")),
+        rank=Function("similarity", search_text, ValueWrapper(key.lower())),
+    ).filter(search_match=True)
+
+
+def search_user_ids(key):
+    """subquery of the ids of the users matching ``key``"""
+    return Subquery(search_users(User.all(), key).values("id"))
+
+
+def search_attendees(qs, key, field="attendee_id"):
+    """filter a queryset pointing at users through ``field`` by ``key``"""
+    if not key:
+        return qs
+    return qs.filter(**{f"{field}__in": search_user_ids(key)})
+
+
+def search_ordering(key, default=("-created", "-id")):
+    """best matches first when the results are ranked"""
+    if key and uses_search_index():
+        return SIMILARITY_ORDERING
+    return default
+
+
+def annotate_email_lower(qs):
+    """annotate ``email_lower``, matched by the ``lower("email")`` index of
+    migration 14 where ``email__iexact`` (``UPPER(CAST(...))``) is not"""
+    return qs.annotate(email_lower=Lower("email"))
+
+
+def users_by_email(email):
+    """users with ``email``, ignoring case and surrounding blanks"""
+    return annotate_email_lower(User.all()).filter(email_lower=str(email).strip().lower())
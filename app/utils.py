@@ -1,3 +1,14 @@
+import base64
+import datetime
+import json
+from graphql.language import FieldNode, FragmentSpreadNode, InlineFragmentNode
+from tortoise.queryset import Q
+from app.cache import TTLCache
+
+
+count_cache = TTLCache(ttl=60)
+
+
 async def paginator(data, page, page_size=25):
     """
     paginator to limit the flow of the data to render
@@ -33,4 +44,247 @@ async def get_paginator(qs, page, page_size, paginated_type, **kwargs):
         has_prev=page > 1,
         results=page_obj,
         **kwargs
-    )
\ No newline at end of file
+    )
+
+def chunked(iterable, size):
+    """split an iterable into lists of at most ``size`` items"""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_json_array(path, read_size=64 * 1024):
+    """
+    yield the items of the top level JSON array in ``path`` one by one,
+    reading the file ``read_size`` characters at a time instead of loading
+    it whole
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r") as f:
+        buffer = ""
+        pos = None
+        while True:
+            data = f.read(read_size)
+            buffer += data
+
+            if pos is None:
+                stripped = buffer.lstrip()
+                if not stripped:
+                    if not data:
+                        raise ValueError(f"{path} is empty")
+                    continue
+                if stripped[0] != "[":
+                    raise ValueError(f"{path} does not hold a JSON array")
+                buffer = stripped
+                pos = 1
+
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+                if pos < len(buffer) and buffer[pos] == "]":
+                    return
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    break
+                # check if a value at the end of the buffer may still go on
+                if end == len(buffer) and data:
+                    break
+                yield item
+                pos = end
+
+            if not data:
+                raise ValueError(f"{path} ends inside the JSON array")
+            buffer = buffer[pos:]
+            pos = 0
+
+
+def encode_cursor(values):
+    """Opaque cursor holding the sort key of a row."""
+    payload = [v.isoformat() if isinstance(v, datetime.datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("utf-8")
+
+
+def decode_cursor(cursor, ordering):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("utf-8")).decode("utf-8"))
+    except Exception:
+        raise Exception("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise Exception("Invalid cursor")
+    decoded = []
+    for value in values:
+        if isinstance(value, str):
+            try:
+                value = datetime.datetime.fromisoformat(value)
+            except ValueError:
+                pass
+        decoded.append(value)
+    return decoded
+
+
+def reverse_ordering(ordering):
+    return tuple(f[1:] if f.startswith("-") else f"-{f}" for f in ordering)
+
+
+def seek_filter(ordering, values):
+    """
+    Q selecting the rows that come after ``values`` in ``ordering``.
+    The last ordering field must be unique and not null (the primary key),
+    NULLs are placed last when ascending and first when descending, the
+    way PostgreSQL sorts them.
+    """
+    field, value = ordering[0], values[0]
+    descending = field.startswith("-")
+    name = field.lstrip("-")
+
+    if len(ordering) == 1:
+        return Q(**{f"{name}__lt" if descending else f"{name}__gt": value})
+
+    rest = seek_filter(ordering[1:], values[1:])
+    if value is None:
+        if descending:
+            return Q(Q(**{f"{name}__isnull": True}), rest) | Q(**{f"{name}__isnull": False})
+        return Q(Q(**{f"{name}__isnull": True}), rest)
+
+    beyond = Q(**{f"{name}__lt" if descending else f"{name}__gt": value})
+    if not descending:
+        beyond = beyond | Q(**{f"{name}__isnull": True})
+    return beyond | Q(Q(**{name: value}), rest)
+
+
+def row_cursor(row, ordering):
+    return encode_cursor([getattr(row, f.lstrip("-")) for f in ordering])
+
+
+def selected_fields(info):
+    """names of the fields selected on the current field, fragments included"""
+    names = set()
+
+    def collect(selection_set):
+        if selection_set is None:
+            return
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                names.add(selection.name.value)
+            elif isinstance(selection, InlineFragmentNode):
+                collect(selection.selection_set)
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment = info.fragments.get(selection.name.value)
+                if fragment is not None:
+                    collect(fragment.selection_set)
+
+    for field_node in info.field_nodes:
+        collect(field_node.selection_set)
+    return names
+
+
+def can_estimate(qs):
+    """only the PostgreSQL planner gives a row estimate"""
+    return qs.model._meta.db.capabilities.dialect == "postgres"
+
+
+async def estimate_count(qs):
+    """row estimate of the query planner, see ``can_estimate``"""
+    rows = await qs.explain()
+    plan = rows[0]["QUERY PLAN"]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def approximate_count(qs):
+    """planner estimate cached for ``count_cache.ttl`` seconds per query"""
+    key = qs.sql()
+    total_count = count_cache.get(key)
+    if total_count is None:
+        total_count = await estimate_count(qs)
+        count_cache.set(key, total_count)
+    return total_count
+
+
+PAGE_ARGUMENTS = ("page", "page_size", "after", "before", "approximate")
+
+
+def page_requested(kwargs):
+    """check if any paging argument was passed, lists returning every row
+    without them keep doing so"""
+    return any(kwargs.get(name) is not None for name in PAGE_ARGUMENTS)
+
+
+async def paginate(info, qs, paginated_type, kwargs, ordering=("-created", "-id"), **extra):
+    """
+    paginate a queryset into ``paginated_type``.
+    ``page``/``page_size`` keep the offset mode, passing an ``after`` or
+    ``before`` cursor switches to keyset mode which seeks on ``ordering``
+    instead of scanning the skipped rows.
+    The rows are only counted when ``total`` or ``pages`` is selected,
+    ``approximate`` answers them from the planner estimate instead.
+    """
+    page = kwargs.get("page") if kwargs.get("page") else 1
+    size = kwargs.get("page_size") if kwargs.get("page_size") else 25
+    after = kwargs.get("after")
+    before = kwargs.get("before")
+    # only PostgreSQL estimates, the other databases count exactly
+    approximate = bool(kwargs.get("approximate")) and can_estimate(qs)
+
+    qs = qs.order_by(*ordering)
+
+    total_count = None
+    if selected_fields(info) & {"total", "pages"}:
+        if approximate:
+            total_count = await approximate_count(qs)
+        else:
+            total_count = await qs.count()
+    pages = total_count // size if total_count is not None else None
+
+    if after or before:
+        if after:
+            rows = await qs.filter(
+                seek_filter(ordering, decode_cursor(after, ordering))
+            ).limit(size + 1)
+        else:
+            rows = await qs.filter(
+                seek_filter(reverse_ordering(ordering), decode_cursor(before, ordering))
+            ).order_by(*reverse_ordering(ordering)).limit(size + 1)
+
+        has_more = len(rows) > size
+        rows = list(rows[:size])
+        if before:
+            rows.reverse()
+
+        return paginated_type(
+            total=total_count,
+            page=None,
+            pages=pages,
+            approximate=approximate and total_count is not None,
+            has_next=has_more if after else True,
+            has_prev=has_more if before else True,
+            start_cursor=row_cursor(rows[0], ordering) if rows else None,
+            end_cursor=row_cursor(rows[-1], ordering) if rows else None,
+            results=rows,
+            **extra
+        )
+
+    offset = (page - 1) * size
+    rows = await qs.offset(offset).limit(size + 1)
+    has_more = len(rows) > size
+    rows = list(rows[:size])
+
+    return paginated_type(
+        total=total_count,
+        page=page,
+        pages=pages,
+        approximate=approximate and total_count is not None,
+        has_next=has_more,
+        has_prev=page > 1,
+        start_cursor=row_cursor(rows[0], ordering) if rows else None,
+        end_cursor=row_cursor(rows[-1], ordering) if rows else None,
+        results=rows,
+        **extra
+    )
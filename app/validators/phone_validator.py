@@ -1,8 +1,69 @@
+import os
+from collections import namedtuple
+from functools import lru_cache
+
 from phonenumbers import carrier
 import phonenumbers
 from phonenumbers.phonenumberutil import number_type
 
 
+PHONE_CACHE_SIZE = int(os.getenv("PHONE_CACHE_SIZE", 65536))
+
+# every representation of a phone number the app uses, computed from a
+# single parse
+NormalizedPhone = namedtuple(
+    "NormalizedPhone",
+    ["number", "is_valid", "international", "international_plain", "national"],
+)
+
+INVALID_PHONE = NormalizedPhone(None, False, None, None, None)
+
+
+@lru_cache(maxsize=PHONE_CACHE_SIZE)
+def normalize(phone, code="TZ"):
+    '''Parsing the phone number once and caching the result by (phone, code),
+    :return: NormalizedPhone, is_valid is True for possible mobile numbers
+    '''
+
+    try:
+        z = phonenumbers.parse(phone, code)
+    except Exception:
+        return INVALID_PHONE
+
+    international = phonenumbers.format_number(
+        z, phonenumbers.PhoneNumberFormat.INTERNATIONAL).replace(" ", "")
+    national = phonenumbers.format_number(
+        z, phonenumbers.PhoneNumberFormat.NATIONAL).replace(" ", "")
+    is_valid = phonenumbers.is_possible_number(z) and carrier._is_mobile(number_type(z))
+
+    return NormalizedPhone(
+        number=z,
+        is_valid=is_valid,
+        international=international.replace("+", ""),
+        international_plain=international,
+        national=national.replace("+", ""),
+    )
+
+
+def validate_many(phones, code="TZ"):
+    '''Normalizing many phone numbers, i.e. for imports and sms fan out,
+    every distinct number is parsed at most once
+    :return: list of NormalizedPhone in the order of phones
+    '''
+
+    normalized = {}
+    results = []
+    for phone in phones:
+        try:
+            if phone not in normalized:
+                normalized[phone] = normalize(phone, code)
+            results.append(normalized[phone])
+        except TypeError:
+            # check if the value can not be a cache key
+            results.append(INVALID_PHONE)
+    return results
+
+
 class PhoneValidator:
     is_valid = True
     national_formatted_phone_number = None
@@ -12,58 +73,52 @@ class PhoneValidator:
         self.phone = phone
         self.code = code
 
+    @property
+    def normalized(self):
+        try:
+            return normalize(self.phone, self.code)
+        except TypeError:
+            return INVALID_PHONE
+
+    def _number(self):
+        normalized = self.normalized
+        if normalized.number is None:
+            raise phonenumbers.NumberParseException(
+                phonenumbers.NumberParseException.NOT_A_NUMBER, f"Invalid phone number {self.phone}")
+        return normalized
+
     def validate(self):
-        '''Validating Phone Number, 
-        the function returns a boolean, 
+        '''Validating Phone Number,
+        the function returns a boolean,
         :return: True if phone is valid
         :return: False if Phone is not valid
         '''
 
-        try:
-            z = phonenumbers.parse(self.phone, self.code)
-            ro_number_international = phonenumbers.format_number(
-                z, phonenumbers.PhoneNumberFormat.INTERNATIONAL)
-            is_mobile = carrier._is_mobile(
-                number_type(phonenumbers.parse(ro_number_international)))
-            if not phonenumbers.is_possible_number(z):
-                self.is_valid = False
-            if not is_mobile:
-                self.is_valid = False
-        except:
+        if not self.normalized.is_valid:
             self.is_valid = False
         return self.is_valid
 
     def getCarrierName(self):
         '''A function for retrieving the carrier name of the mobile phone number
-        supplied. i.e. Tigo, Voda e.t.c 
+        supplied. i.e. Tigo, Voda e.t.c
         '''
 
-        ro_number = phonenumbers.parse(self.phone, self.code)
-        name = carrier.name_for_number(ro_number, "en")
-        return name
+        return carrier.name_for_number(self._number().number, "en")
 
     def national_format(self):
         '''A function for formatting the mobile phone number in National Standard'''
 
-        phone_parse = phonenumbers.parse(self.phone, self.code)
-        self.national_formatted_phone_number = phonenumbers.format_number(
-            phone_parse, phonenumbers.PhoneNumberFormat.NATIONAL)
-        return str(self.national_formatted_phone_number).replace(" ",
-                                                                 "").replace(
-                                                                     "+", "")
+        self.national_formatted_phone_number = self._number().national
+        return self.national_formatted_phone_number
 
     def international_format_plain(self):
         '''A function for formatting the mobile phone number in International Standard without plus(+) sign'''
 
-        phone_parse = phonenumbers.parse(self.phone, self.code)
-        self.international_formatted_phone_number = phonenumbers.format_number(
-            phone_parse, phonenumbers.PhoneNumberFormat.INTERNATIONAL)
-        return str(self.international_formatted_phone_number).replace(" ", "")
+        self.international_formatted_phone_number = self._number().international_plain
+        return self.international_formatted_phone_number
 
     def international_format(self):
         '''A function for formatting the mobile phone number in International Standard without plus(+) sign'''
-        phone_parse = phonenumbers.parse(self.phone, self.code)
-        self.international_formatted_phone_number = phonenumbers.format_number(
-            phone_parse, phonenumbers.PhoneNumberFormat.INTERNATIONAL)
-        return str(self.international_formatted_phone_number).replace(
-            " ", "").replace("+", "")
+
+        self.international_formatted_phone_number = self._number().international
+        return self.international_formatted_phone_number
@@ -0,0 +1,50 @@
+from tortoise.expressions import Subquery
+
+from app import models
+from app.fiscal import fiscal_year_bounds, parse_fiscal_year
+
+
+def attended_event_ids(user_id):
+    """subquery of the ids of the events the user attends"""
+    return Subquery(models.UserEventAccess.filter(
+        user_id=user_id, is_attendee=True
+    ).values("event_id"))
+
+
+def visible_event_ids(user_id):
+    """
+    subquery of the ids of the events the user attends or authored, read
+    from the user's ``UserEventAccess`` rows with one index range scan
+    """
+    return Subquery(models.UserEventAccess.filter(user_id=user_id).values("event_id"))
+
+
+def visible_events(user_id):
+    """events the user attends or authored, as one statement"""
+    return models.Event.filter(id__in=visible_event_ids(user_id))
+
+
+def filter_events(s, event_type=None, committee_id=None, department_id=None,
+                  financial_year=None):
+    """narrow an event queryset by the filters of the event lists"""
+    if event_type:
+        s = s.filter(event_type=event_type)
+
+    if committee_id:
+        s = s.filter(id__in=Subquery(
+            models.EventCommittee.filter(committee_id=committee_id).values("event_id")
+        ))
+
+    if department_id:
+        s = s.filter(id__in=Subquery(
+            models.EventDepartment.filter(department_id=department_id).values("event_id")
+        ))
+
+    if financial_year:
+        try:
+            fy_start, fy_end = fiscal_year_bounds(parse_fiscal_year(financial_year))
+        except ValueError:
+            raise Exception("Invalid financial year")
+        s = s.filter(start_time__gte=fy_start, start_time__lt=fy_end)
+
+    return s
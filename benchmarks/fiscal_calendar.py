@@ -0,0 +1,87 @@
+"""
+Fiscal quarter of event dates before and after app.fiscal.
+
+    python -m benchmarks.fiscal_calendar --events 25 --repeat 20
+
+The legacy function below is EventObject.resolve_quarter as it was (its
+print removed), building every day of the financial year with pendulum
+for each event. It returned "Q1" for every date from July on; for the
+rest of the year it returned the index of a 3 day group, i.e. "Q63", or
+nothing when the event did not start at midnight.
+"""
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta
+
+import numpy as np
+import pendulum
+
+from app.fiscal import fiscal_calendar, fiscal_quarter, fiscal_week, fiscal_year
+
+
+def legacy_quarter(start_time):
+    sd = pendulum.parse(str(start_time), strict=False)
+    if sd.month >= 7:
+        return "Q1"
+    years = [int(sd.year) - 1, sd.year]
+    start_date = pendulum.parse(f"07/01/{years[0]}", strict=False)
+    end_date = start_date.add(months=12).subtract(days=1)
+    date_range = list(pendulum.period(start_date, end_date).range('days'))
+    quarter_date_range = [date_range[i:i + 3] for i in range(0, len(date_range), 3)]
+    for i, qdr in enumerate(quarter_date_range):
+        if sd in qdr:
+            return f"Q{i + 1}"
+
+
+def expected(d):
+    # quarters written out month by month
+    quarter = {7: 1, 8: 1, 9: 1, 10: 2, 11: 2, 12: 2, 1: 3, 2: 3, 3: 3, 4: 4, 5: 4, 6: 4}[d.month]
+    year = d.year if d.month >= 7 else d.year - 1
+    week = (d.date() - datetime(year, 7, 1).date()).days // 7 + 1
+    return year, quarter, week
+
+
+def check():
+    days = [datetime(2000, 1, 1) + timedelta(days=i) for i in range(365 * 40 + 10)]
+    scalar = [(fiscal_year(d), fiscal_quarter(d), fiscal_week(d)) for d in days]
+    assert scalar == [expected(d) for d in days]
+    bulk = fiscal_calendar(days)
+    assert list(zip(bulk["year"].tolist(), bulk["quarter"].tolist(), bulk["week"].tolist())) == scalar
+    return len(days)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=25)
+    parser.add_argument("--bulk", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"checked {check()} days against the month table")
+
+    start = datetime(2023, 7, 1)
+    page = [start + timedelta(days=random.randrange(365), hours=9) for _ in range(args.events)]
+    wrong = sum(legacy_quarter(d) != f"Q{fiscal_quarter(d)}" for d in page)
+    print(f"legacy quarter wrong for {wrong} of {len(page)} events")
+
+    for name, run in (
+        ("legacy page", lambda: [legacy_quarter(d) for d in page]),
+        ("fiscal page", lambda: [fiscal_quarter(d) for d in page]),
+    ):
+        best = min(timeit.repeat(run, number=1, repeat=args.repeat))
+        print(f"{name:<14} {args.events} events {best * 1000:9.3f} ms")
+
+    report = np.array([start + timedelta(minutes=random.randrange(60 * 24 * 365 * 5))
+                       for _ in range(args.bulk)], dtype="datetime64[m]")
+    dates = report.astype(datetime).tolist()
+    for name, run in (
+        ("scalar bulk", lambda: [(fiscal_year(d), fiscal_quarter(d), fiscal_week(d)) for d in dates]),
+        ("numpy bulk", lambda: fiscal_calendar(report)),
+    ):
+        best = min(timeit.repeat(run, number=1, repeat=max(args.repeat // 4, 1)))
+        print(f"{name:<14} {args.bulk} dates {best * 1000:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Event loop latency while bcrypt runs inline versus on the hashing pool.
+
+    python -m benchmarks.password_hashing --logins 20 --rounds 12
+
+A ticker task measures how late the loop wakes it up while the logins
+run, which is what every other request in the worker experiences.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import bcrypt
+
+from app.passwords import PasswordHasher
+
+
+async def ticker(lags, stop, interval=0.005):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def inline_login(password, hashed):
+    return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+
+
+async def pooled_login(hasher, password, hashed):
+    return await hasher.verify(password, hashed)
+
+
+async def measure(label, logins):
+    lags, stop = [], asyncio.Event()
+    tick = asyncio.ensure_future(ticker(lags, stop))
+    started = time.perf_counter()
+    results = await asyncio.gather(*logins)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await tick
+    assert all(results)
+    lags = sorted(lags) or [0.0]
+    print(
+        f"  {label:<14} total {elapsed * 1000:8.1f} ms  "
+        f"loop lag p50 {statistics.median(lags) * 1000:7.1f} ms  "
+        f"p99 {lags[int(len(lags) * 0.99) - 1 if len(lags) > 1 else 0] * 1000:7.1f} ms  "
+        f"max {lags[-1] * 1000:7.1f} ms"
+    )
+
+
+async def main(args):
+    hasher = PasswordHasher(rounds=args.rounds, pool_size=args.pool_size)
+    password = "correct horse battery staple"
+    hashed, _ = await hasher.hash(password)
+
+    print(f"{args.logins} concurrent logins, {args.rounds} rounds, pool of {args.pool_size}")
+    await measure("inline", [inline_login(password, hashed) for _ in range(args.logins)])
+    await measure("thread pool", [pooled_login(hasher, password, hashed) for _ in range(args.logins)])
+    hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--pool-size", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
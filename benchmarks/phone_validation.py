@@ -0,0 +1,96 @@
+"""
+PhoneValidator before and after the cached normalization.
+
+    python -m benchmarks.phone_validation --numbers 2000 --repeat 5
+
+The legacy class below is the validator as it was, parsing the number
+again for every check and every format.
+"""
+import argparse
+import json
+import random
+import timeit
+from pathlib import Path
+
+import phonenumbers
+from phonenumbers import carrier
+from phonenumbers.phonenumberutil import number_type
+
+from app.validators.phone_validator import PhoneValidator, normalize, validate_many
+
+
+class LegacyPhoneValidator:
+    def __init__(self, phone, code="TZ"):
+        self.phone = phone
+        self.code = code
+        self.is_valid = True
+
+    def validate(self):
+        try:
+            z = phonenumbers.parse(self.phone, self.code)
+            ro_number_international = phonenumbers.format_number(
+                z, phonenumbers.PhoneNumberFormat.INTERNATIONAL)
+            is_mobile = carrier._is_mobile(
+                number_type(phonenumbers.parse(ro_number_international)))
+            if not phonenumbers.is_possible_number(z):
+                self.is_valid = False
+            if not is_mobile:
+                self.is_valid = False
+        except:
+            self.is_valid = False
+        return self.is_valid
+
+    def international_format(self):
+        phone_parse = phonenumbers.parse(self.phone, self.code)
+        return phonenumbers.format_number(
+            phone_parse, phonenumbers.PhoneNumberFormat.INTERNATIONAL).replace(" ", "").replace("+", "")
+
+
+def sample_numbers(size):
+    users = Path(__file__).resolve().parent.parent / "users.json"
+    known = [u["phone"] for u in json.loads(users.read_text())]
+    generated = [f"07{random.randint(10000000, 99999999)}" for _ in range(size)]
+    return (known + generated)[:size]
+
+
+def legacy(numbers):
+    return [v.international_format() if v.validate() else None
+            for v in map(LegacyPhoneValidator, numbers)]
+
+
+def cached(numbers):
+    return [v.international_format() if v.validate() else None
+            for v in map(PhoneValidator, numbers)]
+
+
+def batch(numbers):
+    return [n.international if n.is_valid else None for n in validate_many(numbers)]
+
+
+def main(args):
+    numbers = sample_numbers(args.numbers)
+    # imports and fan outs see the same numbers over and over
+    workload = numbers * args.duplicates
+    assert legacy(numbers) == cached(numbers) == batch(numbers)
+
+    print(f"{len(workload)} validations, {len(set(workload))} distinct numbers")
+    for label, func, cold in [
+        ("legacy", legacy, False),
+        ("cached, cold", cached, True),
+        ("cached, warm", cached, False),
+        ("validate_many", batch, False),
+    ]:
+        def run():
+            if cold:
+                normalize.cache_clear()
+            func(workload)
+        best = min(timeit.repeat(run, number=1, repeat=args.repeat))
+        print(f"  {label:<14} {best * 1000:9.1f} ms  {best / len(workload) * 1e6:7.2f} us/number")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--numbers", type=int, default=2000)
+    parser.add_argument("--duplicates", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
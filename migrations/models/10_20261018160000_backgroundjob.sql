@@ -0,0 +1,25 @@
+-- upgrade --
+ALTER TABLE "outboundmessage" ADD "redact" BOOL NOT NULL  DEFAULT False;
+CREATE TABLE IF NOT EXISTS "backgroundjob" (
+    "is_active" BOOL NOT NULL  DEFAULT True,
+    "created" TIMESTAMPTZ   DEFAULT CURRENT_TIMESTAMP,
+    "updated" TIMESTAMPTZ   DEFAULT CURRENT_TIMESTAMP,
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "kind" VARCHAR(100) NOT NULL,
+    "status" VARCHAR(20) NOT NULL  DEFAULT 'pending',
+    "claim" VARCHAR(100)  UNIQUE,
+    "lease_until" TIMESTAMPTZ,
+    "total" INT NOT NULL  DEFAULT 0,
+    "processed" INT NOT NULL  DEFAULT 0,
+    "succeeded" INT NOT NULL  DEFAULT 0,
+    "failed" INT NOT NULL  DEFAULT 0,
+    "result" JSONB,
+    "error" TEXT,
+    "started_at" TIMESTAMPTZ,
+    "finished_at" TIMESTAMPTZ,
+    "author_id" INT REFERENCES "user" ("id") ON DELETE SET NULL
+);
+COMMENT ON COLUMN "backgroundjob"."status" IS 'PENDING: pending\nRUNNING: running\nCOMPLETED: completed\nFAILED: failed';
+-- downgrade --
+ALTER TABLE "outboundmessage" DROP COLUMN "redact";
+DROP TABLE IF EXISTS "backgroundjob";
@@ -0,0 +1,20 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "storedfile" (
+    "is_active" BOOL NOT NULL  DEFAULT True,
+    "created" TIMESTAMPTZ   DEFAULT CURRENT_TIMESTAMP,
+    "updated" TIMESTAMPTZ   DEFAULT CURRENT_TIMESTAMP,
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "digest" VARCHAR(64) NOT NULL UNIQUE,
+    "path" TEXT NOT NULL,
+    "size" BIGINT NOT NULL  DEFAULT 0,
+    "content_type" VARCHAR(255),
+    "ref_count" INT NOT NULL  DEFAULT 0
+);
+ALTER TABLE "eventdocument" ADD "blob_id" INT;
+ALTER TABLE "eventdocument" ADD "filename" VARCHAR(255);
+ALTER TABLE "eventdocument" ADD CONSTRAINT "fk_eventdoc_storedfi_446dbcd2" FOREIGN KEY ("blob_id") REFERENCES "storedfile" ("id") ON DELETE SET NULL;
+-- downgrade --
+ALTER TABLE "eventdocument" DROP CONSTRAINT "fk_eventdoc_storedfi_446dbcd2";
+ALTER TABLE "eventdocument" DROP COLUMN "filename";
+ALTER TABLE "eventdocument" DROP COLUMN "blob_id";
+DROP TABLE IF EXISTS "storedfile";
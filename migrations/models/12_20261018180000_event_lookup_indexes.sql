@@ -0,0 +1,6 @@
+-- upgrade --
+CREATE INDEX "idx_event_financi_ae6cf6" ON "event" ("financial_year");
+CREATE INDEX "idx_event_event_t_1369d9" ON "event" ("event_type");
+-- downgrade --
+DROP INDEX "idx_event_event_t_1369d9";
+DROP INDEX "idx_event_financi_ae6cf6";
@@ -0,0 +1,30 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "user_event_access" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "is_author" BOOL NOT NULL  DEFAULT False,
+    "is_attendee" BOOL NOT NULL  DEFAULT False,
+    "can_upload" BOOL NOT NULL  DEFAULT False,
+    "manage_minutes" BOOL NOT NULL  DEFAULT False,
+    "manage_agendas" BOOL NOT NULL  DEFAULT False,
+    "event_id" INT NOT NULL REFERENCES "event" ("id") ON DELETE CASCADE,
+    "user_id" INT NOT NULL REFERENCES "user" ("id") ON DELETE CASCADE
+);
+-- the viewer's event ids and roles are read from the index alone
+CREATE UNIQUE INDEX "uid_user_event__user_id_195108" ON "user_event_access" ("user_id", "event_id")
+    INCLUDE ("is_author", "is_attendee", "can_upload", "manage_minutes", "manage_agendas");
+CREATE INDEX "idx_user_event__event_i_3cef00" ON "user_event_access" ("event_id");
+INSERT INTO "user_event_access" ("user_id", "event_id", "is_author", "is_attendee", "can_upload", "manage_minutes", "manage_agendas")
+    SELECT "user_id", "event_id", bool_or("is_author"), bool_or("is_attendee"),
+           bool_or("can_upload"), bool_or("manage_minutes"), bool_or("manage_agendas")
+    FROM (
+        SELECT "author_id" AS "user_id", "id" AS "event_id", True AS "is_author", False AS "is_attendee",
+               False AS "can_upload", False AS "manage_minutes", False AS "manage_agendas"
+        FROM "event" WHERE "author_id" IS NOT NULL
+        UNION ALL
+        SELECT "attendee_id", "event_id", False, True, "can_upload", "manage_minutes", "manage_agendas"
+        FROM "eventattendee"
+    ) AS "access"
+    GROUP BY "user_id", "event_id";
+ANALYZE "user_event_access";
+-- downgrade --
+DROP TABLE IF EXISTS "user_event_access";
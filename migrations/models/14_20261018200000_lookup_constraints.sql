@@ -0,0 +1,54 @@
+-- upgrade --
+DELETE FROM "userdepartment" a USING "userdepartment" b
+    WHERE a."user_id" = b."user_id" AND a."department_id" = b."department_id" AND a."id" > b."id";
+CREATE UNIQUE INDEX "uid_userdepartm_user_id_e3c12e" ON "userdepartment" ("user_id", "department_id");
+CREATE INDEX "idx_userdepartm_departm_73b79c" ON "userdepartment" ("department_id");
+DELETE FROM "usercommittee" a USING "usercommittee" b
+    WHERE a."user_id" = b."user_id" AND a."committee_id" = b."committee_id" AND a."id" > b."id";
+CREATE UNIQUE INDEX "uid_usercommitt_user_id_cf3ef0" ON "usercommittee" ("user_id", "committee_id");
+CREATE INDEX "idx_usercommitt_committ_3c1f10" ON "usercommittee" ("committee_id");
+DELETE FROM "eventdepartment" a USING "eventdepartment" b
+    WHERE a."event_id" = b."event_id" AND a."department_id" = b."department_id" AND a."id" > b."id";
+CREATE UNIQUE INDEX "uid_eventdepart_event_i_002fdb" ON "eventdepartment" ("event_id", "department_id");
+CREATE INDEX "idx_eventdepart_departm_157ae3" ON "eventdepartment" ("department_id");
+DELETE FROM "eventcommittee" a USING "eventcommittee" b
+    WHERE a."event_id" = b."event_id" AND a."committee_id" = b."committee_id" AND a."id" > b."id";
+CREATE UNIQUE INDEX "uid_eventcommit_event_i_f466d7" ON "eventcommittee" ("event_id", "committee_id");
+CREATE INDEX "idx_eventcommit_committ_f40a18" ON "eventcommittee" ("committee_id");
+DELETE FROM "committeedepartment" a USING "committeedepartment" b
+    WHERE a."committee_id" = b."committee_id" AND a."department_id" = b."department_id" AND a."id" > b."id";
+CREATE UNIQUE INDEX "uid_committeede_committ_598ba2" ON "committeedepartment" ("committee_id", "department_id");
+CREATE INDEX "idx_committeede_departm_59b11e" ON "committeedepartment" ("department_id");
+DELETE FROM "eventdocumentdepartment" a USING "eventdocumentdepartment" b
+    WHERE a."event_document_id" = b."event_document_id" AND a."department_id" = b."department_id" AND a."id" > b."id";
+CREATE UNIQUE INDEX "uid_eventdocume_event_d_14314b" ON "eventdocumentdepartment" ("event_document_id", "department_id");
+CREATE INDEX "idx_eventdocume_departm_7383db" ON "eventdocumentdepartment" ("department_id");
+-- the latest note of a user on a document is the one shown, the older ones go
+DELETE FROM "eventuserdocumentnote" a USING "eventuserdocumentnote" b
+    WHERE a."event_document_id" = b."event_document_id" AND a."user_id" = b."user_id" AND a."id" < b."id";
+CREATE UNIQUE INDEX "uid_eventuserdo_event_d_e660a0" ON "eventuserdocumentnote" ("event_document_id", "user_id");
+CREATE INDEX "idx_eventattend_attende_6df0db" ON "eventattendee" ("attendee_id");
+CREATE INDEX "idx_user_usernam_9987ab" ON "user" ("username");
+-- emails are looked up as lower("email") = ..., see app.search.users_by_email.
+-- Not unique, users registered or synced before differ by case only.
+CREATE INDEX "idx_user_email_lower" ON "user" (lower("email"));
+-- only unused one time passwords are ever looked up
+CREATE INDEX "idx_userotp_user_id_token_unused" ON "userotp" ("user_id", "token") WHERE NOT "is_used";
+-- downgrade --
+DROP INDEX "idx_userotp_user_id_token_unused";
+DROP INDEX "idx_user_email_lower";
+DROP INDEX "idx_user_usernam_9987ab";
+DROP INDEX "idx_eventattend_attende_6df0db";
+DROP INDEX "uid_eventuserdo_event_d_e660a0";
+DROP INDEX "idx_eventdocume_departm_7383db";
+DROP INDEX "uid_eventdocume_event_d_14314b";
+DROP INDEX "idx_committeede_departm_59b11e";
+DROP INDEX "uid_committeede_committ_598ba2";
+DROP INDEX "idx_eventcommit_committ_f40a18";
+DROP INDEX "uid_eventcommit_event_i_f466d7";
+DROP INDEX "idx_eventdepart_departm_157ae3";
+DROP INDEX "uid_eventdepart_event_i_002fdb";
+DROP INDEX "idx_usercommitt_committ_3c1f10";
+DROP INDEX "uid_usercommitt_user_id_cf3ef0";
+DROP INDEX "idx_userdepartm_departm_73b79c";
+DROP INDEX "uid_userdepartm_user_id_e3c12e";
@@ -0,0 +1,44 @@
+-- upgrade --
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+-- the time an event holds its venue, NULL while start or end is missing
+ALTER TABLE "event" ADD "booking" TSTZRANGE GENERATED ALWAYS AS (
+    CASE WHEN "start_time" < "end_time" THEN tstzrange("start_time", "end_time", '[)') END
+) STORED;
+-- bookings made with the old containment check may overlap, which the
+-- constraint below does not allow. Walking each venue's active events by
+-- start, an event overlapping one kept before it is deactivated and
+-- recorded here with the event it clashed with.
+CREATE TABLE IF NOT EXISTS "event_booking_conflict" (
+    "event_id" INT NOT NULL PRIMARY KEY REFERENCES "event" ("id") ON DELETE CASCADE,
+    "kept_event_id" INT REFERENCES "event" ("id") ON DELETE SET NULL,
+    "deactivated_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TEMPORARY TABLE "booking_order" AS
+    SELECT "id", "venue_id", "start_time", "end_time",
+           row_number() OVER (PARTITION BY "venue_id" ORDER BY "start_time", "id") AS "n"
+    FROM "event" WHERE "is_active" AND "booking" IS NOT NULL;
+CREATE INDEX ON "booking_order" ("venue_id", "n");
+INSERT INTO "event_booking_conflict" ("event_id", "kept_event_id")
+    WITH RECURSIVE "walk" AS (
+        SELECT "venue_id", "n", "id", "end_time" AS "kept_end", "id" AS "kept_id", True AS "kept"
+        FROM "booking_order" WHERE "n" = 1
+        UNION ALL
+        SELECT o."venue_id", o."n", o."id",
+               CASE WHEN o."start_time" >= w."kept_end" THEN o."end_time" ELSE w."kept_end" END,
+               CASE WHEN o."start_time" >= w."kept_end" THEN o."id" ELSE w."kept_id" END,
+               o."start_time" >= w."kept_end"
+        FROM "walk" w JOIN "booking_order" o ON o."venue_id" = w."venue_id" AND o."n" = w."n" + 1
+    )
+    SELECT "id", "kept_id" FROM "walk" WHERE NOT "kept";
+UPDATE "event" SET "is_active" = False
+    WHERE "id" IN (SELECT "event_id" FROM "event_booking_conflict");
+DROP TABLE "booking_order";
+-- two active events never hold a venue at the same time
+ALTER TABLE "event" ADD CONSTRAINT "excl_event_venue_booking"
+    EXCLUDE USING GIST ("venue_id" WITH =, "booking" WITH &&) WHERE ("is_active");
+-- downgrade --
+ALTER TABLE "event" DROP CONSTRAINT "excl_event_venue_booking";
+UPDATE "event" SET "is_active" = True
+    WHERE "id" IN (SELECT "event_id" FROM "event_booking_conflict");
+DROP TABLE IF EXISTS "event_booking_conflict";
+ALTER TABLE "event" DROP COLUMN "booking";
@@ -0,0 +1,16 @@
+-- upgrade --
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+ALTER TABLE "user" ADD "search_text" TEXT GENERATED ALWAYS AS (
+    lower(
+        coalesce("first_name", '') || ' ' ||
+        coalesce("middle_name", '') || ' ' ||
+        coalesce("last_name", '') || ' ' ||
+        coalesce("email", '') || ' ' ||
+        coalesce("phone", '') || ' ' ||
+        coalesce("username", '')
+    )
+) STORED;
+CREATE INDEX "idx_user_search_text_trgm" ON "user" USING GIN ("search_text" gin_trgm_ops);
+-- downgrade --
+DROP INDEX IF EXISTS "idx_user_search_text_trgm";
+ALTER TABLE "user" DROP COLUMN "search_text";
@@ -0,0 +1,6 @@
+-- upgrade --
+DELETE FROM "eventattendee" a USING "eventattendee" b
+    WHERE a."event_id" = b."event_id" AND a."attendee_id" = b."attendee_id" AND a."id" > b."id";
+CREATE UNIQUE INDEX "uid_eventattend_event_i_0ed062" ON "eventattendee" ("event_id", "attendee_id");
+-- downgrade --
+DROP INDEX "uid_eventattend_event_i_0ed062";
@@ -0,0 +1,23 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "outboundmessage" (
+    "is_active" BOOL NOT NULL  DEFAULT True,
+    "created" TIMESTAMPTZ   DEFAULT CURRENT_TIMESTAMP,
+    "updated" TIMESTAMPTZ   DEFAULT CURRENT_TIMESTAMP,
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "channel" VARCHAR(20) NOT NULL  DEFAULT 'sms',
+    "status" VARCHAR(20) NOT NULL  DEFAULT 'pending',
+    "recipient" VARCHAR(255) NOT NULL,
+    "recipient_name" VARCHAR(255),
+    "message" TEXT NOT NULL,
+    "attempts" INT NOT NULL  DEFAULT 0,
+    "last_error" TEXT,
+    "next_attempt_at" TIMESTAMPTZ,
+    "sent_at" TIMESTAMPTZ,
+    "event_id" INT REFERENCES "event" ("id") ON DELETE SET NULL,
+    "user_id" INT REFERENCES "user" ("id") ON DELETE SET NULL
+);
+CREATE INDEX IF NOT EXISTS "idx_outboundmes_status_574978" ON "outboundmessage" ("status", "next_attempt_at");
+COMMENT ON COLUMN "outboundmessage"."channel" IS 'SMS: sms';
+COMMENT ON COLUMN "outboundmessage"."status" IS 'PENDING: pending\nSENDING: sending\nSENT: sent\nFAILED: failed';
+-- downgrade --
+DROP TABLE IF EXISTS "outboundmessage";
@@ -0,0 +1,6 @@
+-- upgrade --
+ALTER TABLE "outboundmessage" ADD "title" VARCHAR(255);
+COMMENT ON COLUMN "outboundmessage"."channel" IS 'SMS: sms\nEMAIL: email';
+-- downgrade --
+ALTER TABLE "outboundmessage" DROP COLUMN "title";
+COMMENT ON COLUMN "outboundmessage"."channel" IS 'SMS: sms';
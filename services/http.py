@@ -0,0 +1,29 @@
+import httpx
+
+
+class SharedClient:
+    """
+    Lazily created ``httpx.AsyncClient`` shared by the whole process so
+    connections are kept alive between requests.
+    """
+
+    def __init__(self, timeout, max_connections):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._client = None
+
+    def get(self):
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,83 @@
+import logging
+import os
+import time
+
+import httpx
+
+from services.http import SharedClient
+
+log = logging.getLogger("meeting.mail")
+
+MAIL_ENDPOINT = os.getenv(
+    "MAIL_ENDPOINT", "http://192.168.1.52/production/manager/send_mail/"
+)
+# forwarder endpoint taking a JSON list of messages, batch mode is off
+# while it is not configured
+MAIL_BATCH_ENDPOINT = os.getenv("MAIL_BATCH_ENDPOINT")
+MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", 50))
+MAIL_TIMEOUT = httpx.Timeout(float(os.getenv("MAIL_TIMEOUT", 10)), connect=5.0)
+MAIL_MAX_CONNECTIONS = int(os.getenv("MAIL_MAX_CONNECTIONS", 10))
+
+_client = SharedClient(MAIL_TIMEOUT, MAIL_MAX_CONNECTIONS)
+
+
+def get_client():
+    return _client.get()
+
+
+async def close_client():
+    await _client.close()
+
+
+class Mail:
+    def __init__(self, http_client=None):
+        self.endpoint = MAIL_ENDPOINT
+        self.batch_endpoint = MAIL_BATCH_ENDPOINT
+        self.http_client = http_client
+
+    @staticmethod
+    def payload(to, title, message, policy_id=None, to_customer=None):
+        return {
+            "message": message,
+            "to": to,
+            "title": title,
+            "policy": policy_id,
+            "to_customer": to_customer,
+        }
+
+    async def post(self, url, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await (self.http_client or get_client()).post(url, **kwargs)
+        except httpx.HTTPError as e:
+            log.warning(
+                "mail forward failed",
+                extra={"url": url, "error": repr(e),
+                       "elapsed_ms": round((time.perf_counter() - started) * 1000)},
+            )
+            return None
+
+        log.info(
+            "mail forwarded",
+            extra={"url": url, "status_code": response.status_code,
+                   "elapsed_ms": round((time.perf_counter() - started) * 1000)},
+        )
+        return response
+
+    async def send(self, to, title, message, policy_id=None, to_customer=None):
+        response = await self.post(
+            self.endpoint, data=self.payload(to, title, message, policy_id, to_customer)
+        )
+        return response is not None and response.is_success
+
+    async def send_batch(self, payloads):
+        """
+        forward many messages with one request per ``MAIL_BATCH_SIZE``
+        payloads and return the result of each message
+        """
+        results = []
+        for i in range(0, len(payloads), MAIL_BATCH_SIZE):
+            chunk = payloads[i:i + MAIL_BATCH_SIZE]
+            response = await self.post(self.batch_endpoint, json={"messages": chunk})
+            results += [response is not None and response.is_success] * len(chunk)
+        return results
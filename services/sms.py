@@ -1,8 +1,35 @@
+import logging
+import os
+import time
+
 import httpx
 
+from services.http import SharedClient
+
+log = logging.getLogger("meeting.sms")
+
+SMS_ENDPOINT = os.getenv(
+    "SMS_ENDPOINT", "https://imis.nictanzania.co.tz/production/communication/sms_send/"
+)
+SMS_TIMEOUT = httpx.Timeout(float(os.getenv("SMS_TIMEOUT", 10)), connect=5.0)
+SMS_MAX_CONNECTIONS = int(os.getenv("SMS_MAX_CONNECTIONS", 20))
+
+_client = SharedClient(SMS_TIMEOUT, SMS_MAX_CONNECTIONS)
+
+
+def get_client():
+    """the process wide client, its connections are kept alive between sends"""
+    return _client.get()
+
+
+async def close_client():
+    await _client.close()
+
+
 class SMS:
-    def __init__(self):
-        self.endpoint = 'https://imis.nictanzania.co.tz/production/communication/sms_send/'
+    def __init__(self, http_client=None):
+        self.endpoint = SMS_ENDPOINT
+        self.http_client = http_client
 
     async def send(self, to, message, client=""):
         data={
@@ -12,9 +39,20 @@ class SMS:
             "module":"Meeting App",
             "category":0
         }
-        response = httpx.post(self.endpoint, data=data)
-        
-        # print response status code
-        print(response.status_code)
-        # print response body
-        print(response.text)
\ No newline at end of file
+        started = time.perf_counter()
+        try:
+            response = await (self.http_client or get_client()).post(self.endpoint, data=data)
+        except httpx.HTTPError as e:
+            log.warning(
+                "sms send failed",
+                extra={"recipient": to, "error": repr(e),
+                       "elapsed_ms": round((time.perf_counter() - started) * 1000)},
+            )
+            return False
+
+        log.info(
+            "sms sent",
+            extra={"recipient": to, "status_code": response.status_code,
+                   "elapsed_ms": round((time.perf_counter() - started) * 1000)},
+        )
+        return response.is_success
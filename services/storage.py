@@ -0,0 +1,276 @@
+import hashlib
+import logging
+import os
+import time
+import uuid
+from datetime import timedelta
+from urllib.parse import quote
+
+import aiofiles
+import aiofiles.os
+from starlette.concurrency import run_in_threadpool
+
+log = logging.getLogger("meeting.storage")
+
+# "local" keeps uploads under STORAGE_ROOT, they are served by
+# /api/documents only, never by the public /static mount,
+# "s3" streams them to an S3 compatible bucket (MinIO in production)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+STORAGE_ROOT = os.getenv("STORAGE_ROOT", "static/uploads")
+# bytes read from the upload per step, the whole file is never in memory
+STORAGE_CHUNK_SIZE = int(os.getenv("STORAGE_CHUNK_SIZE", 1024 * 1024))
+
+STORAGE_ENDPOINT = os.getenv("STORAGE_ENDPOINT", "192.168.1.254:9000")
+STORAGE_ACCESS_KEY = os.getenv("STORAGE_ACCESS_KEY", "minioadmin")
+STORAGE_SECRET_KEY = os.getenv("STORAGE_SECRET_KEY", "minioadmin")
+STORAGE_BUCKET = os.getenv("STORAGE_BUCKET", "meeting")
+STORAGE_SECURE = os.getenv("STORAGE_SECURE", "false").lower() in ("1", "true", "yes")
+# size of every part of a multipart upload, S3 requires at least 5 MiB
+STORAGE_PART_SIZE = max(int(os.getenv("STORAGE_PART_SIZE", 8 * 1024 * 1024)), 5 * 1024 * 1024)
+
+
+def blob_name(digest):
+    """blobs are fanned out over 256 prefixes by the first byte of the digest"""
+    return f"{digest[:2]}/{digest}"
+
+
+class StagedFile:
+    """an upload hashed and held by a backend until it is committed"""
+
+    def __init__(self, digest, size, content_type, temp=None):
+        self.digest = digest
+        self.size = size
+        self.content_type = content_type
+        self.temp = temp
+
+
+class LocalStorage:
+    """
+    Blobs written to the local filesystem in ``STORAGE_CHUNK_SIZE`` chunks
+    with aiofiles, the event loop is never blocked by the copy. Uploads are
+    hashed while they are written to a temporary file, which is renamed to
+    the digest on commit unless the blob is already stored.
+    """
+
+    def __init__(self, root=STORAGE_ROOT, chunk_size=STORAGE_CHUNK_SIZE):
+        self.root = root
+        self.chunk_size = chunk_size
+
+    def path(self, digest):
+        return f"{self.root}/{blob_name(digest)}"
+
+    async def stage(self, file):
+        temp_dir = f"{self.root}/.tmp"
+        temp = f"{temp_dir}/{uuid.uuid4()}"
+        await aiofiles.os.makedirs(temp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async with aiofiles.open(temp, "wb") as out:
+                while True:
+                    chunk = await file.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    await out.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            await self.discard(StagedFile(None, size, None, temp))
+            raise
+        return StagedFile(digest.hexdigest(), size, file.content_type, temp)
+
+    async def commit(self, staged):
+        path = self.path(staged.digest)
+        if await aiofiles.os.path.exists(path):
+            await self.discard(staged)
+            return False
+        await aiofiles.os.makedirs(os.path.dirname(path), exist_ok=True)
+        await aiofiles.os.replace(staged.temp, path)
+        return True
+
+    async def discard(self, staged):
+        try:
+            await aiofiles.os.remove(staged.temp)
+        except OSError:
+            pass
+
+    async def delete(self, digest):
+        try:
+            await aiofiles.os.remove(self.path(digest))
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        pass
+
+
+class S3Storage:
+    """
+    Blobs streamed to an S3 compatible bucket with a multipart upload of
+    ``STORAGE_PART_SIZE`` parts. The upload is already spooled to a local
+    temporary file, it is hashed there first so nothing is sent when the
+    bucket holds the blob. The minio client is blocking, so calls run on
+    the thread pool; one client, and its connection pool, is shared by the
+    whole process. Any S3 endpoint works, i.e. a local ``minio server`` for
+    development.
+    """
+
+    def __init__(self, endpoint=STORAGE_ENDPOINT, access_key=STORAGE_ACCESS_KEY,
+                 secret_key=STORAGE_SECRET_KEY, bucket=STORAGE_BUCKET,
+                 secure=STORAGE_SECURE, part_size=STORAGE_PART_SIZE,
+                 chunk_size=STORAGE_CHUNK_SIZE):
+        self.endpoint = endpoint
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.bucket = bucket
+        self.secure = secure
+        self.part_size = part_size
+        self.chunk_size = chunk_size
+        self._client = None
+        self._bucket_checked = False
+
+    @property
+    def client(self):
+        if self._client is None:
+            from minio import Minio
+
+            self._client = Minio(
+                self.endpoint,
+                access_key=self.access_key,
+                secret_key=self.secret_key,
+                secure=self.secure,
+            )
+        return self._client
+
+    def path(self, digest):
+        return f"{self.bucket}/{blob_name(digest)}"
+
+    def _ensure_bucket(self):
+        if not self._bucket_checked:
+            if not self.client.bucket_exists(self.bucket):
+                self.client.make_bucket(self.bucket)
+            self._bucket_checked = True
+
+    def _hash(self, stream):
+        stream.seek(0)
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: stream.read(self.chunk_size), b""):
+            digest.update(chunk)
+        size = stream.tell()
+        stream.seek(0)
+        return digest.hexdigest(), size
+
+    def _exists(self, name):
+        from minio.error import S3Error
+
+        try:
+            self.client.stat_object(self.bucket, name)
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject"):
+                return False
+            raise
+        return True
+
+    def _put(self, staged):
+        self._ensure_bucket()
+        name = blob_name(staged.digest)
+        if self._exists(name):
+            return False
+        staged.temp.seek(0)
+        # length -1 makes the client split the stream into parts as it reads
+        self.client.put_object(
+            self.bucket, name, staged.temp, length=-1,
+            content_type=staged.content_type or "application/octet-stream",
+            part_size=self.part_size,
+        )
+        return True
+
+    def presigned_url(self, digest, expiry, filename=None):
+        """short lived download url, the bucket itself stays private"""
+        response_headers = None
+        if filename:
+            response_headers = {
+                "response-content-disposition": f"attachment; filename*=utf-8''{quote(filename)}"
+            }
+        return self.client.presigned_get_object(
+            self.bucket, blob_name(digest), expires=timedelta(seconds=expiry),
+            response_headers=response_headers,
+        )
+
+    def open(self, digest):
+        """blocking response streaming the blob, closed and released by the caller"""
+        return self.client.get_object(self.bucket, blob_name(digest))
+
+    async def stage(self, file):
+        digest, size = await run_in_threadpool(self._hash, file.file)
+        return StagedFile(digest, size, file.content_type, file.file)
+
+    async def commit(self, staged):
+        return await run_in_threadpool(self._put, staged)
+
+    async def discard(self, staged):
+        pass
+
+    async def delete(self, digest):
+        await run_in_threadpool(self.client.remove_object, self.bucket, blob_name(digest))
+
+    def close(self):
+        if self._client is not None:
+            self._client._http.clear()
+            self._client = None
+
+
+BACKENDS = {
+    "local": LocalStorage,
+    "s3": S3Storage,
+}
+
+
+class Storage:
+    """the configured backend, created on first use and shared by the process"""
+
+    def __init__(self, backend=STORAGE_BACKEND):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown storage backend {backend}")
+        self.backend_name = backend
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = BACKENDS[self.backend_name]()
+        return self._backend
+
+    def path(self, digest):
+        """path saved on documents, relative to ``settings.MINIO_SERVER``"""
+        return self.backend.path(digest)
+
+    async def stage(self, file):
+        """hash a starlette ``UploadFile`` while it is read"""
+        started = time.perf_counter()
+        staged = await self.backend.stage(file)
+        log.info(
+            "file staged",
+            extra={"backend": self.backend_name, "digest": staged.digest, "size": staged.size,
+                   "elapsed_ms": round((time.perf_counter() - started) * 1000)},
+        )
+        return staged
+
+    async def commit(self, staged):
+        """store the staged blob under its digest, False when it was already stored"""
+        return await self.backend.commit(staged)
+
+    async def discard(self, staged):
+        await self.backend.discard(staged)
+
+    async def delete(self, digest):
+        await self.backend.delete(digest)
+        log.info("blob deleted", extra={"backend": self.backend_name, "digest": digest})
+
+    def close(self):
+        if self._backend is not None:
+            self._backend.close()
+            self._backend = None
+
+
+storage = Storage()